@@ -1,12 +1,18 @@
-import pandas as pd
-import numpy as np
-import os
-from pathlib import Path
+import argparse
+
+import analysis_cache
+import draw_stats
+import feature_store
+import instrumentation
+import match_store
+import project_config
+import streak_distribution
+import sweep
 
 # --- SEKCJA KONFIGURACJI ---
 
-# 1. Ścieżka do głównego folderu z danymi
-BASE_PATH = Path("D:/football_all/football_data") 
+# 1. Ścieżka do głównego folderu z danymi (project_config; zmienna FOOTBALL_DATA_PATH albo cli.py --data-root)
+BASE_PATH = project_config.BASE_PATH
 
 # 2. Folder, w którym będą zapisywane wyniki analizy
 # Zmieniamy to, aby było bardziej elastyczne
@@ -16,189 +22,143 @@ BASE_PATH = Path("D:/football_all/football_data")
 X_SEASONS = 5 
 
 # 4. Struktura państw i lig
-COUNTRIES_LEAGUES = {
-    "England": ["E0", "E1", "E2"],
-    "Germany": ["D1", "D2"],
-    "Italy": ["I1", "I2"],
-    "Spain": ["SP1", "SP2"],
-    "France": ["F1", "F2"],
-    "Scotland": ["SC0", "SC1", "SC2"],
-    "Netherlands": ["N1"],
-    "Belgium": ["B1"],
-    "Portugal": ["P1"],
-    "Turkey": ["T1"],
-    "Greece": ["G1"]
-}
+COUNTRIES_LEAGUES = project_config.LEAGUE_SETS['analysis']
 
 # 5. Aktualny sezon (do wygenerowania listy sezonów do analizy)
 # Zakładamy format ROK/ROK+1
-CURRENT_SEASON_END_YEAR = 2025
+CURRENT_SEASON_END_YEAR = project_config.CURRENT_SEASON_END_YEAR
+
+# 6. Kolumny wczytywane z magazynu kolumnowego
+REQUIRED_COLUMNS = ['Date', 'HomeTeam', 'AwayTeam', 'FTR', 'Season']
 
 
 # --- FUNKCJE ANALITYCZNE ---
 
-def get_seasons_to_analyze(last_season_end_year, num_seasons):
-    """Generuje listę nazw folderów sezonów do analizy."""
-    seasons = []
-    for i in range(num_seasons):
-        start_year = last_season_end_year - 1 - i
-        end_year = last_season_end_year - i
-        # Format folderu: 2023-2024
-        seasons.append(f"{start_year}-{end_year}")
-    return seasons
+get_seasons_to_analyze = project_config.get_seasons_to_analyze
+
 
 def calculate_team_stats(team_df, team_name):
     """
     Oblicza wszystkie wymagane statystyki dla jednej drużyny na podstawie jej meczów.
+    Korzysta z wektorowego silnika draw_stats (analyze_league liczy wszystkie drużyny naraz).
     """
     if team_df.empty:
         return None
 
-    # Podstawowe statystyki
-    total_matches = len(team_df)
-    draws_df = team_df[team_df['FTR'] == 'D']
-    total_draws = len(draws_df)
-    draw_percentage = (total_draws / total_matches) * 100 if total_matches > 0 else 0
+    stats_df = draw_stats.calculate_all_team_stats(team_df)
+    team_stats = stats_df[stats_df['Team'] == team_name]
+    if team_stats.empty:
+        return None
+    return team_stats.iloc[0].to_dict()
 
-    # Analiza serii bez remisu
-    team_df['is_draw'] = team_df['FTR'] == 'D'
-    # Tworzymy grupy kolejnych takich samych wartości (remis / brak remisu)
-    team_df['streak_group'] = (team_df['is_draw'] != team_df['is_draw'].shift()).cumsum()
-    
-    streak_counts = team_df.groupby('streak_group')['is_draw'].agg(['count', 'first'])
-    
-    no_draw_streaks = streak_counts[streak_counts['first'] == False]['count']
 
-    longest_streak_no_draw = no_draw_streaks.max() if not no_draw_streaks.empty else 0
-    avg_streak_no_draw = no_draw_streaks.mean() if not no_draw_streaks.empty else 0
-    
-    # Aktualna seria bez remisu (NAJWAŻNIEJSZY WSKAŹNIK DLA PROGRESJI)
-    current_streak_no_draw = 0
-    if not team_df.empty:
-        # Sprawdzamy od ostatniego meczu wstecz
-        last_match = team_df.iloc[-1]
-        if not last_match['is_draw']:
-            last_draw_index = team_df[team_df['is_draw']].index.max()
-            if pd.notna(last_draw_index):
-                current_streak_no_draw = len(team_df.loc[last_draw_index:].iloc[1:])
-            else: # Nigdy nie zremisowała w analizowanym okresie
-                current_streak_no_draw = total_matches
-
-    # Stałość remisowania (odchylenie standardowe % remisów na sezon)
-    seasonal_stats = team_df.groupby('Season').apply(
-        lambda s: (s['is_draw'].sum() / len(s)) * 100 if len(s) > 0 else 0
-    ).rename('draw_percentage')
-    
-    draw_consistency_std_dev = seasonal_stats.std()
+def compute_season_aggregates(season, season_df, league_code):
+    """Agregaty cząstkowe (drużyna, sezon) z meczów jednego sezonu ligi."""
+    # Sortujemy dane chronologicznie (stabilnie - mecze z tego samego dnia zachowują kolejność z pliku)
+    if season_df['Date'].notna().any():
+        season_df = season_df.sort_values(by='Date', kind='stable').reset_index(drop=True)
+    else:
+        print(f"Ostrzeżenie: Brak kolumny 'Date' w danych dla {league_code} ({season}). Chronologia może być niepoprawna.")
 
-    # Trend remisów (nachylenie linii regresji)
-    seasonal_stats_df = seasonal_stats.reset_index()
-    # Przekształcamy '2023-24' w numeryczną wartość, np. 2023
-    seasonal_stats_df['season_numeric'] = seasonal_stats_df['Season'].apply(lambda s: int(s.split('-')[0]))
-    
-    # Obliczamy trend tylko jeśli mamy co najmniej 2 sezony
-    draw_trend_slope = 0.0
-    if len(seasonal_stats_df) > 1:
-        # y = mx + c, gdzie 'm' to nachylenie (slope)
-        m, c = np.polyfit(seasonal_stats_df['season_numeric'], seasonal_stats_df['draw_percentage'], 1)
-        draw_trend_slope = m
-
-    return {
-        'Team': team_name,
-        'Total Matches': total_matches,
-        'Total Draws': total_draws,
-        'Draw Percentage (%)': round(draw_percentage, 2),
-        'Current Streak Without Draw': current_streak_no_draw,
-        'Longest Streak Without Draw': longest_streak_no_draw,
-        'Average Streak Without Draw': round(avg_streak_no_draw, 2),
-        'Draw Consistency (Std Dev %)': round(draw_consistency_std_dev, 2),
-        'Draw Trend (Slope)': round(draw_trend_slope, 4)
-    }
-
-
-def analyze_league(country, league_code, seasons_list, output_base_path): # Dodano output_base_path
+    return draw_stats.season_team_aggregates(season_df)
+
+
+def analyze_league(country, league_code, seasons_list, output_base_path, use_cache=True): # Dodano output_base_path
     """
     Główna funkcja, która wczytuje dane dla ligi, przetwarza je i zapisuje wyniki.
+    Przy use_cache liga bez zmian w plikach wejściowych i konfiguracji jest pomijana,
+    a agregaty (drużyna, sezon) są przeliczane tylko dla sezonów, których pliki się zmieniły.
+    Zwraca ścieżkę zapisanego pliku albo None, jeśli brak danych.
     """
     print(f"\n--- Analizuję ligę: {country} - {league_code} dla {len(seasons_list)} sezonów ---")
-    
-    all_league_data = []
-    for season in seasons_list:
-        # Dostosowujemy nazwę kraju do ścieżki (np. Netherlands -> Netherlands)
-        file_path = BASE_PATH / season / country / f"{league_code}.csv"
-        
-        if not file_path.exists():
-            print(f"Ostrzeżenie: Plik nie istnieje: {file_path}")
-            continue
-            
-        try:
-            # Używamy różnych kodowań, bo stare pliki mogą mieć inne
-            try:
-                df = pd.read_csv(file_path)
-            except UnicodeDecodeError:
-                df = pd.read_csv(file_path, encoding='latin1')
-            
-            # Ważne: dodajemy kolumnę z sezonem
-            df['Season'] = season
-            all_league_data.append(df)
-        except Exception as e:
-            print(f"Błąd podczas wczytywania pliku {file_path}: {e}")
 
-    if not all_league_data:
+    output_filename = f"{country}_{league_code}_analiza_remisow.csv"
+    output_filepath = output_base_path / country / output_filename
+
+    config = {'X_SEASONS': X_SEASONS, 'CURRENT_SEASON_END_YEAR': CURRENT_SEASON_END_YEAR, 'seasons': list(seasons_list),
+              'team_aliases': match_store.TEAM_ALIASES.get(country, {})}
+    manifest = analysis_cache.read_manifest(output_base_path, country, league_code) if use_cache else {}
+    # Zmiana aliasów nazw drużyn zmienia agregaty cząstkowe wszystkich sezonów ligi
+    if manifest.get('config', {}).get('team_aliases') != config['team_aliases']:
+        manifest = {}
+    cached_aggregates = manifest.get('aggregates', {})
+    inputs = analysis_cache.input_fingerprints(BASE_PATH, country, league_code, seasons_list, manifest.get('inputs'))
+
+    if use_cache and analysis_cache.is_league_up_to_date(manifest, inputs, config, output_filepath):
+        print(f"⏩ Dane wejściowe i konfiguracja bez zmian - pomijam. Wyniki: {output_filepath}")
+        return output_filepath
+
+    # Agregaty sezonów z niezmienionymi plikami bierzemy z pamięci podręcznej (są małe: drużyny x sezony)
+    season_aggregates = {}
+    if use_cache:
+        for season in seasons_list:
+            if inputs[season] and analysis_cache.same_content(inputs[season], cached_aggregates.get(season)):
+                season_aggregates[season] = analysis_cache.read_season_aggregates(output_base_path, country, league_code, season)
+    missing_seasons = [season for season in seasons_list if season_aggregates.get(season) is None]
+
+    # Pozostałe sezony czytamy strumieniowo z magazynu kolumnowego (match_store) - w pamięci jest naraz
+    # jeden sezon i tylko potrzebne kolumny (z gotowymi typami i sparsowaną datą)
+    for season, season_df in match_store.iter_league_seasons(BASE_PATH, country, league_code, missing_seasons,
+                                                             columns=REQUIRED_COLUMNS):
+        with instrumentation.stage('team_stats', country, league_code, season, rows=len(season_df)):
+            aggregates_df = compute_season_aggregates(season, season_df, league_code)
+        del season_df
+        season_aggregates[season] = aggregates_df
+        if inputs[season] is not None:
+            analysis_cache.write_season_aggregates(output_base_path, country, league_code, season, aggregates_df)
+            cached_aggregates[season] = inputs[season]
+
+    # Statystyki wieloletnie składamy przyrostowo, sezon po sezonie w kolejności chronologicznej
+    # (serie bez remisu łączone przez granice sezonów)
+    accumulators = {}
+    available_seasons = [season for season in seasons_list if season_aggregates.get(season) is not None]
+    with instrumentation.stage('team_stats', country, league_code) as st:
+        for season_rank, season in enumerate(sorted(available_seasons, key=match_store.season_sort_key)):
+            draw_stats.accumulate_season(accumulators, season_aggregates[season], season_rank)
+        results_df = draw_stats.finalize_team_accumulators(accumulators) if accumulators else None
+        st.rows = 0 if results_df is None else len(results_df)
+
+    if not accumulators:
         print(f"Nie znaleziono żadnych danych dla ligi {league_code}. Przechodzę do następnej.")
-        return
-
-    master_df = pd.concat(all_league_data, ignore_index=True)
-    
-    # Upewniamy się, że kolumna Date istnieje i sortujemy po niej dane
-    if 'Date' in master_df.columns:
-        master_df['Date'] = pd.to_datetime(master_df['Date'], dayfirst=True, errors='coerce')
-        master_df = master_df.sort_values(by='Date').reset_index(drop=True)
-    else:
-        print(f"Ostrzeżenie: Brak kolumny 'Date' w danych dla {league_code}. Chronologia może być niepoprawna.")
-
-
-    # Znajdujemy wszystkie unikalne drużyny w analizowanym okresie
-    home_teams = master_df['HomeTeam'].unique()
-    away_teams = master_df['AwayTeam'].unique()
-    all_teams = pd.unique(np.concatenate((home_teams, away_teams)))
+        return None
 
-    league_results = []
-    for team in all_teams:
-        team_df = master_df[(master_df['HomeTeam'] == team) | (master_df['AwayTeam'] == team)].copy()
-        team_stats = calculate_team_stats(team_df, team)
-        if team_stats:
-            league_results.append(team_stats)
-    
-    if not league_results:
+    if results_df.empty:
         print(f"Nie udało się wygenerować statystyk dla ligi {league_code}.")
-        return
+        return None
 
-    # Tworzymy DataFrame z wynikami i sortujemy
-    results_df = pd.DataFrame(league_results)
     # Sortujemy malejąco wg kluczowych wskaźników dla progresji:
     # 1. Aktualna seria bez remisu (im dłuższa, tym lepiej)
     # 2. Ogólny procent remisów (im wyższy, tym większa skłonność drużyny do remisów)
     results_df = results_df.sort_values(by=['Current Streak Without Draw', 'Draw Percentage (%)'], ascending=[False, False])
     
-    # Tworzymy ścieżkę do zapisu uwzględniającą kraj
-    output_country_path = output_base_path / country
-    output_country_path.mkdir(parents=True, exist_ok=True) # Tworzymy folder kraju
-
-    # Zapisujemy wyniki do pliku CSV
-    output_filename = f"{country}_{league_code}_analiza_remisow.csv"
-    output_filepath = output_country_path / output_filename # Zmieniamy ścieżkę zapisu
-    results_df.to_csv(output_filepath, index=False)
+    # Zapisujemy wyniki do pliku CSV (atomowo - plik tymczasowy podmieniany po zapisie)
+    with instrumentation.stage('write', country, league_code, rows=len(results_df)):
+        sweep.write_csv_atomic(results_df, output_filepath, index=False)
+        analysis_cache.write_manifest(output_base_path, country, league_code,
+                                      {'config': config, 'inputs': inputs, 'aggregates': cached_aggregates})
     
     print(f"✅ Analiza zakończona. Wyniki zapisano w: {output_filepath}")
+    return output_filepath
 
 
 # --- GŁÓWNA PĘTLA WYKONAWCZA ---
 
-if __name__ == "__main__":
+def main(argv=None):
+    parser = sweep.add_sweep_arguments(argparse.ArgumentParser(description="Analiza remisów drużyn w ostatnich sezonach."))
+    parser.add_argument('--force', action='store_true',
+                        help="Przelicz wszystkie ligi od nowa, bez pamięci podręcznej (cache_analizy)")
+    parser.add_argument('--streak-distribution', action='store_true',
+                        help="Dodatkowo rozkład serii bez remisu i tablica P(remis w ciągu k | seria) "
+                             "z pełnej historii (streak_distribution.py)")
+    parser.add_argument('--feature-store', action='store_true',
+                        help="Dodatkowo magazyn cech przedmeczowych drużyn z pełnej historii (feature_store.py)")
+    instrumentation.add_instrumentation_arguments(parser)
+    args = parser.parse_args(argv)
+    instrumentation.configure_from_args(args)
+
     # Nowa ścieżka bazowa dla wyników analizy
     # D:/football_data/analiza_1/ostatnie_X_sezonow
-    ANALYSIS_OUTPUT_BASE_PATH = BASE_PATH / "analiza_1" / f"ostatnie_{X_SEASONS}_sezonow"
+    ANALYSIS_OUTPUT_BASE_PATH = BASE_PATH / project_config.ANALYSIS_DIRNAME / f"ostatnie_{X_SEASONS}_sezonow"
     
     # Utwórz folder na wyniki, jeśli nie istnieje
     ANALYSIS_OUTPUT_BASE_PATH.mkdir(parents=True, exist_ok=True)
@@ -206,9 +166,23 @@ if __name__ == "__main__":
     seasons = get_seasons_to_analyze(CURRENT_SEASON_END_YEAR, X_SEASONS)
     print(f"Rozpoczynam analizę dla sezonów: {seasons}")
     
-    for country, leagues in COUNTRIES_LEAGUES.items():
-        for league in leagues:
-            # Przekazujemy nową ścieżkę bazową do funkcji analyze_league
-            analyze_league(country, league, seasons, ANALYSIS_OUTPUT_BASE_PATH)
+    # Każda liga to osobne zadanie (kraj, liga) - przy --workers > 1 wykonywane równolegle
+    tasks = sweep.build_tasks(COUNTRIES_LEAGUES)
+    results = sweep.run_sweep(analyze_league, tasks, seasons, ANALYSIS_OUTPUT_BASE_PATH, not args.force,
+                              workers=args.workers)
+    sweep.report_summary(results, ANALYSIS_OUTPUT_BASE_PATH / "podsumowanie_przebiegu.csv")
+
+    if args.streak_distribution:
+        streak_seasons = get_seasons_to_analyze(CURRENT_SEASON_END_YEAR, streak_distribution.STREAK_SEASONS)
+        streak_distribution.write_streak_distribution(BASE_PATH, COUNTRIES_LEAGUES, streak_seasons,
+                                                      streak_distribution.get_output_dir(BASE_PATH))
+    if args.feature_store:
+        feature_seasons = get_seasons_to_analyze(CURRENT_SEASON_END_YEAR, feature_store.FEATURE_SEASONS)
+        feature_store.write_feature_store(BASE_PATH, COUNTRIES_LEAGUES, feature_seasons,
+                                          feature_store.get_output_dir(BASE_PATH))
             
-    print("\n\n--- Wszystkie analizy zostały zakończone! ---")
\ No newline at end of file
+    print("\n\n--- Wszystkie analizy zostały zakończone! ---")
+
+
+if __name__ == "__main__":
+    main()
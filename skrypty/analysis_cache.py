@@ -0,0 +1,128 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+import match_store
+
+# --- PAMIĘĆ PODRĘCZNA ANALIZY PRZYROSTOWEJ ---
+#
+# Dla każdej ligi w folderze wyników trzymamy manifest (odciski plików CSV wejściowych i konfigurację)
+# oraz agregaty cząstkowe (drużyna, sezon) z draw_stats.season_team_aggregates - po jednym pliku na sezon.
+#   <wyniki>/cache_analizy/<Kraj>/<Liga>/manifest.json
+#   <wyniki>/cache_analizy/<Kraj>/<Liga>/<sezon>.parquet
+# Liga bez zmian w plikach wejściowych i konfiguracji jest pomijana, a po nowej kolejce
+# przeliczany jest tylko sezon, którego plik się zmienił.
+
+CACHE_DIRNAME = "cache_analizy"
+MANIFEST_FILENAME = "manifest.json"
+
+# Zmiana sposobu liczenia agregatów cząstkowych unieważnia całą pamięć podręczną
+CACHE_VERSION = 1
+
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def get_league_cache_dir(output_base_path, country, league_code):
+    """Folder pamięci podręcznej jednej ligi."""
+    return Path(output_base_path) / CACHE_DIRNAME / country / league_code
+
+
+def get_aggregates_path(output_base_path, country, league_code, season):
+    """Plik agregatów cząstkowych (drużyna, sezon) dla jednego sezonu ligi."""
+    return get_league_cache_dir(output_base_path, country, league_code) / f"{season}.parquet"
+
+
+def file_sha256(file_path):
+    """Skrót SHA-256 zawartości pliku (czytanego blokami)."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_fingerprint(file_path, previous=None):
+    """
+    Odcisk pliku wejściowego: rozmiar, czas modyfikacji i SHA-256 zawartości.
+    Jeśli rozmiar i czas modyfikacji zgadzają się z poprzednim odciskiem, skrót nie jest liczony ponownie.
+    Zwraca None, jeśli plik nie istnieje.
+    """
+    file_path = Path(file_path)
+    if not file_path.exists():
+        return None
+    stat = file_path.stat()
+    if previous and previous.get("size") == stat.st_size and previous.get("mtime_ns") == stat.st_mtime_ns:
+        return dict(previous)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": file_sha256(file_path)}
+
+
+def same_content(fingerprint, previous):
+    """Czy dwa odciski opisują tę samą zawartość pliku (porównanie po skrócie)."""
+    if fingerprint is None or previous is None:
+        return fingerprint is None and previous is None
+    return fingerprint["sha256"] == previous["sha256"]
+
+
+def read_manifest(output_base_path, country, league_code):
+    """Wczytuje manifest ligi; pusty słownik, jeśli nie istnieje albo jest uszkodzony."""
+    manifest_path = get_league_cache_dir(output_base_path, country, league_code) / MANIFEST_FILENAME
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("version") != CACHE_VERSION:
+        return {}
+    return manifest
+
+
+def write_manifest(output_base_path, country, league_code, manifest):
+    """Zapisuje manifest ligi atomowo (plik tymczasowy podmieniany jedną operacją)."""
+    manifest_path = get_league_cache_dir(output_base_path, country, league_code) / MANIFEST_FILENAME
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = manifest_path.with_name(f".{manifest_path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({**manifest, "version": CACHE_VERSION}, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, manifest_path)
+    return manifest_path
+
+
+def input_fingerprints(base_path, country, league_code, seasons_list, previous_inputs=None):
+    """Odciski plików CSV ligi dla wszystkich sezonów ({sezon: odcisk albo None})."""
+    previous_inputs = previous_inputs or {}
+    return {
+        season: file_fingerprint(match_store.get_source_path(base_path, season, country, league_code),
+                                 previous_inputs.get(season))
+        for season in seasons_list
+    }
+
+
+def is_league_up_to_date(manifest, inputs, config, output_filepath):
+    """Czy wynik ligi można pominąć: ta sama konfiguracja, te same pliki wejściowe i istniejący plik wyników."""
+    if not manifest or manifest.get("config") != config or not Path(output_filepath).exists():
+        return False
+    previous_inputs = manifest.get("inputs", {})
+    if set(previous_inputs) != set(inputs):
+        return False
+    return all(same_content(inputs[season], previous_inputs[season]) for season in inputs)
+
+
+def read_season_aggregates(output_base_path, country, league_code, season):
+    """Wczytuje agregaty cząstkowe sezonu; None, jeśli brak pliku."""
+    aggregates_path = get_aggregates_path(output_base_path, country, league_code, season)
+    if not aggregates_path.exists():
+        return None
+    return pd.read_parquet(aggregates_path)
+
+
+def write_season_aggregates(output_base_path, country, league_code, season, aggregates_df):
+    """Zapisuje agregaty cząstkowe sezonu atomowo."""
+    aggregates_path = get_aggregates_path(output_base_path, country, league_code, season)
+    aggregates_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = aggregates_path.with_name(f".{aggregates_path.name}.{os.getpid()}.tmp")
+    aggregates_df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, aggregates_path)
+    return aggregates_path
@@ -0,0 +1,348 @@
+import argparse
+import contextlib
+import io
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Moduły symulacji leżą w podfolderze symulation_1/
+sys.path.insert(0, str(Path(__file__).resolve().parent / "symulation_1"))
+
+import analysis_1
+import draw_stats
+import match_store
+import progression
+import symulation_1 as sim
+import team_schedule
+
+# --- BENCHMARK ANALIZY I SYMULACJI NA SYNTETYCZNYCH LIGACH ---
+#
+# Generator tworzy ligi w schemacie plików football-data (<sezon>/<kraj>/<liga>.csv): pełne rundy
+# "każdy z każdym" (mecz i rewanż), wyniki losowane z zadanym odsetkiem remisów, siłą drużyn
+# i ich skłonnością do remisów, kursy 1X2 oraz awanse i spadki między ligami kraju.
+# Każdy etap (wczytanie, statystyki drużyn, profil połowy sezonu, progresja, zapis) jest mierzony
+# w kilku skalach, a wyniki zapisywane do JSON - kolejny przebieg można porównać z zapisanym wzorcem.
+
+# --- SEKCJA KONFIGURACJI ---
+
+# 1. Skale benchmarku: liczba drużyn w lidze, liczba sezonów i liczba lig (poziomów rozgrywek) kraju
+BENCHMARK_SCALES = {
+    'small': {'teams': 18, 'seasons': 5, 'leagues': 1},
+    'medium': {'teams': 20, 'seasons': 10, 'leagues': 2},
+    'large': {'teams': 24, 'seasons': 24, 'leagues': 3},
+}
+
+# 2. Parametry generatora
+SEED = 0
+DRAW_RATE = 0.27           # średni odsetek remisów
+HOME_ADVANTAGE = 0.35      # przewaga własnego boiska (skala logitu zwycięstwa gospodarza)
+TEAM_STRENGTH_STD = 0.6    # rozrzut siły drużyn
+TEAM_DRAW_STD = 0.05       # rozrzut skłonności drużyn do remisów
+BOOKMAKER_MARGIN = 1.05    # marża bukmachera w kursach 1X2
+PROMOTED_TEAMS = 3         # liczba drużyn awansujących / spadających po sezonie
+
+SYNTHETIC_COUNTRY = "Synthetica"
+
+# 3. Pomiary: liczba powtórzeń etapu i próg regresji względem wzorca (+20% czasu i co najmniej 5 ms -
+#    etapy trwające ułamki milisekund są zbyt zaszumione, by porównywać same proporcje)
+REPEAT = 3
+REGRESSION_TOLERANCE = 0.20
+MIN_REGRESSION_SECONDS = 0.005
+BENCHMARK_OUTPUT = Path("benchmark_wyniki.json")
+
+
+# --- GENERATOR SYNTETYCZNYCH LIG ---
+
+def round_robin_pairs(n_teams):
+    """
+    Terminarz "każdy z każdym" metodą kołową: lista kolejek, każda to tablica par (gospodarz, gość).
+    Druga runda to rewanże z zamienionymi gospodarzami. Przy nieparzystej liczbie drużyn jedna pauzuje.
+    """
+    slots = list(range(n_teams)) + ([-1] if n_teams % 2 else [])
+    n = len(slots)
+    rounds = []
+    for r in range(n - 1):
+        pairs = []
+        for i in range(n // 2):
+            home, away = slots[i], slots[n - 1 - i]
+            if home >= 0 and away >= 0:
+                pairs.append((home, away) if (r + i) % 2 == 0 else (away, home))
+        rounds.append(np.array(pairs, dtype=np.int64))
+        slots = [slots[0], slots[-1]] + slots[1:-1]
+    return rounds + [pairs[:, ::-1] for pairs in rounds]
+
+
+def generate_season(team_names, season, league_code, rng, draw_rate=DRAW_RATE, strength=None, draw_bias=None):
+    """
+    Jeden sezon ligi w schemacie football-data (Div, Date, HomeTeam, AwayTeam, FTHG, FTAG, FTR,
+    HTHG, HTAG, HTR, kursy B365 / Avg / Max). Zwraca DataFrame w kolejności kolejek.
+    """
+    n_teams = len(team_names)
+    strength = rng.normal(0, TEAM_STRENGTH_STD, n_teams) if strength is None else strength
+    draw_bias = rng.normal(0, TEAM_DRAW_STD, n_teams) if draw_bias is None else draw_bias
+    rounds = round_robin_pairs(n_teams)
+    pairs = np.concatenate(rounds)
+    round_no = np.repeat(np.arange(len(rounds)), [len(r) for r in rounds])
+    home, away = pairs[:, 0], pairs[:, 1]
+    n = len(pairs)
+
+    # Prawdopodobieństwa 1X2: remis wg skłonności obu drużyn, reszta wg różnicy sił i przewagi gospodarza
+    p_draw = np.clip(draw_rate + (draw_bias[home] + draw_bias[away]) / 2, 0.05, 0.6)
+    p_home = (1 - p_draw) / (1 + np.exp(-(strength[home] - strength[away] + HOME_ADVANTAGE)))
+    p_away = 1 - p_draw - p_home
+    u = rng.random(n)
+    ftr = np.where(u < p_home, 'H', np.where(u < p_home + p_draw, 'D', 'A'))
+
+    # Bramki zgodne z wynikiem
+    base = rng.poisson(0.9, n)
+    margin = 1 + rng.poisson(0.6, n)
+    fthg = np.where(ftr == 'A', base, base + np.where(ftr == 'H', margin, 0))
+    ftag = np.where(ftr == 'H', base, base + np.where(ftr == 'A', margin, 0))
+    hthg = rng.binomial(fthg, 0.45)
+    htag = rng.binomial(ftag, 0.45)
+    htr = np.where(hthg > htag, 'H', np.where(hthg < htag, 'A', 'D'))
+
+    # Kolejki w kolejne soboty i niedziele od początku sierpnia
+    start_year = int(season.split("-")[0])
+    season_start = date(start_year, 8, 1) + timedelta(days=(5 - date(start_year, 8, 1).weekday()) % 7)
+    day_in_round = np.concatenate([np.arange(len(r)) % 2 for r in rounds])
+    dates = [(season_start + timedelta(days=7 * int(r) + int(d))).strftime("%d/%m/%Y")
+             for r, d in zip(round_no, day_in_round)]
+
+    def odds(p, spread=0.0):
+        return np.round(1 / (p * BOOKMAKER_MARGIN) * (1 + spread), 2)
+
+    names = np.asarray(team_names, dtype=object)
+    return pd.DataFrame({
+        'Div': league_code, 'Date': dates, 'HomeTeam': names[home], 'AwayTeam': names[away],
+        'FTHG': fthg, 'FTAG': ftag, 'FTR': ftr, 'HTHG': hthg, 'HTAG': htag, 'HTR': htr,
+        'B365H': odds(p_home), 'B365D': odds(p_draw), 'B365A': odds(p_away),
+        'AvgH': odds(p_home, 0.01), 'AvgD': odds(p_draw, 0.01), 'AvgA': odds(p_away, 0.01),
+        'MaxD': odds(p_draw, 0.05),
+    })
+
+
+def season_points(season_df, team_names):
+    """Punkty drużyn w sezonie (3 za zwycięstwo, 1 za remis) w kolejności team_names."""
+    positions = {team: i for i, team in enumerate(team_names)}
+    home = season_df['HomeTeam'].map(positions).to_numpy()
+    away = season_df['AwayTeam'].map(positions).to_numpy()
+    ftr = season_df['FTR'].to_numpy()
+    points = np.zeros(len(team_names), dtype=np.int64)
+    np.add.at(points, home, np.select([ftr == 'H', ftr == 'D'], [3, 1], 0))
+    np.add.at(points, away, np.select([ftr == 'A', ftr == 'D'], [3, 1], 0))
+    return points
+
+
+def generate_league_tree(base_path, n_teams, n_seasons, n_leagues=1, country=SYNTHETIC_COUNTRY,
+                         last_season_end_year=analysis_1.CURRENT_SEASON_END_YEAR, seed=SEED, draw_rate=DRAW_RATE):
+    """
+    Zapisuje syntetyczne ligi kraju do base_path/<sezon>/<kraj>/<liga>.csv (ligi L1, L2, ...).
+    Po każdym sezonie PROMOTED_TEAMS najsłabszych drużyn ligi spada, a tyle samo najlepszych z niższej awansuje;
+    siła i skłonność do remisów są cechami drużyny (przechodzą z nią między ligami).
+    Zwraca (kody lig, sezony chronologicznie, liczba meczów).
+    """
+    rng = np.random.default_rng(seed)
+    league_codes = [f"L{level + 1}" for level in range(n_leagues)]
+    all_teams = [f"Team {i + 1:03d}" for i in range(n_teams * n_leagues)]
+    strength = dict(zip(all_teams, rng.normal(0, TEAM_STRENGTH_STD, len(all_teams))))
+    draw_bias = dict(zip(all_teams, rng.normal(0, TEAM_DRAW_STD, len(all_teams))))
+    divisions = [all_teams[level * n_teams:(level + 1) * n_teams] for level in range(n_leagues)]
+    seasons = [f"{year}-{year + 1}" for year in range(last_season_end_year - n_seasons, last_season_end_year)]
+
+    n_matches = 0
+    for season in seasons:
+        standings = []
+        for league_code, teams in zip(league_codes, divisions):
+            season_df = generate_season(teams, season, league_code, rng, draw_rate,
+                                        np.array([strength[t] for t in teams]), np.array([draw_bias[t] for t in teams]))
+            output_path = match_store.get_source_path(base_path, season, country, league_code)
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            season_df.to_csv(output_path, index=False)
+            n_matches += len(season_df)
+            order = np.argsort(-season_points(season_df, teams), kind='stable')
+            standings.append([teams[i] for i in order])
+        # Awanse i spadki między sąsiednimi ligami
+        for level in range(n_leagues - 1):
+            relegated, promoted = standings[level][-PROMOTED_TEAMS:], standings[level + 1][:PROMOTED_TEAMS]
+            standings[level] = standings[level][:-PROMOTED_TEAMS] + promoted
+            standings[level + 1] = relegated + standings[level + 1][PROMOTED_TEAMS:]
+        divisions = standings
+    return league_codes, seasons, n_matches
+
+
+# --- POMIARY ETAPÓW ---
+
+def time_stage(fn, repeat=REPEAT, warmup=False):
+    """
+    Mierzy fn() `repeat` razy (bez wypisywanych komunikatów). Zwraca (statystyki czasu, wynik ostatniego wywołania).
+    warmup - jedno wywołanie przed pomiarem (np. kompilacja kernela Numba nie jest liczona do czasu etapu).
+    """
+    timings = []
+    value = None
+    for i in range(-1 if warmup else 0, repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            value = fn()
+            if i >= 0:
+                timings.append(time.perf_counter() - start)
+    return {'min_s': round(min(timings), 6), 'median_s': round(statistics.median(timings), 6), 'repeat': repeat}, value
+
+
+def use_data_path(base_path):
+    """Przestawia ścieżki modułów analizy i symulacji na folder z danymi syntetycznymi."""
+    analysis_1.BASE_PATH = base_path
+    sim.BASE_PATH = base_path
+    sim.SIMULATION_OUTPUT_BASE_PATH = base_path / "symulacja_1"
+
+
+def collect_picks(country, league_codes, seasons):
+    """Ścieżki progresji wybranych drużyn ze wszystkich sezonów (dane wejściowe etapu progresji)."""
+    paths, odds_paths, frames = [], [], []
+    for league_code in league_codes:
+        for season in seasons:
+            schedule = sim.load_team_match_data(country, league_code, season)
+            picks = sim.select_scenario_picks(sim.compute_mid_season_stats(schedule))
+            for team, start in zip(picks['Team'], picks['StartIndex']):
+                paths.append(schedule.results_of(team)[start:] == team_schedule.RESULT_DRAW)
+                odds_paths.append(schedule.team_values(team, 'DrawOdds')[start:])
+                frames.append(schedule.team_matches(team).iloc[start:])
+    return paths, odds_paths, frames
+
+
+def run_scale(base_path, scale, repeat=REPEAT, seed=SEED, draw_rate=DRAW_RATE):
+    """Generuje dane jednej skali w base_path i mierzy wszystkie etapy. Zwraca słownik wyników skali."""
+    country = SYNTHETIC_COUNTRY
+    use_data_path(base_path)
+    stages = {}
+
+    stages['generate'], (league_codes, seasons, n_matches) = time_stage(
+        lambda: generate_league_tree(base_path, scale['teams'], scale['seasons'], scale['leagues'],
+                                     seed=seed, draw_rate=draw_rate), repeat=1)
+
+    # Wczytanie: konwersja CSV -> magazyn kolumnowy i odczyt wszystkich sezonów lig
+    stages['ingest'], _ = time_stage(lambda: match_store.ingest_all(base_path, force=True), repeat)
+    stages['load'], frames = time_stage(lambda: [
+        match_store.load_league(base_path, country, league_code, seasons, columns=analysis_1.REQUIRED_COLUMNS)
+        for league_code in league_codes], repeat)
+    frames = [df.sort_values('Date', kind='stable').reset_index(drop=True) for df in frames]
+
+    # Statystyki drużyn (calculate_team_stats liczy je dla wszystkich drużyn naraz) i pełna analiza ligi
+    stages['team_stats'], _ = time_stage(lambda: [draw_stats.calculate_all_team_stats(df) for df in frames], repeat)
+    analysis_output = base_path / "analiza_1"
+    stages['analyze_league'], _ = time_stage(lambda: [
+        analysis_1.analyze_league(country, league_code, seasons, analysis_output, use_cache=False)
+        for league_code in league_codes], repeat)
+
+    # Symulacja: profil połowy sezonu, progresje (kernel tablicowy i pętla simulate_fibonacci_progression)
+    def profile_all():
+        return [sim.compute_mid_season_stats(sim.load_team_match_data(country, league_code, season))
+                for league_code in league_codes for season in seasons]
+    stages['mid_season_profile'], _ = time_stage(profile_all, repeat)
+
+    paths, odds_paths, pick_frames = collect_picks(country, league_codes, seasons)
+    draw_flags, lengths = progression.pack_draw_flags(paths)
+    match_odds = progression.pack_match_odds(odds_paths)
+    stages['progression'], _ = time_stage(
+        lambda: progression.simulate_progressions(draw_flags, lengths, sim.FIBONACCI_SEQUENCE, match_odds), repeat, warmup=True)
+    stages['progression_loop'], _ = time_stage(lambda: [
+        sim.simulate_fibonacci_progression(frame, sim.FIBONACCI_SEQUENCE, frame['DrawOdds'].to_numpy())
+        for frame in pick_frames], repeat)
+
+    stages['simulate_league'], _ = time_stage(lambda: [
+        sim.analyze_and_simulate_league(country, league_code, seasons) for league_code in league_codes], repeat)
+    results_df = pd.concat([pd.DataFrame(sim.simulate_league_season(country, league_code, season))
+                            for league_code in league_codes for season in seasons], ignore_index=True)
+    stages['write'], _ = time_stage(lambda: sim.write_league_results(country, league_codes[0], results_df), repeat)
+
+    return {'params': {**scale, 'seed': seed, 'draw_rate': draw_rate},
+            'rows': {'matches': n_matches, 'progressions': len(paths), 'results': len(results_df)},
+            'stages': stages}
+
+
+def run_benchmark(scale_names, repeat=REPEAT, seed=SEED, draw_rate=DRAW_RATE, data_dir=None):
+    """Uruchamia wybrane skale (każda w osobnym folderze danych) i zwraca raport do zapisu w JSON."""
+    report = {
+        'meta': {
+            'created': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'progression_engine': 'numba' if progression.numba is not None else 'numpy',
+        },
+        'scales': {},
+    }
+    with tempfile.TemporaryDirectory(prefix="benchmark_") as tmp_dir:
+        root = Path(data_dir) if data_dir is not None else Path(tmp_dir)
+        for name in scale_names:
+            print(f"\n--- Skala {name}: {BENCHMARK_SCALES[name]} ---")
+            report['scales'][name] = run_scale(root / name, BENCHMARK_SCALES[name], repeat, seed, draw_rate)
+            for stage, timing in report['scales'][name]['stages'].items():
+                print(f"  {stage:<20} {timing['min_s']:>10.4f} s")
+    return report
+
+
+def compare_with_baseline(report, baseline, tolerance=REGRESSION_TOLERANCE, min_seconds=MIN_REGRESSION_SECONDS):
+    """
+    Porównanie z wzorcem (min_s każdego etapu); różnice mniejsze niż min_seconds nie są regresją.
+    Zwraca DataFrame: Scale, Stage, Baseline (s), Current (s), Ratio i Status ('regresja' / 'poprawa' / 'bez zmian').
+    """
+    rows = []
+    for scale, result in report['scales'].items():
+        baseline_stages = baseline.get('scales', {}).get(scale, {}).get('stages', {})
+        for stage, timing in result['stages'].items():
+            if stage not in baseline_stages:
+                continue
+            before, now = baseline_stages[stage]['min_s'], timing['min_s']
+            ratio = now / before if before > 0 else float('inf')
+            if abs(now - before) < min_seconds:
+                status = 'bez zmian'
+            else:
+                status = 'regresja' if ratio > 1 + tolerance else ('poprawa' if ratio < 1 - tolerance else 'bez zmian')
+            rows.append({'Scale': scale, 'Stage': stage, 'Baseline (s)': before, 'Current (s)': now,
+                         'Ratio': round(ratio, 3), 'Status': status})
+    return pd.DataFrame(rows, columns=['Scale', 'Stage', 'Baseline (s)', 'Current (s)', 'Ratio', 'Status'])
+
+
+def parse_benchmark_args(argv=None):
+    """Argumenty wiersza poleceń benchmarku."""
+    parser = argparse.ArgumentParser(description="Benchmark analizy i symulacji na syntetycznych ligach.")
+    parser.add_argument('--scales', nargs='+', default=list(BENCHMARK_SCALES), choices=list(BENCHMARK_SCALES))
+    parser.add_argument('--repeat', type=int, default=REPEAT, help="Liczba powtórzeń każdego etapu")
+    parser.add_argument('--seed', type=int, default=SEED)
+    parser.add_argument('--draw-rate', type=float, default=DRAW_RATE, help="Średni odsetek remisów w generatorze")
+    parser.add_argument('--output', type=Path, default=BENCHMARK_OUTPUT, help="Plik JSON z wynikami przebiegu")
+    parser.add_argument('--baseline', type=Path, default=None, help="Plik JSON wzorca do porównania")
+    parser.add_argument('--tolerance', type=float, default=REGRESSION_TOLERANCE,
+                        help="Dopuszczalny wzrost czasu etapu względem wzorca (ułamek)")
+    parser.add_argument('--fail-on-regression', action='store_true', help="Kod wyjścia 1, jeśli wykryto regresję")
+    parser.add_argument('--data-dir', type=Path, default=None,
+                        help="Folder na dane syntetyczne (domyślnie tymczasowy, usuwany po przebiegu)")
+    return parser.parse_args(argv)
+
+
+# --- GŁÓWNA PĘTLA WYKONAWCZA ---
+
+if __name__ == "__main__":
+    args = parse_benchmark_args()
+    report = run_benchmark(args.scales, args.repeat, args.seed, args.draw_rate, args.data_dir)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Wyniki benchmarku zapisano w: {args.output}")
+
+    if args.baseline is not None:
+        with open(args.baseline, encoding="utf-8") as f:
+            comparison = compare_with_baseline(report, json.load(f), args.tolerance)
+        print(comparison.to_string(index=False))
+        if args.fail_on_regression and (comparison['Status'] == 'regresja').any():
+            sys.exit(1)
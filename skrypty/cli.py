@@ -0,0 +1,164 @@
+import argparse
+import os
+import sys
+from pathlib import Path
+
+# Moduły symulacji leżą w podfolderze symulation_1/
+sys.path.insert(0, str(Path(__file__).resolve().parent / "symulation_1"))
+
+import project_config
+
+# --- JEDNO WEJŚCIE DO WSZYSTKICH SKRYPTÓW ---
+#
+#   python cli.py [--config ustawienia.toml] [--data-root DIR] [--season-end-year 2025] <polecenie> [opcje]
+#
+# Polecenia: download (download.py), analyze (analysis_1.py), simulate (symulation_1.py),
+# report (visualization.py), monitor (streak_monitor.py). Folder danych, okno sezonów i zestaw lig pochodzą kolejno z flag,
+# sekcji polecenia w pliku konfiguracji, głównych kluczy pliku i wartości domyślnych (project_config).
+# Pozostałe opcje (np. --workers, --force, --stage-log) trafiają bez zmian do parsera skryptu.
+#
+# Przykładowy plik ustawienia.toml:
+#   data_root = "/srv/football_data"
+#   current_season_end_year = 2025
+#   [analyze]
+#   seasons = 5
+#   leagues = ["England", "D1"]
+#   args = ["--workers", "4"]
+#   [simulate]
+#   seasons = 24
+
+
+def build_parser():
+    """Parser wspólnych opcji i poleceń."""
+    parser = argparse.ArgumentParser(description="Pobieranie, analiza, symulacja i wykresy remisów.", allow_abbrev=False)
+    parser.add_argument('--config', type=Path, default=None, help="Plik konfiguracji (.toml albo .json)")
+    parser.add_argument('--data-root', type=Path, default=None,
+                        help=f"Folder z danymi (domyślnie {project_config.DATA_PATH_ENV} albo {project_config.BASE_PATH})")
+    parser.add_argument('--season-end-year', type=int, default=None,
+                        help="Rok zakończenia bieżącego sezonu (np. 2025 dla 2024-2025)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    download_parser = commands.add_parser('download', help="Pobieranie plików CSV", allow_abbrev=False)
+    download_parser.add_argument('--start-year', type=int, default=None, help="Rok rozpoczęcia najstarszego sezonu")
+    download_parser.add_argument('--leagues', nargs='+', default=None, help="Ligi lub kraje, np. E0 Germany Spain/SP2")
+
+    for name, help_text in [('analyze', "Analiza remisów drużyn (analysis_1.py)"),
+                            ('simulate', "Symulacja progresji (symulation_1.py)"),
+                            ('monitor', "Przyrostowy monitor serii bez remisu (streak_monitor.py)")]:
+        command_parser = commands.add_parser(name, help=help_text, allow_abbrev=False)
+        command_parser.add_argument('--seasons', type=int, default=None, help="Liczba ostatnich sezonów")
+        command_parser.add_argument('--leagues', nargs='+', default=None, help="Ligi lub kraje, np. E0 Germany")
+
+    report_parser = commands.add_parser('report', help="Wykresy wyników symulacji (visualization.py)", allow_abbrev=False)
+    report_parser.add_argument('--leagues', nargs='+', default=None, help="Ligi lub kraje, np. E0 Germany")
+    return parser
+
+
+def resolve_settings(args, file_settings):
+    """Ustawienia polecenia: flaga > sekcja polecenia w pliku > klucz główny pliku > wartość domyślna."""
+    section = file_settings.get(args.command, {})
+
+    def pick(flag_value, key, default=None):
+        if flag_value is not None:
+            return flag_value
+        return section.get(key, file_settings.get(key, default))
+
+    return {
+        'data_root': Path(pick(args.data_root, 'data_root', project_config.BASE_PATH)),
+        'season_end_year': int(pick(args.season_end_year, 'current_season_end_year',
+                                    project_config.CURRENT_SEASON_END_YEAR)),
+        'seasons': pick(getattr(args, 'seasons', None), 'seasons'),
+        'leagues': pick(getattr(args, 'leagues', None), 'leagues'),
+        'start_year': pick(getattr(args, 'start_year', None), 'start_year'),
+        'script_args': [str(arg) for arg in section.get('args', [])],
+    }
+
+
+def use_data_root(data_root):
+    """Ustawia folder danych w bieżącym procesie i - przez zmienną środowiskową - w procesach roboczych."""
+    os.environ[project_config.DATA_PATH_ENV] = str(data_root)
+    project_config.BASE_PATH = data_root
+
+    import match_store
+
+    match_store.BASE_PATH = data_root
+
+
+# --- POLECENIA ---
+
+def run_download(settings, script_args):
+    import download
+
+    download.TARGET_DIR = str(settings['data_root'])
+    download.END_YEAR = settings['season_end_year'] - 1
+    if settings['start_year'] is not None:
+        download.START_YEAR = int(settings['start_year'])
+    download.TOP_LEAGUES = project_config.select_leagues(download.TOP_LEAGUES, settings['leagues'])
+    download.main(script_args)
+
+
+def run_analyze(settings, script_args):
+    import analysis_1
+
+    analysis_1.BASE_PATH = settings['data_root']
+    analysis_1.CURRENT_SEASON_END_YEAR = settings['season_end_year']
+    if settings['seasons'] is not None:
+        analysis_1.X_SEASONS = int(settings['seasons'])
+    analysis_1.COUNTRIES_LEAGUES = project_config.select_leagues(analysis_1.COUNTRIES_LEAGUES, settings['leagues'])
+    analysis_1.main(script_args)
+
+
+def run_simulate(settings, script_args):
+    import symulation_1 as sim
+
+    sim.BASE_PATH = settings['data_root']
+    sim.SIMULATION_OUTPUT_BASE_PATH = settings['data_root'] / project_config.SIMULATION_DIRNAME
+    sim.CURRENT_SEASON_END_YEAR = settings['season_end_year']
+    if settings['seasons'] is not None:
+        sim.X_SEASONS = int(settings['seasons'])
+    sim.COUNTRIES_LEAGUES = project_config.select_leagues(sim.COUNTRIES_LEAGUES, settings['leagues'])
+    sim.main(script_args)
+
+
+def run_report(settings, script_args):
+    import visualization
+
+    visualization.BASE_PATH = settings['data_root']
+    visualization.SIMULATION_OUTPUT_BASE_PATH = settings['data_root'] / project_config.SIMULATION_DIRNAME
+    if settings['leagues'] and '--leagues' not in script_args:
+        selected = project_config.select_leagues(project_config.LEAGUE_SETS['simulation'], settings['leagues'])
+        script_args = script_args + ['--leagues'] + [f"{country}_{league}" for country, leagues in selected.items()
+                                                     for league in leagues]
+    visualization.main(script_args)
+
+
+def run_monitor(settings, script_args):
+    import streak_monitor
+
+    project_config.CURRENT_SEASON_END_YEAR = settings['season_end_year']
+    if settings['seasons'] is not None:
+        streak_monitor.X_SEASONS = int(settings['seasons'])
+    if settings['leagues'] and '--leagues' not in script_args:
+        script_args = script_args + ['--leagues'] + list(settings['leagues'])
+    streak_monitor.main(script_args)
+
+
+COMMAND_RUNNERS = {
+    'download': run_download,
+    'analyze': run_analyze,
+    'simulate': run_simulate,
+    'report': run_report,
+    'monitor': run_monitor,
+}
+
+
+def main(argv=None):
+    args, script_args = build_parser().parse_known_args(argv)
+    file_settings = project_config.read_config_file(args.config) if args.config is not None else {}
+    settings = resolve_settings(args, file_settings)
+    use_data_root(settings['data_root'])
+    COMMAND_RUNNERS[args.command](settings, settings['script_args'] + script_args)
+
+
+if __name__ == "__main__":
+    main()
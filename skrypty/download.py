@@ -1,49 +1,231 @@
+import argparse
+import functools
+import hashlib
+import json
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import project_config
 
-TARGET_DIR = "D:/football_data"
+TARGET_DIR = str(project_config.BASE_PATH)
 START_YEAR = 2000
-END_YEAR = 2024
+END_YEAR = project_config.CURRENT_SEASON_END_YEAR - 1  # rok rozpoczęcia bieżącego sezonu
+
+# Adres źródła danych. Dla testów można wskazać lokalny serwer z kopią football_data/
+# (np. --base-url http://localhost:8000 --url-template MIRROR_URL_TEMPLATE, serwer: --serve).
+BASE_URL = "https://www.football-data.co.uk/mmz4281"
+URL_TEMPLATE = "{base_url}/{season_code}/{league_code}.csv"
+MIRROR_URL_TEMPLATE = "{base_url}/{season_folder}/{country}/{league_code}.csv"
+
+# Parametry połączeń: pula sesji, limit czasu i ponowienia z wykładniczym opóźnieniem
+WORKERS = 8
+TIMEOUT = 30
+RETRIES = 4
+BACKOFF_FACTOR = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Manifest pobierania (ETag / Last-Modified / skrót pliku) - pozwala wznowić przerwany przebieg
+# i wysyłać zapytania warunkowe zamiast pobierać niezmienione pliki od nowa
+MANIFEST_FILENAME = "download_manifest.json"
 
 # Najpopularniejsze ligi dla danego kraju
-TOP_LEAGUES = {
-    "England": ["E0", "E1", "E2"],
-    "Germany": ["D1", "D2", "D3"],
-    "Italy": ["I1", "I2"],
-    "Spain": ["SP1", "SP2"],
-    "France": ["F1", "F2"],
-    "Scotland": ["SC0", "SC1", "SC2"],
-    "Netherlands": ["N1"],
-    "Belgium": ["B1"],
-    "Portugal": ["P1"],
-    "Turkey": ["T1"],
-    "Greece": ["G1"]
-}
-
-def download_csv(url, output_path):
-    try:
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        response = requests.get(url)
-        if response.status_code == 200:
-            with open(output_path, "wb") as f:
-                f.write(response.content)
-            print(f"Pobrano: {url}")
-        else:
-            print(f"Brak pliku: {url}")
-    except Exception as e:
-        print(f"Błąd przy pobieraniu {url}: {e}")
+TOP_LEAGUES = project_config.LEAGUE_SETS['download']
+
+
+def build_session(workers=WORKERS, retries=RETRIES, backoff_factor=BACKOFF_FACTOR):
+    """Sesja HTTP z pulą połączeń na wszystkie wątki i automatycznymi ponowieniami."""
+    retry = Retry(total=retries, backoff_factor=backoff_factor, status_forcelist=RETRY_STATUSES,
+                  allowed_methods=["GET"], raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
 
-def main():
-    for year in range(END_YEAR, START_YEAR - 1, -1):
+
+def build_jobs(start_year, end_year, base_url=BASE_URL, url_template=URL_TEMPLATE, target_dir=TARGET_DIR):
+    """Lista plików do pobrania: słowniki z adresem URL i ścieżką zapisu (najnowsze sezony najpierw)."""
+    jobs = []
+    for year in range(end_year, start_year - 1, -1):
         next_year = year + 1
         season_code = f"{str(year)[-2:]}{str(next_year)[-2:]}"  # np. '2324'
         season_folder = f"{year}-{next_year}"                   # np. '2023-2024'
 
         for country, leagues in TOP_LEAGUES.items():
             for league_code in leagues:
-                url = f"https://www.football-data.co.uk/mmz4281/{season_code}/{league_code}.csv"
-                save_path = os.path.join(TARGET_DIR, season_folder, country, f"{league_code}.csv")
-                download_csv(url, save_path)
+                url = url_template.format(base_url=base_url.rstrip("/"), season_code=season_code,
+                                          season_folder=season_folder, country=country, league_code=league_code)
+                save_path = os.path.join(target_dir, season_folder, country, f"{league_code}.csv")
+                jobs.append({"url": url, "path": save_path, "key": f"{season_folder}/{country}/{league_code}",
+                             # Brakujące pliki bieżącego sezonu mogą się jeszcze pojawić - sprawdzamy je zawsze
+                             "recheck_missing": year == end_year})
+    return jobs
+
+
+def load_manifest(manifest_path):
+    """Wczytuje manifest pobierania; pusty, jeśli nie istnieje albo jest uszkodzony."""
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest_path, manifest):
+    """Zapisuje manifest atomowo - przerwany przebieg nie zostawia uszkodzonego pliku."""
+    os.makedirs(os.path.dirname(manifest_path) or ".", exist_ok=True)
+    tmp_path = f"{manifest_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+def conditional_headers(entry, output_path):
+    """
+    Nagłówki zapytania warunkowego dla istniejącego pliku. Plik zgodny z manifestem (rozmiar)
+    sprawdzamy po ETag / Last-Modified, plik bez wpisu (np. pobrany starą wersją skryptu) - po dacie
+    modyfikacji, a plik niezgodny z manifestem (uszkodzony, przerwany zapis) pobieramy od nowa.
+    """
+    if not os.path.exists(output_path):
+        return {}
+    if not entry or entry.get("missing"):
+        return {"If-Modified-Since": time.strftime("%a, %d %b %Y %H:%M:%S GMT",
+                                                   time.gmtime(os.path.getmtime(output_path)))}
+    if entry.get("size") != os.path.getsize(output_path):
+        return {}
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def download_csv(session, url, output_path, entry=None, timeout=TIMEOUT, force=False):
+    """
+    Pobiera jeden plik (zapytaniem warunkowym, jeśli to możliwe) i zapisuje go atomowo.
+    Zwraca (status, wpis manifestu); status: 'downloaded', 'unchanged', 'missing' albo 'error'.
+    """
+    headers = {} if force else conditional_headers(entry, output_path)
+    try:
+        response = session.get(url, headers=headers, timeout=timeout)
+    except requests.RequestException as e:
+        return "error", {**(entry or {}), "error": f"{type(e).__name__}: {e}"}
+
+    checked = {"checked_at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    if response.status_code == 304:
+        return "unchanged", {**(entry or {}), **checked, "size": os.path.getsize(output_path)}
+    if response.status_code == 404:
+        return "missing", {**checked, "missing": True}
+    if response.status_code != 200:
+        return "error", {**(entry or {}), "error": f"HTTP {response.status_code}"}
+
+    content = response.content
+    sha256 = hashlib.sha256(content).hexdigest()
+    new_entry = {
+        **checked,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "size": len(content),
+        "sha256": sha256,
+    }
+    # Serwer bez obsługi nagłówków warunkowych odeśle cały plik - nie nadpisujemy go, jeśli treść się nie zmieniła
+    if entry and entry.get("sha256") == sha256 and os.path.exists(output_path):
+        return "unchanged", new_entry
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    tmp_path = f"{output_path}.part"
+    with open(tmp_path, "wb") as f:
+        f.write(content)
+    os.replace(tmp_path, output_path)
+    return "downloaded", new_entry
+
+
+def run_downloads(jobs, manifest_path, workers=WORKERS, timeout=TIMEOUT, retries=RETRIES, force=False):
+    """
+    Pobiera pliki równolegle (ograniczona liczba wątków, wspólna sesja) i na bieżąco aktualizuje manifest.
+    Pliki oznaczone w manifeście jako nieistniejące na serwerze są pomijane (poza bieżącym sezonem i force).
+    Zwraca słownik {status: liczba plików}.
+    """
+    manifest = load_manifest(manifest_path)
+    counts = {"downloaded": 0, "unchanged": 0, "missing": 0, "error": 0, "skipped": 0}
+    pending = []
+    for job in jobs:
+        entry = manifest.get(job["key"])
+        if not force and entry and entry.get("missing") and not job["recheck_missing"]:
+            counts["skipped"] += 1
+        else:
+            pending.append(job)
+
+    session = build_session(workers, retries)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(download_csv, session, job["url"], job["path"], manifest.get(job["key"]), timeout, force): job
+            for job in pending
+        }
+        for future in as_completed(futures):
+            job = futures[future]
+            status, entry = future.result()
+            counts[status] += 1
+            manifest[job["key"]] = {**entry, "url": job["url"]}
+            if status == "downloaded":
+                print(f"Pobrano: {job['url']}")
+                save_manifest(manifest_path, manifest)
+            elif status == "error":
+                print(f"Błąd przy pobieraniu {job['url']}: {entry['error']}")
+    save_manifest(manifest_path, manifest)
+    return counts
+
+
+def serve_directory(directory, port=8000):
+    """Lokalny serwer HTTP z kopią football_data/ (obsługuje If-Modified-Since) do testowania pobierania."""
+    handler = functools.partial(SimpleHTTPRequestHandler, directory=directory)
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    print(f"Serwuję {directory} pod adresem http://127.0.0.1:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pobieranie plików CSV z football-data.co.uk.")
+    parser.add_argument("--target-dir", default=TARGET_DIR, help="Folder docelowy danych")
+    parser.add_argument("--base-url", default=BASE_URL, help="Adres źródła (np. lokalny serwer testowy)")
+    parser.add_argument("--url-template", default=URL_TEMPLATE,
+                        help=f"Wzorzec adresu pliku; dla kopii football_data/: {MIRROR_URL_TEMPLATE}")
+    parser.add_argument("--start-year", type=int, default=START_YEAR)
+    parser.add_argument("--end-year", type=int, default=END_YEAR)
+    parser.add_argument("--current-season", action="store_true",
+                        help="Odśwież tylko bieżący sezon (END_YEAR)")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="Liczba równoległych pobrań")
+    parser.add_argument("--timeout", type=float, default=TIMEOUT, help="Limit czasu zapytania (s)")
+    parser.add_argument("--retries", type=int, default=RETRIES, help="Liczba ponowień przy błędach")
+    parser.add_argument("--force", action="store_true", help="Pobierz wszystko od nowa, bez zapytań warunkowych")
+    parser.add_argument("--serve", action="store_true",
+                        help="Zamiast pobierać, uruchom lokalny serwer HTTP z folderem --target-dir")
+    parser.add_argument("--port", type=int, default=8000, help="Port lokalnego serwera (--serve)")
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        serve_directory(args.target_dir, args.port)
+        return
+
+    start_year = args.end_year if args.current_season else args.start_year
+    jobs = build_jobs(start_year, args.end_year, args.base_url, args.url_template, args.target_dir)
+    manifest_path = os.path.join(args.target_dir, MANIFEST_FILENAME)
+    counts = run_downloads(jobs, manifest_path, args.workers, args.timeout, args.retries, args.force)
+    print(f"\nPobrane: {counts['downloaded']} | bez zmian: {counts['unchanged']} | brak na serwerze: "
+          f"{counts['missing']} | pominięte: {counts['skipped']} | błędy: {counts['error']}")
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,290 @@
+import numpy as np
+import pandas as pd
+
+import team_schedule
+
+# Kolumny pliku wynikowego analizy (kolejność jak w dotychczasowych plikach *_analiza_remisow.csv)
+OUTPUT_COLUMNS = [
+    'Team', 'Total Matches', 'Total Draws', 'Draw Percentage (%)', 'Current Streak Without Draw',
+    'Longest Streak Without Draw', 'Average Streak Without Draw', 'Draw Consistency (Std Dev %)',
+    'Draw Trend (Slope)',
+]
+
+
+def to_team_match_long(matches_df, group_keys=()):
+    """
+    Przekształca ramkę meczów (jeden wiersz = jeden mecz, posortowana chronologicznie)
+    do formatu "long": jeden wiersz na parę drużyna-mecz.
+    Kolejność meczów drużyny odpowiada kolejności wierszy w ramce wejściowej.
+    """
+    group_keys = list(group_keys)
+    n = len(matches_df)
+    position = np.arange(n)
+    base = {key: np.tile(matches_df[key].to_numpy(), 2) for key in group_keys}
+
+    long_df = pd.DataFrame({
+        **base,
+        'Team': np.concatenate([matches_df['HomeTeam'].to_numpy(dtype=object), matches_df['AwayTeam'].to_numpy(dtype=object)]),
+        'Season': np.tile(matches_df['Season'].to_numpy(dtype=object), 2),
+        'is_draw': np.tile((matches_df['FTR'] == 'D').to_numpy(dtype=bool), 2),
+        'position': np.concatenate([position, position]),
+        # Kolejność pierwszego pojawienia się drużyny: najpierw gospodarze, potem goście
+        'appearance': np.concatenate([position, position + n]),
+    })
+    long_df = long_df[long_df['Team'].notna()]
+    return long_df.sort_values(by=group_keys + ['Team', 'position'], kind='stable').reset_index(drop=True)
+
+
+def seasonal_draw_trends(seasonal, n_teams):
+    """
+    Stałość (odchylenie standardowe) i trend (nachylenie) % remisów drużyn w kolejnych sezonach.
+    seasonal - ramka z kolumnami team_id, Season, draw_percentage (sezony drużyny chronologicznie).
+    """
+    seasonal = seasonal.copy()
+    seasonal['x'] = seasonal['Season'].str.split('-').str[0].astype(float)
+    by_team = seasonal.groupby('team_id')
+    draw_consistency_std_dev = by_team['draw_percentage'].std().reindex(range(n_teams)).to_numpy()
+
+    # Nachylenie prostej regresji (jak np.polyfit stopnia 1), tylko przy co najmniej 2 sezonach
+    seasonal['dx'] = seasonal['x'] - by_team['x'].transform('mean')
+    seasonal['dy'] = seasonal['draw_percentage'] - by_team['draw_percentage'].transform('mean')
+    sxy = (seasonal['dx'] * seasonal['dy']).groupby(seasonal['team_id']).sum().reindex(range(n_teams)).to_numpy()
+    sxx = (seasonal['dx'] ** 2).groupby(seasonal['team_id']).sum().reindex(range(n_teams)).to_numpy()
+    n_seasons = by_team.size().reindex(range(n_teams)).to_numpy()
+    draw_trend_slope = np.divide(sxy, sxx, out=np.zeros(n_teams), where=(n_seasons > 1) & (sxx > 0))
+    return draw_consistency_std_dev, draw_trend_slope
+
+
+def format_team_stats(stats):
+    """Zaokrąglenia i kolejność kolumn jak w plikach *_analiza_remisow.csv."""
+    return pd.DataFrame({
+        'Team': stats['Team'],
+        'Total Matches': stats['Total Matches'],
+        'Total Draws': stats['Total Draws'],
+        'Draw Percentage (%)': np.round(stats['Draw Percentage (%)'], 2),
+        'Current Streak Without Draw': stats['Current Streak Without Draw'],
+        'Longest Streak Without Draw': stats['Longest Streak Without Draw'],
+        'Average Streak Without Draw': np.round(stats['Average Streak Without Draw'], 2),
+        'Draw Consistency (Std Dev %)': np.round(stats['Draw Consistency (Std Dev %)'], 2),
+        # + 0.0 zamienia ujemne zero z błędów zaokrągleń na 0.0
+        'Draw Trend (Slope)': np.round(stats['Draw Trend (Slope)'], 4) + 0.0,
+    })
+
+
+def calculate_all_team_stats(matches_df, group_keys=()):
+    """
+    Oblicza statystyki remisowe dla wszystkich drużyn (i wszystkich lig, jeśli podano group_keys)
+    w jednym zgrupowanym, wektorowym przebiegu zamiast pętli po drużynach.
+    Zwraca ramkę z kolumnami group_keys + OUTPUT_COLUMNS, drużyny w kolejności pierwszego pojawienia się.
+    """
+    group_keys = list(group_keys)
+    long_df = to_team_match_long(matches_df, group_keys)
+    if long_df.empty:
+        return pd.DataFrame(columns=group_keys + OUTPUT_COLUMNS)
+
+    team_keys = group_keys + ['Team']
+    is_draw = long_df['is_draw'].to_numpy()
+    team_id = long_df.groupby(team_keys, sort=False).ngroup().to_numpy()
+    n_teams = team_id.max() + 1
+
+    # Podstawowe statystyki
+    total_matches = np.bincount(team_id, minlength=n_teams)
+    total_draws = np.bincount(team_id, weights=is_draw, minlength=n_teams).astype(int)
+    draw_percentage = total_draws / total_matches * 100
+
+    # Serie (run-length): nowa seria zaczyna się przy zmianie drużyny lub zmianie remis/brak remisu
+    new_run = np.ones(len(long_df), dtype=bool)
+    new_run[1:] = (team_id[1:] != team_id[:-1]) | (is_draw[1:] != is_draw[:-1])
+    run_starts = np.flatnonzero(new_run)
+    run_lengths = np.diff(np.append(run_starts, len(long_df)))
+    run_team = team_id[run_starts]
+    run_is_draw = is_draw[run_starts]
+
+    no_draw = ~run_is_draw
+    no_draw_count = np.bincount(run_team[no_draw], minlength=n_teams)
+    no_draw_sum = np.bincount(run_team[no_draw], weights=run_lengths[no_draw], minlength=n_teams)
+    longest_streak = np.zeros(n_teams, dtype=int)
+    np.maximum.at(longest_streak, run_team[no_draw], run_lengths[no_draw])
+    avg_streak = np.divide(no_draw_sum, no_draw_count, out=np.zeros(n_teams), where=no_draw_count > 0)
+
+    # Aktualna seria bez remisu = długość ostatniej serii drużyny, o ile nie jest to seria remisów
+    last_run = np.r_[np.flatnonzero(run_team[1:] != run_team[:-1]), len(run_team) - 1]
+    current_streak = np.where(run_is_draw[last_run], 0, run_lengths[last_run])
+
+    # Stałość i trend remisów na podstawie % remisów w poszczególnych sezonach
+    seasonal = long_df.assign(team_id=team_id).groupby(['team_id', 'Season'], sort=False)['is_draw'].mean() * 100
+    seasonal = seasonal.reset_index(name='draw_percentage')
+    draw_consistency_std_dev, draw_trend_slope = seasonal_draw_trends(seasonal, n_teams)
+
+    first = long_df.groupby(team_id, sort=False).agg({**{k: 'first' for k in team_keys}, 'appearance': 'min'})
+    results = pd.concat([first[group_keys].reset_index(drop=True), format_team_stats({
+        'Team': first['Team'].to_numpy(),
+        'Total Matches': total_matches,
+        'Total Draws': total_draws,
+        'Draw Percentage (%)': draw_percentage,
+        'Current Streak Without Draw': current_streak,
+        'Longest Streak Without Draw': longest_streak,
+        'Average Streak Without Draw': avg_streak,
+        'Draw Consistency (Std Dev %)': draw_consistency_std_dev,
+        'Draw Trend (Slope)': draw_trend_slope,
+    })], axis=1)
+    results = results.iloc[np.argsort(first['appearance'].to_numpy(), kind='stable')]
+    return results[group_keys + OUTPUT_COLUMNS].reset_index(drop=True)
+
+
+# --- CZĄSTKOWE AGREGATY (DRUŻYNA, SEZON) DLA ANALIZY PRZYROSTOWEJ ---
+#
+# Statystyki z wielu sezonów składamy z agregatów policzonych osobno dla każdego sezonu,
+# więc po nowej kolejce wystarczy przeliczyć tylko bieżący sezon. Serie bez remisu mogą
+# przechodzić przez granicę sezonów, dlatego dla sezonu zapamiętujemy serię otwierającą
+# (przed pierwszym remisem), zamykającą (po ostatnim remisie) i pełne serie pomiędzy remisami.
+
+SEASON_AGGREGATE_COLUMNS = [
+    'Team', 'Season', 'Matches', 'Draws', 'LeadingNoDraw', 'TrailingNoDraw',
+    'InnerRuns', 'InnerRunSum', 'InnerRunMax', 'FirstHome', 'FirstAway',
+]
+
+
+def season_team_aggregates(matches_df, schedule=None):
+    """
+    Agregaty cząstkowe (drużyna, sezon) z meczów jednego sezonu posortowanych chronologicznie.
+    Korzysta z indeksu terminarzy (zbudowanego tutaj, jeśli nie podano schedule).
+    FirstHome / FirstAway to pozycja pierwszego meczu drużyny u siebie / na wyjeździe (-1, gdy brak).
+    """
+    if schedule is None:
+        schedule = team_schedule.TeamScheduleIndex(matches_df)
+    if len(schedule) == 0:
+        return pd.DataFrame(columns=SEASON_AGGREGATE_COLUMNS)
+
+    n_teams = len(schedule)
+    team_id = schedule.row_team_ids()
+    step = schedule.team_steps()
+    is_draw = schedule.results == team_schedule.RESULT_DRAW
+    matches = schedule.counts()
+    draws = np.bincount(team_id, weights=is_draw, minlength=n_teams).astype(int)
+
+    # Pierwszy i ostatni remis drużyny w sezonie (indeks meczu w sezonie drużyny)
+    draw_rows = np.flatnonzero(is_draw)
+    first_draw = matches.copy()
+    np.minimum.at(first_draw, team_id[draw_rows], step[draw_rows])
+    last_draw = np.full(n_teams, -1)
+    np.maximum.at(last_draw, team_id[draw_rows], step[draw_rows])
+
+    # Pełne serie bez remisu między kolejnymi remisami tej samej drużyny
+    same_team = team_id[draw_rows[1:]] == team_id[draw_rows[:-1]]
+    gaps = (step[draw_rows[1:]] - step[draw_rows[:-1]] - 1)[same_team]
+    gap_team = team_id[draw_rows[1:]][same_team]
+    inner = gaps > 0
+    inner_runs = np.bincount(gap_team[inner], minlength=n_teams)
+    inner_sum = np.bincount(gap_team[inner], weights=gaps[inner], minlength=n_teams).astype(int)
+    inner_max = np.zeros(n_teams, dtype=int)
+    np.maximum.at(inner_max, gap_team[inner], gaps[inner])
+
+    # Pozycje w indeksie są rosnące w obrębie drużyny, więc pierwszy mecz u siebie / na wyjeździe
+    # to najmniejsza pozycja z danej strony
+    no_match = np.iinfo(np.int64).max
+    first_home = np.full(n_teams, no_match)
+    np.minimum.at(first_home, team_id[schedule.is_home], schedule.positions[schedule.is_home])
+    first_away = np.full(n_teams, no_match)
+    np.minimum.at(first_away, team_id[~schedule.is_home], schedule.positions[~schedule.is_home])
+
+    seasons = matches_df['Season'].to_numpy(dtype=object)[schedule.positions[schedule.offsets[:-1]]]
+    return pd.DataFrame({
+        'Team': schedule.teams,
+        'Season': seasons,
+        'Matches': matches,
+        'Draws': draws,
+        'LeadingNoDraw': first_draw,
+        'TrailingNoDraw': np.where(draws > 0, matches - 1 - last_draw, matches),
+        'InnerRuns': inner_runs,
+        'InnerRunSum': inner_sum,
+        'InnerRunMax': inner_max,
+        'FirstHome': np.where(first_home == no_match, -1, first_home),
+        'FirstAway': np.where(first_away == no_match, -1, first_away),
+    })
+
+
+def accumulate_season(accumulators, aggregates_df, season_rank):
+    """
+    Dokłada agregaty cząstkowe jednego sezonu do akumulatorów drużyn ({drużyna: stan}).
+    Sezony muszą przychodzić chronologicznie (season_rank rośnie) - pamięć zależy od liczby drużyn
+    i sezonów, a nie od liczby meczów, więc można przetwarzać dowolnie długie okna.
+    """
+    for season in aggregates_df.itertuples(index=False):
+        acc = accumulators.get(season.Team)
+        if acc is None:
+            acc = accumulators[season.Team] = {
+                'matches': 0, 'draws': 0, 'runs': 0, 'run_sum': 0, 'longest': 0, 'open_run': 0,
+                'appearance': None, 'seasonal': [],
+            }
+
+        # Kolejność pierwszego pojawienia się: najpierw mecze u siebie, potem wyjazdowe
+        if season.FirstHome >= 0:
+            key = (0, season_rank, season.FirstHome)
+        else:
+            key = (1, season_rank, season.FirstAway)
+        if acc['appearance'] is None or key < acc['appearance']:
+            acc['appearance'] = key
+
+        # Seria bez remisu otwarta na końcu poprzedniego sezonu łączy się z serią otwierającą ten sezon
+        if season.Draws > 0:
+            open_run = acc['open_run'] + season.LeadingNoDraw
+            if open_run > 0:
+                acc['runs'] += 1
+                acc['run_sum'] += open_run
+                acc['longest'] = max(acc['longest'], open_run)
+            acc['runs'] += season.InnerRuns
+            acc['run_sum'] += season.InnerRunSum
+            acc['longest'] = max(acc['longest'], season.InnerRunMax)
+            acc['open_run'] = season.TrailingNoDraw
+        else:
+            acc['open_run'] += season.Matches
+
+        acc['matches'] += season.Matches
+        acc['draws'] += season.Draws
+        acc['seasonal'].append((season.Season, season.Draws / season.Matches * 100))
+    return accumulators
+
+
+def finalize_team_accumulators(accumulators):
+    """Statystyki drużyn (jak calculate_all_team_stats) z akumulatorów, w kolejności pierwszego pojawienia się."""
+    if not accumulators:
+        return pd.DataFrame(columns=OUTPUT_COLUMNS)
+
+    teams = sorted(accumulators, key=lambda team: accumulators[team]['appearance'])
+    rows = []
+    seasonal_rows = []
+    for team_id, team in enumerate(teams):
+        acc = accumulators[team]
+        # Ostatnia, niezamknięta seria to aktualna seria bez remisu - liczy się też do serii drużyny
+        runs, run_sum, longest = acc['runs'], acc['run_sum'], acc['longest']
+        if acc['open_run'] > 0:
+            runs, run_sum, longest = runs + 1, run_sum + acc['open_run'], max(longest, acc['open_run'])
+        rows.append({
+            'Team': team,
+            'Total Matches': acc['matches'],
+            'Total Draws': acc['draws'],
+            'Draw Percentage (%)': acc['draws'] / acc['matches'] * 100,
+            'Current Streak Without Draw': acc['open_run'],
+            'Longest Streak Without Draw': longest,
+            'Average Streak Without Draw': run_sum / runs if runs > 0 else 0.0,
+        })
+        seasonal_rows.extend((team_id, season, percentage) for season, percentage in acc['seasonal'])
+
+    stats = pd.DataFrame(rows)
+    seasonal = pd.DataFrame(seasonal_rows, columns=['team_id', 'Season', 'draw_percentage'])
+    stats['Draw Consistency (Std Dev %)'], stats['Draw Trend (Slope)'] = seasonal_draw_trends(seasonal, len(stats))
+    return format_team_stats(stats)[OUTPUT_COLUMNS]
+
+
+def combine_season_aggregates(aggregates_df):
+    """
+    Składa agregaty cząstkowe kolejnych sezonów w statystyki jak calculate_all_team_stats
+    dla połączonych sezonów. Sezony są łączone chronologicznie, a drużyny ułożone
+    w kolejności pierwszego pojawienia się (najpierw mecze u siebie, potem wyjazdowe).
+    """
+    accumulators = {}
+    season_start = aggregates_df['Season'].str.split('-').str[0].astype(int)
+    for season_rank, (_, season_df) in enumerate(aggregates_df.groupby(season_start, sort=True)):
+        accumulate_season(accumulators, season_df, season_rank)
+    return finalize_team_accumulators(accumulators)
@@ -0,0 +1,202 @@
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import match_store
+import project_config
+import streak_distribution
+
+# --- MAGAZYN CECH PRZEDMECZOWYCH (DRUŻYNA-MECZ) ---
+#
+# Jeden wiersz na drużynę w meczu (dwa na mecz), cechy liczone wyłącznie z wcześniejszych meczów drużyny:
+# odsetek remisów, forma różnicy bramek i odsetek remisów do przerwy (HTR) w ostatnich k meczach, odsetek
+# remisów w ostatnich k meczach u siebie / na wyjeździe (jak w bieżącym meczu), bieżąca seria bez remisu
+# oraz prawdopodobieństwo remisu z kursów meczu (kursy są znane przed meczem, marża usunięta proporcjonalnie).
+# Okna przesuwają się przez granice sezonów i lig kraju (drużyna po spadku zachowuje formę), jak serie
+# w streak_distribution. Okno k = różnica sum skumulowanych (bez bieżącego meczu) na tablicy posortowanej
+# po (drużyna, mecz) - wszystkie drużyny i okna wektorowo, bez pętli po drużynach.
+# Wynik: plik Parquet na kraj w analiza_1/cechy_meczow/; IsDraw to wynik meczu (etykieta, nie cecha).
+
+# --- SEKCJA KONFIGURACJI ---
+
+# 1. Liczba ostatnich sezonów (pełna historia danych)
+FEATURE_SEASONS = 25
+
+# 2. Długości okien (liczba poprzednich meczów drużyny)
+ROLLING_WINDOWS = [5, 10, 20]
+
+# 3. Kursy 1X2 do prawdopodobieństwa remisu, w kolejności prób: średnia rynkowa, potem bukmacherzy
+IMPLIED_ODDS_COLUMNS = [
+    ("AvgH", "AvgD", "AvgA"), ("BbAvH", "BbAvD", "BbAvA"), ("PSH", "PSD", "PSA"),
+    ("B365H", "B365D", "B365A"), ("BWH", "BWD", "BWA"), ("IWH", "IWD", "IWA"),
+    ("WHH", "WHD", "WHA"), ("LBH", "LBD", "LBA"),
+]
+
+# 4. Folder wyników (w folderze analizy)
+FEATURE_OUTPUT_DIRNAME = "cechy_meczow"
+
+FEATURE_MATCH_COLUMNS = ['Date', 'HomeTeam', 'AwayTeam', 'FTR', 'FTHG', 'FTAG', 'HTR', 'Season']
+
+
+def implied_draw_probability(matches_df, odds_columns=IMPLIED_ODDS_COLUMNS):
+    """
+    P(remis) z kursów 1X2 meczu: (1/D) / (1/H + 1/D + 1/A) z pierwszej trójki kursów dostępnej w meczu
+    (kurs <= 1 albo brak = trójka niedostępna). NaN, gdy żadna trójka nie jest pełna.
+    """
+    probability = np.full(len(matches_df), np.nan)
+    for triple in odds_columns:
+        if not all(col in matches_df.columns for col in triple):
+            continue
+        odds = matches_df[list(triple)].to_numpy(dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            inverse = np.where(odds > 1.0, 1 / odds, np.nan)
+            candidate = inverse[:, 1] / inverse.sum(axis=1)
+        probability = np.where(np.isnan(probability), candidate, probability)
+    return probability
+
+
+def group_starts(group):
+    """Dla tablicy posortowanej po grupie: indeks pierwszego wiersza grupy każdego wiersza."""
+    new_group = np.ones(len(group), dtype=bool)
+    new_group[1:] = group[1:] != group[:-1]
+    starts = np.flatnonzero(new_group)
+    return starts[np.cumsum(new_group) - 1]
+
+
+def prior_window_mean(values, starts, window):
+    """
+    Średnia wartości z co najwyżej `window` poprzednich wierszy tej samej grupy (bez bieżącego; NaN pomijane).
+    values i starts (group_starts) w kolejności posortowanej po (grupa, mecz). NaN, gdy brak wcześniejszych wartości.
+    """
+    valid = ~np.isnan(values)
+    cum_sum = np.concatenate([[0.0], np.cumsum(np.where(valid, values, 0.0))])
+    cum_count = np.concatenate([[0], np.cumsum(valid)])
+    index = np.arange(len(values))
+    low = np.maximum(index - window, starts)
+    count = cum_count[index] - cum_count[low]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(count > 0, (cum_sum[index] - cum_sum[low]) / count, np.nan)
+
+
+def result_flags(results, value):
+    """1.0 / 0.0 dla wyników H / D / A (1.0 = value), NaN dla braku wyniku."""
+    results = pd.Series(results).astype(object).to_numpy()
+    known = np.isin(results, ['H', 'D', 'A'])
+    return np.where(known, results == value, np.nan)
+
+
+def country_features(base_path, country, league_codes, seasons_list, windows=ROLLING_WINDOWS):
+    """
+    Tabela cech wszystkich meczów drużyn kraju (wiersze posortowane po drużynie i chronologicznie).
+    Zwraca DataFrame albo None, jeśli brak danych.
+    """
+    odds_columns = [col for triple in IMPLIED_ODDS_COLUMNS for col in triple]
+    matches = streak_distribution.load_country_matches(base_path, country, league_codes, seasons_list,
+                                                       columns=FEATURE_MATCH_COLUMNS + odds_columns)
+    if matches is None:
+        return None
+    n = len(matches)
+    streaks = streak_distribution.pre_match_streaks(matches)
+    match = streaks['match']
+    row = match % n
+    home = match < n
+    starts = group_starts(streaks['team'])
+
+    # Wartości z perspektywy drużyny (wiersze 0..n-1 gospodarze, n..2n-1 goście), w kolejności drużyna-mecz
+    goals_home = matches['FTHG'].to_numpy(dtype=np.float64, na_value=np.nan)
+    goals_away = matches['FTAG'].to_numpy(dtype=np.float64, na_value=np.nan)
+    goal_diff = np.concatenate([goals_home - goals_away, goals_away - goals_home])[match]
+    draws = np.tile(result_flags(matches['FTR'], 'D'), 2)[match]
+    ht_draws = np.tile(result_flags(matches['HTR'], 'D'), 2)[match]
+
+    # Okna u siebie / na wyjeździe: grupa = (drużyna, miejsce meczu), chronologicznie w grupie
+    venue_order = np.lexsort((np.arange(2 * n), ~home, streaks['team']))
+    venue_group = streaks['team'][venue_order] * 2 + home[venue_order]
+    venue_starts = group_starts(venue_group)
+
+    teams = streaks['teams']
+    opponent_codes = np.concatenate([matches['AwayTeam'].to_numpy(dtype=str), matches['HomeTeam'].to_numpy(dtype=str)])
+    features = {
+        'Country': country,
+        'League': streaks['leagues'][streaks['league']],
+        'Season': matches['Season'].to_numpy(dtype=object)[row],
+        'Date': matches['Date'].to_numpy()[row],
+        'Team': teams[streaks['team']],
+        'Opponent': opponent_codes[match],
+        'Home': home,
+        'MatchNumber': np.arange(2 * n) - starts,
+        'StreakWithoutDraw': streaks['streak'],
+        'ImpliedDrawProb': implied_draw_probability(matches)[row],
+    }
+    for k in windows:
+        features[f'DrawRate{k}'] = prior_window_mean(draws, starts, k)
+        features[f'GoalDiffForm{k}'] = prior_window_mean(goal_diff, starts, k)
+        features[f'HTDrawRate{k}'] = prior_window_mean(ht_draws, starts, k)
+        venue_rate = np.empty(2 * n)
+        venue_rate[venue_order] = prior_window_mean(draws[venue_order], venue_starts, k)
+        features[f'VenueDrawRate{k}'] = venue_rate
+    features['IsDraw'] = draws
+
+    features_df = pd.DataFrame(features)
+    float_columns = [col for col in features_df.columns if features_df[col].dtype == np.float64]
+    features_df[float_columns] = features_df[float_columns].astype(np.float32)
+    for col in ('Country', 'League', 'Season', 'Team', 'Opponent'):
+        features_df[col] = features_df[col].astype('category')
+    return features_df
+
+
+def get_output_dir(base_path=None):
+    """Folder magazynu cech w folderze analizy."""
+    return Path(base_path or project_config.BASE_PATH) / project_config.ANALYSIS_DIRNAME / FEATURE_OUTPUT_DIRNAME
+
+
+def get_features_path(output_dir, country):
+    return Path(output_dir) / f"{country}.parquet"
+
+
+def write_feature_store(base_path, countries_leagues, seasons_list, output_dir, windows=ROLLING_WINDOWS):
+    """Etap analizy: cechy wszystkich krajów, jeden plik Parquet na kraj (zapis atomowy). Zwraca listę ścieżek."""
+    paths = []
+    for country, league_codes in countries_leagues.items():
+        features_df = country_features(base_path, country, league_codes, seasons_list, windows)
+        if features_df is None:
+            continue
+        path = get_features_path(output_dir, country)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        features_df.to_parquet(tmp_path, index=False)
+        tmp_path.replace(path)
+        paths.append(path)
+        print(f"{country}: {len(features_df)} wierszy drużyna-mecz, {features_df['Team'].nunique()} drużyn")
+    print(f"✅ Magazyn cech zapisany w: {output_dir}")
+    return paths
+
+
+def load_features(output_dir=None, countries=None, columns=None, leagues=None):
+    """
+    Wczytuje cechy z magazynu (wybrane kraje, kolumny i ligi). Klucz wiersza: Country, League, Date, Team.
+    Pusta ramka, jeśli magazyn nie istnieje.
+    """
+    output_dir = Path(output_dir or get_output_dir())
+    paths = sorted(output_dir.glob("*.parquet")) if countries is None else \
+        [get_features_path(output_dir, country) for country in countries]
+    filters = [('League', 'in', list(leagues))] if leagues else None
+    frames = [pd.read_parquet(path, columns=columns, filters=filters) for path in paths if path.exists()]
+    return match_store.concat_frames(frames)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Magazyn cech przedmeczowych drużyn (okna kroczące, bez przecieku).")
+    parser.add_argument('--seasons', type=int, default=FEATURE_SEASONS, help="Liczba ostatnich sezonów")
+    parser.add_argument('--leagues', nargs='+', default=None, help="Ligi lub kraje, np. E0 Germany")
+    parser.add_argument('--windows', nargs='+', type=int, default=ROLLING_WINDOWS, help="Długości okien, np. 5 10 20")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    seasons = project_config.get_seasons_to_analyze(project_config.CURRENT_SEASON_END_YEAR, args.seasons)
+    leagues = project_config.select_leagues(project_config.LEAGUE_SETS['analysis'], args.leagues)
+    write_feature_store(project_config.BASE_PATH, leagues, seasons, get_output_dir(), args.windows)
+    print(f"Czas: {time.perf_counter() - start:.2f} s")
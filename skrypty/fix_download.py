@@ -1,7 +1,9 @@
 import os
 import shutil
 
-BASE_DIR = "D:/football_data"
+import project_config
+
+BASE_DIR = str(project_config.BASE_PATH)
 
 def fix_folder_structure(base_dir):
     for root, dirs, files in os.walk(base_dir):
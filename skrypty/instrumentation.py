@@ -0,0 +1,239 @@
+import contextlib
+import cProfile
+import io
+import json
+import os
+import pstats
+import time
+import tracemalloc
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Brak modułu resource (Windows) - bez szczytowego RSS procesu
+    resource = None
+
+# --- POMIARY ETAPÓW PRZEBIEGU (JSON-LINES) I OPCJONALNE PROFILOWANIE LIGI ---
+#
+# Etapy (wczytanie, konwersja CSV, statystyki drużyn, wybór drużyn, symulacja, zapis) są otoczone
+# `with stage(...)`. Przy włączonym dzienniku każdy etap dopisuje jeden wiersz JSON do pliku:
+#   {"stage": "load", "country": ..., "league": ..., "season": ..., "seconds": ..., "rows": ...,
+#    "peak_mb": ..., "max_rss_mb": ..., "status": "ok" | "error", "error": ...}
+# Bez dziennika stage() nic nie mierzy i nie zapisuje. Ustawienia są przekazywane przez zmienne
+# środowiskowe, więc dziedziczą je procesy robocze sweep.run_sweep.
+
+STAGE_LOG_ENV = "DRAW_STAGE_LOG"                # ścieżka pliku JSON-lines
+TRACE_MEMORY_ENV = "DRAW_STAGE_TRACE_MEMORY"    # "1" = szczyt pamięci etapu (tracemalloc, wolniej)
+PROFILE_LEAGUE_ENV = "DRAW_PROFILE_LEAGUE"      # "Kraj/Liga" - profilowana liga
+PROFILER_ENV = "DRAW_PROFILER"                  # "cprofile" albo "pyinstrument"
+PROFILE_DIR_ENV = "DRAW_PROFILE_DIR"            # folder na wyniki profilowania
+
+PROFILERS = ["cprofile", "pyinstrument"]
+PROFILE_TOP_FUNCTIONS = 40  # liczba funkcji w tekstowym raporcie cProfile
+
+
+class StageRecord:
+    """Uchwyt etapu - kod etapu ustawia `rows` (liczba przetworzonych wierszy)."""
+
+    def __init__(self, rows=None):
+        self.rows = rows
+        self.carried_peak = 0
+
+
+# Otwarte etapy procesu (zagnieżdżanie pomiarów pamięci)
+_OPEN_STAGES = []
+
+
+def stage_log_path():
+    """Plik dziennika etapów albo None, jeśli pomiary są wyłączone."""
+    return os.environ.get(STAGE_LOG_ENV) or None
+
+
+def _max_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss jest w KB na Linuksie (w bajtach na macOS - tam wynik jest przybliżony)
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def write_record(record, log_path=None):
+    """Dopisuje jeden wiersz JSON do dziennika (jeden zapis w trybie dopisywania - bezpieczny dla wielu procesów)."""
+    log_path = log_path or stage_log_path()
+    if log_path is None:
+        return
+    line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+    with open(log_path, "a", encoding="utf-8") as f:
+        f.write(line)
+
+
+@contextlib.contextmanager
+def stage(name, country=None, league=None, season=None, rows=None):
+    """
+    Mierzy etap: czas, liczbę wierszy (StageRecord.rows), szczyt pamięci (przy TRACE_MEMORY_ENV)
+    i status. Wyjątek etapu jest zapisywany w dzienniku i przekazywany dalej.
+    """
+    log_path = stage_log_path()
+    record = StageRecord(rows)
+    if log_path is None:
+        yield record
+        return
+
+    trace_memory = os.environ.get(TRACE_MEMORY_ENV) == "1"
+    if trace_memory:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        start_memory, running_peak = tracemalloc.get_traced_memory()
+        if _OPEN_STAGES:
+            # Szczyt zmierzony dotąd w etapie nadrzędnym przechodzi do niego przed wyzerowaniem licznika
+            parent = _OPEN_STAGES[-1]
+            parent.carried_peak = max(parent.carried_peak, running_peak)
+        tracemalloc.reset_peak()
+    _OPEN_STAGES.append(record)
+
+    status, error = "ok", None
+    start = time.perf_counter()
+    try:
+        yield record
+    except BaseException as e:
+        status, error = "error", f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        _OPEN_STAGES.pop()
+        peak_mb = None
+        if trace_memory:
+            peak = max(tracemalloc.get_traced_memory()[1], record.carried_peak)
+            peak_mb = round(max(peak - start_memory, 0) / 2**20, 3)
+            if _OPEN_STAGES:
+                _OPEN_STAGES[-1].carried_peak = max(_OPEN_STAGES[-1].carried_peak, peak)
+        write_record({
+            'time': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'pid': os.getpid(),
+            'stage': name,
+            'country': country,
+            'league': league,
+            'season': season,
+            'seconds': round(seconds, 6),
+            'rows': None if record.rows is None else int(record.rows),
+            'peak_mb': peak_mb,
+            'max_rss_mb': _max_rss_mb(),
+            'status': status,
+            'error': error,
+        }, log_path)
+
+
+# --- PROFILOWANIE JEDNEJ LIGI ---
+
+def _profile_target():
+    target = os.environ.get(PROFILE_LEAGUE_ENV)
+    return tuple(target.split("/", 1)) if target and "/" in target else None
+
+
+def _profile_basename(country, league, season):
+    suffix = f"_{season}" if season else ""
+    return f"profil_{country}_{league}{suffix}"
+
+
+@contextlib.contextmanager
+def profile_task(country, league, season=None):
+    """
+    Profiluje blok (zadanie ligi), jeśli liga jest wskazana w PROFILE_LEAGUE_ENV.
+    cProfile: plik .prof (pstats / snakeviz) i raport tekstowy; pyinstrument: raport .html i .txt.
+    """
+    if _profile_target() != (country, league):
+        yield
+        return
+
+    output_dir = Path(os.environ.get(PROFILE_DIR_ENV) or ".")
+    output_dir.mkdir(parents=True, exist_ok=True)
+    basename = output_dir / _profile_basename(country, league, season)
+    profiler_name = os.environ.get(PROFILER_ENV) or "cprofile"
+
+    if profiler_name == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            print("Ostrzeżenie: pyinstrument nie jest zainstalowany - profiluję przez cProfile.")
+        else:
+            profiler = Profiler()
+            profiler.start()
+            try:
+                yield
+            finally:
+                profiler.stop()
+                basename.with_suffix(".html").write_text(profiler.output_html(), encoding="utf-8")
+                basename.with_suffix(".txt").write_text(profiler.output_text(), encoding="utf-8")
+                print(f"Profil zapisano w: {basename.with_suffix('.html')}")
+            return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(basename.with_suffix(".prof"))
+        report = io.StringIO()
+        pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+        basename.with_suffix(".txt").write_text(report.getvalue(), encoding="utf-8")
+        print(f"Profil zapisano w: {basename.with_suffix('.prof')}")
+
+
+# --- KONFIGURACJA Z WIERSZA POLECEŃ ---
+
+def configure(stage_log=None, trace_memory=False, profile_league=None, profiler="cprofile", profile_dir=None):
+    """Włącza pomiary w bieżącym procesie i (przez zmienne środowiskowe) w jego procesach roboczych."""
+    settings = {
+        STAGE_LOG_ENV: str(Path(stage_log).resolve()) if stage_log else None,
+        TRACE_MEMORY_ENV: "1" if trace_memory else None,
+        PROFILE_LEAGUE_ENV: profile_league,
+        PROFILER_ENV: profiler if profile_league else None,
+        PROFILE_DIR_ENV: str(Path(profile_dir).resolve()) if profile_dir else None,
+    }
+    for key, value in settings.items():
+        if value is None:
+            os.environ.pop(key, None)
+        else:
+            os.environ[key] = value
+    if stage_log:
+        Path(stage_log).parent.mkdir(parents=True, exist_ok=True)
+
+
+def add_instrumentation_arguments(parser):
+    """Dodaje do parsera argparse opcje dziennika etapów i profilowania."""
+    parser.add_argument('--stage-log', type=Path, default=None,
+                        help="Plik JSON-lines z pomiarami etapów (czas, wiersze, pamięć)")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="Szczyt pamięci każdego etapu (tracemalloc - wolniejszy przebieg)")
+    parser.add_argument('--profile-league', default=None, metavar="KRAJ/LIGA",
+                        help="Profiluj zadania jednej ligi, np. England/E0")
+    parser.add_argument('--profiler', choices=PROFILERS, default="cprofile")
+    parser.add_argument('--profile-dir', type=Path, default=None, help="Folder na wyniki profilowania")
+    return parser
+
+
+def configure_from_args(args):
+    """configure() z argumentów dodanych przez add_instrumentation_arguments."""
+    configure(args.stage_log, args.trace_memory, args.profile_league, args.profiler, args.profile_dir)
+
+
+def read_stage_log(log_path):
+    """Wczytuje dziennik etapów do DataFrame (np. do zsumowania czasu po etapach)."""
+    import pandas as pd
+
+    return pd.read_json(log_path, lines=True)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Podsumowanie dziennika etapów (czas i wiersze po etapach).")
+    parser.add_argument('stage_log', type=Path)
+    args = parser.parse_args()
+    log_df = read_stage_log(args.stage_log)
+    summary = log_df.groupby('stage', sort=False).agg(
+        calls=('seconds', 'size'), seconds=('seconds', 'sum'), rows=('rows', 'sum'),
+        errors=('status', lambda s: int((s == 'error').sum())))
+    if 'peak_mb' in log_df and log_df['peak_mb'].notna().any():
+        summary['peak_mb'] = log_df.groupby('stage', sort=False)['peak_mb'].max()
+    print(summary.sort_values('seconds', ascending=False).to_string())
@@ -0,0 +1,433 @@
+import hashlib
+import io
+import json
+import os
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import instrumentation
+import project_config
+import sweep
+
+# --- SEKCJA KONFIGURACJI ---
+
+# 1. Ścieżka do głównego folderu z danymi (pliki <sezon>/<kraj>/<liga>.csv)
+BASE_PATH = project_config.BASE_PATH
+
+# 2. Nazwa folderu magazynu kolumnowego (tworzony wewnątrz folderu z danymi)
+STORE_DIRNAME = "match_store"
+
+# 3. Stare pliki używają skróconych nazw kolumn
+COLUMN_ALIASES = {"HT": "HomeTeam", "AT": "AwayTeam"}
+
+# 4. Kolumny tekstowe, które nie są konwertowane na liczby
+TEXT_COLUMNS = ["Div", "Date", "Time", "HomeTeam", "AwayTeam", "FTR", "HTR", "Referee", "Season"]
+CATEGORICAL_COLUMNS = ["HomeTeam", "AwayTeam", "FTR", "HTR"]
+
+# 5. Statystyki meczowe (liczby całkowite); pozostałe kolumny liczbowe to kursy bukmacherskie (float32)
+STAT_COLUMNS = [
+    "FTHG", "FTAG", "HTHG", "HTAG", "Attendance", "HS", "AS", "HST", "AST", "HHW", "AHW",
+    "HC", "AC", "HF", "AF", "HFKC", "AFKC", "HO", "AO", "HY", "AY", "HR", "AR", "HBP", "ABP",
+]
+
+# 6. Nazwy drużyn zmieniające się między sezonami (pisownia w plikach źródłowych): {kraj: {alias: nazwa kanoniczna}}
+#    Różne kluby o podobnych nazwach (np. Wimbledon / AFC Wimbledon, drużyny rezerw "B") NIE są aliasami.
+TEAM_ALIASES = {
+    "Greece": {"Yiannina": "Giannina", "Kalithea": "Kallithea"},
+}
+
+# 7. Katalog schematów plików CSV (w folderze magazynu): kolumny, kodowanie, format daty, liczba wierszy, skrót
+CATALOG_FILENAME = "katalog_csv.json"
+CATALOG_SAMPLE_ROWS = 50  # pierwsze wiersze pliku, z których wyznaczany jest format daty
+SOURCE_HASH_KEY = b"source_sha256"  # klucz metadanych partycji Parquet ze skrótem pliku źródłowego
+
+SEASON_PATTERN = re.compile(r"^\d{4}-\d{4}$")
+
+
+# --- WCZYTYWANIE SUROWYCH PLIKÓW CSV ---
+
+def decode_csv_bytes(raw, encoding=None):
+    """
+    Dekoduje zawartość pliku (UTF-8 z ewentualnym BOM, w przeciwnym razie latin1).
+    encoding - kodowanie znane z katalogu (bez próby UTF-8 zakończonej wyjątkiem).
+    """
+    if encoding == "latin1":
+        return raw.decode("latin1"), "latin1"
+    try:
+        return raw.decode("utf-8-sig"), "utf-8"
+    except UnicodeDecodeError:
+        return raw.decode("latin1"), "latin1"
+
+
+def detect_date_format(dates):
+    """Zwraca format daty ('%d/%m/%y' lub '%d/%m/%Y') na podstawie pierwszej niepustej wartości."""
+    non_null = dates.dropna()
+    if non_null.empty:
+        return None
+    year_part = str(non_null.iloc[0]).strip().split("/")[-1]
+    return "%d/%m/%Y" if len(year_part) == 4 else "%d/%m/%y"
+
+
+def parse_dates(dates, date_format=None):
+    """Parsuje kolumnę Date jednym, z góry znanym formatem zamiast zgadywania per wiersz."""
+    date_format = date_format or detect_date_format(dates)
+    if date_format is None:
+        return pd.to_datetime(dates, errors="coerce")
+    return pd.to_datetime(dates.str.strip(), format=date_format, errors="coerce")
+
+
+def normalize_match_frame(df, season, date_format=None):
+    """Ujednolica nazwy kolumn, typy danych, daty i kolumnę Season jednego pliku ligi."""
+    df = df.rename(columns=COLUMN_ALIASES)
+    df = df.loc[:, [c for c in df.columns if not c.startswith("Unnamed")]]
+
+    # Puste wiersze (same przecinki) nie są meczami
+    if "HomeTeam" in df.columns:
+        df = df[df["HomeTeam"].notna()].copy()
+
+    for col in df.columns:
+        if col in TEXT_COLUMNS:
+            continue
+        values = df[col]
+        if not pd.api.types.is_numeric_dtype(values):
+            values = pd.to_numeric(values, errors="coerce")
+        if col in STAT_COLUMNS:
+            df[col] = values.round().astype("Int32")
+        else:
+            df[col] = values.astype("float32")
+
+    for col in ("HomeTeam", "AwayTeam"):
+        if col in df.columns:
+            df[col] = df[col].astype(str).str.strip()
+
+    if "Date" in df.columns:
+        df["Date"] = parse_dates(df["Date"].astype("string"), date_format)
+
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+
+    df["Season"] = season
+    return df.reset_index(drop=True)
+
+
+def read_raw_csv(file_path, season, schema=None, columns=None):
+    """
+    Wczytuje surowy plik CSV ligi: jedno dekodowanie zamiast ponawiania po UnicodeDecodeError
+    oraz tylko kolumny z nagłówka (starsze pliki mają wiersze z nadmiarowymi polami).
+    schema - wpis katalogu (get_csv_schema): kodowanie, kolumny i format daty znane z góry.
+    """
+    encoding = schema['encoding'] if schema else None
+    text, _ = decode_csv_bytes(Path(file_path).read_bytes(), encoding)
+    return parse_csv_text(text, season, columns, schema)
+
+
+def parse_csv_text(text, season, columns=None, schema=None):
+    """
+    Parsuje zdekodowaną treść pliku ligi (nagłówek + wiersze) do ujednoliconej ramki meczów.
+    columns - tylko wybrane kolumny (nazwy po ujednoliceniu, np. HomeTeam także dla HT).
+    schema - wpis katalogu: nagłówek i format daty bez odczytywania ich z treści.
+    """
+    if schema:
+        header = schema['columns']
+    else:
+        header = text.partition("\n")[0].rstrip("\r").split(",")
+    usecols = [i for i, name in enumerate(header) if name.strip()
+               and (columns is None or COLUMN_ALIASES.get(name.strip(), name.strip()) in columns)]
+    text_dtypes = {name: str for name in TEXT_COLUMNS + list(COLUMN_ALIASES)}
+    df = pd.read_csv(io.StringIO(text), usecols=usecols, dtype=text_dtypes, skip_blank_lines=True)
+    return normalize_match_frame(df, season, schema['date_format'] if schema else None)
+
+
+def canonicalize_team_names(df, country):
+    """
+    Zamienia aliasy nazw drużyn (TEAM_ALIASES) na nazwy kanoniczne w kolumnach HomeTeam / AwayTeam.
+    Magazyn trzyma nazwy z plików źródłowych - zamiana odbywa się przy odczycie, więc zmiana tabeli
+    aliasów nie wymaga ponownej konwersji plików.
+    """
+    aliases = TEAM_ALIASES.get(country)
+    if not aliases:
+        return df
+    for col in ("HomeTeam", "AwayTeam"):
+        if col not in df.columns:
+            continue
+        values = df[col]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            if values.cat.categories.isin(list(aliases)).any():
+                df[col] = values.astype(object).replace(aliases).astype("category")
+        elif values.isin(list(aliases)).any():
+            df[col] = values.replace(aliases)
+    return df
+
+
+# --- KATALOG SCHEMATÓW PLIKÓW CSV ---
+#
+# Zestaw kolumn plików zmienia się między sezonami (bukmacherzy, Bb* -> Max*/Avg*, rok daty 2- lub 4-cyfrowy).
+# Katalog (JSON w folderze magazynu) zapamiętuje dla każdego pliku: nagłówek, kodowanie, format daty
+# (z pierwszych wierszy), liczbę wierszy, rozmiar, czas modyfikacji i skrót SHA-256. Wpis jest aktualny,
+# dopóki rozmiar i czas modyfikacji pliku się nie zmienią; nieaktualne wpisy są skanowane ponownie.
+
+_catalogs = {}
+
+
+def get_catalog_path(base_path):
+    """Plik katalogu schematów w folderze magazynu."""
+    return get_store_path(base_path) / CATALOG_FILENAME
+
+
+def catalog_key(season, country, league_code):
+    return f"{season}/{country}/{league_code}"
+
+
+def scan_csv_schema(csv_path):
+    """
+    Schemat jednego pliku CSV: nagłówek, kodowanie, format daty (z CATALOG_SAMPLE_ROWS pierwszych wierszy),
+    liczba niepustych wierszy danych, rozmiar, czas modyfikacji i SHA-256 zawartości.
+    """
+    csv_path = Path(csv_path)
+    stat = csv_path.stat()
+    raw = csv_path.read_bytes()
+    text, encoding = decode_csv_bytes(raw)
+    lines = text.splitlines()
+    header = lines[0].split(",") if lines else []
+
+    date_format = None
+    if "Date" in header:
+        sample = pd.read_csv(io.StringIO("\n".join(lines[:CATALOG_SAMPLE_ROWS + 1])), usecols=["Date"], dtype=str)
+        date_format = detect_date_format(sample["Date"])
+    return {
+        'columns': header,
+        'encoding': encoding,
+        'date_format': date_format,
+        'rows': sum(1 for line in lines[1:] if line.strip(", ")),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': hashlib.sha256(raw).hexdigest(),
+    }
+
+
+def load_catalog(base_path):
+    """Katalog schematów (słownik klucz -> schemat), wczytywany z pliku raz na proces."""
+    catalog_path = get_catalog_path(base_path)
+    if catalog_path not in _catalogs:
+        try:
+            with open(catalog_path, encoding="utf-8") as f:
+                _catalogs[catalog_path] = json.load(f)
+        except (OSError, ValueError):
+            _catalogs[catalog_path] = {}
+    return _catalogs[catalog_path]
+
+
+def save_catalog(base_path, catalog):
+    """Zapisuje katalog atomowo (równoległe procesy: wygrywa ostatni zapis, brakujące wpisy zostaną doskanowane)."""
+    catalog_path = get_catalog_path(base_path)
+    catalog_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = catalog_path.with_name(f".{catalog_path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(json.dumps(catalog, ensure_ascii=False, sort_keys=True))
+    os.replace(tmp_path, catalog_path)
+
+
+def is_schema_current(schema, csv_path):
+    """Czy wpis katalogu opisuje bieżącą wersję pliku (rozmiar i czas modyfikacji)."""
+    stat = Path(csv_path).stat()
+    return schema is not None and schema['size'] == stat.st_size and schema['mtime_ns'] == stat.st_mtime_ns
+
+
+def get_csv_schema(base_path, season, country, league_code, save=True):
+    """
+    Aktualny wpis katalogu dla pliku sezonu ligi (nowy lub nieaktualny wpis jest skanowany i zapisywany).
+    Zwraca None, jeśli plik nie istnieje.
+    """
+    csv_path = get_source_path(base_path, season, country, league_code)
+    if not csv_path.exists():
+        return None
+    catalog = load_catalog(base_path)
+    key = catalog_key(season, country, league_code)
+    if not is_schema_current(catalog.get(key), csv_path):
+        catalog[key] = scan_csv_schema(csv_path)
+        if save:
+            save_catalog(base_path, catalog)
+    return catalog[key]
+
+
+def build_catalog(base_path, force=False):
+    """Skanuje wszystkie pliki drzewa danych (force - także aktualne wpisy) i zapisuje katalog raz."""
+    catalog = load_catalog(base_path)
+    for season, country, league_code in iter_source_files(base_path):
+        key = catalog_key(season, country, league_code)
+        if force:
+            catalog.pop(key, None)
+        get_csv_schema(base_path, season, country, league_code, save=False)
+    save_catalog(base_path, catalog)
+    return catalog
+
+
+# --- MAGAZYN KOLUMNOWY (PARQUET) ---
+
+def get_store_path(base_path):
+    """Zwraca ścieżkę magazynu kolumnowego dla danego folderu z danymi."""
+    return Path(base_path) / STORE_DIRNAME
+
+
+def get_partition_path(base_path, season, country, league_code):
+    """Ścieżka pliku Parquet partycji w układzie season=/country=/league=."""
+    return (get_store_path(base_path) / f"season={season}" / f"country={country}"
+            / f"league={league_code}" / "part-0.parquet")
+
+
+def get_source_path(base_path, season, country, league_code):
+    """Ścieżka źródłowego pliku CSV sezonu ligi."""
+    return Path(base_path) / season / country / f"{league_code}.csv"
+
+
+def ingest_file(base_path, season, country, league_code, force=False):
+    """
+    Konwertuje jeden plik CSV do partycji Parquet (jeśli partycja nie istnieje lub jest starsza niż CSV).
+    Zwraca ścieżkę partycji albo None, jeśli brak pliku źródłowego.
+    """
+    csv_path = get_source_path(base_path, season, country, league_code)
+    partition_path = get_partition_path(base_path, season, country, league_code)
+
+    if not csv_path.exists():
+        return partition_path if partition_path.exists() else None
+
+    if (not force and partition_path.exists()
+            and partition_path.stat().st_mtime >= csv_path.stat().st_mtime):
+        return partition_path
+
+    # Nowy wpis katalogu jest zapisywany razem z nową partycją (niezmieniony plik nie wymaga zapisu katalogu)
+    catalog = load_catalog(base_path)
+    new_schema = not is_schema_current(catalog.get(catalog_key(season, country, league_code)), csv_path)
+    schema = get_csv_schema(base_path, season, country, league_code, save=False)
+    if not force and partition_path.exists() and partition_source_hash(partition_path) == schema['sha256']:
+        # Plik pobrany ponownie bez zmian treści - partycja jest aktualna
+        os.utime(partition_path)
+        return partition_path
+
+    with instrumentation.stage('parse', country, league_code, season) as st:
+        df = read_raw_csv(csv_path, season, schema)
+        st.rows = len(df)
+    partition_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = partition_path.with_suffix(".tmp")
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**table.schema.metadata, SOURCE_HASH_KEY: schema['sha256']})
+    pq.write_table(table, tmp_path)
+    tmp_path.replace(partition_path)
+    if new_schema:
+        save_catalog(base_path, catalog)
+    return partition_path
+
+
+def partition_source_hash(partition_path):
+    """SHA-256 pliku CSV, z którego zbudowano partycję (metadane Parquet), albo None."""
+    metadata = pq.read_schema(partition_path).metadata or {}
+    value = metadata.get(SOURCE_HASH_KEY)
+    return value.decode() if value else None
+
+
+def iter_source_files(base_path):
+    """Zwraca krotki (sezon, kraj, liga) dla wszystkich plików CSV w drzewie danych."""
+    base_path = Path(base_path)
+    for season_dir in sorted(base_path.iterdir()):
+        if not season_dir.is_dir() or not SEASON_PATTERN.match(season_dir.name):
+            continue
+        for country_dir in sorted(season_dir.iterdir()):
+            if not country_dir.is_dir():
+                continue
+            for csv_path in sorted(country_dir.glob("*.csv")):
+                yield season_dir.name, country_dir.name, csv_path.stem
+
+
+def ingest_all(base_path, force=False):
+    """Jednorazowo zasila magazyn kolumnowy wszystkimi plikami sezon/kraj/liga (najpierw katalog schematów)."""
+    build_catalog(base_path, force=force)
+    ingested = 0
+    for season, country, league_code in iter_source_files(base_path):
+        try:
+            ingest_file(base_path, season, country, league_code, force=force)
+            ingested += 1
+        except Exception as e:
+            print(f"Błąd podczas konwersji {season}/{country}/{league_code}.csv: {e}")
+    return ingested
+
+
+def read_partition(base_path, season, country, league_code, columns=None):
+    """
+    Wczytuje jedną partycję (sezon ligi) z magazynu, tylko z żądanymi kolumnami.
+    Brakujące w danym sezonie kolumny (np. kursy bukmacherów) są uzupełniane NaN,
+    a nazwy drużyn są sprowadzane do nazw kanonicznych (TEAM_ALIASES).
+    Zwraca None, jeśli dla sezonu nie ma danych.
+    """
+    partition_path = ingest_file(base_path, season, country, league_code)
+    if partition_path is None:
+        return None
+
+    with instrumentation.stage('load', country, league_code, season) as st:
+        if columns is None:
+            df = pd.read_parquet(partition_path)
+        else:
+            available = set(pq.read_schema(partition_path).names)
+            present = [c for c in columns if c in available]
+            df = pd.read_parquet(partition_path, columns=present)
+            for col in columns:
+                if col not in available:
+                    df[col] = np.float32(np.nan)
+            df = df[list(columns)]
+        st.rows = len(df)
+        return canonicalize_team_names(df, country)
+
+
+def concat_frames(frames):
+    """Łączy ramki z wielu sezonów, zachowując kolumny kategoryczne (suma kategorii)."""
+    frames = [f for f in frames if f is not None]
+    if not frames:
+        return pd.DataFrame()
+    categorical = [c for c in frames[0].columns if isinstance(frames[0][c].dtype, pd.CategoricalDtype)]
+    union = {}
+    for col in categorical:
+        categories = pd.unique(np.concatenate([np.asarray(f[col].cat.categories, dtype=object) for f in frames]))
+        union[col] = pd.CategoricalDtype(categories)
+    aligned = [f.astype({col: union[col] for col in categorical if col in f.columns}) for f in frames]
+    return pd.concat(aligned, ignore_index=True)
+
+
+def season_sort_key(season):
+    """Klucz sortowania chronologicznego nazw sezonów w formacie ROK-ROK."""
+    return int(season.split("-")[0])
+
+
+def iter_league_seasons(base_path, country, league_code, seasons_list, columns=None, chronological=False):
+    """
+    Generator (sezon, ramka) - sezony ligi wczytywane pojedynczo, tylko z żądanymi kolumnami.
+    W pamięci jest naraz jeden sezon; sezony bez danych są pomijane z komunikatem, a sezony z błędem
+    wczytywania - z błędem zapisanym w wyniku zadania (sweep.record_season_error).
+    """
+    if chronological:
+        seasons_list = sorted(seasons_list, key=season_sort_key)
+    for season in seasons_list:
+        try:
+            df = read_partition(base_path, season, country, league_code, columns)
+        except Exception as e:
+            sweep.record_season_error(season, e)
+            continue
+        if df is None:
+            print(f"Ostrzeżenie: Brak danych dla {season}/{country}/{league_code}.csv")
+            continue
+        yield season, df
+
+
+def load_league(base_path, country, league_code, seasons_list, columns=None):
+    """Wczytuje wskazane sezony ligi z magazynu kolumnowego i łączy je w jedną ramkę."""
+    return concat_frames(df for _, df in iter_league_seasons(base_path, country, league_code, seasons_list, columns))
+
+
+if __name__ == "__main__":
+    print(f"Zasilam magazyn kolumnowy: {get_store_path(BASE_PATH)}")
+    count = ingest_all(BASE_PATH, force=True)
+    print(f"✅ Przetworzono {count} plików.")
@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+
+# --- INDEKS KURSÓW NA REMIS ---
+#
+# Kursy na remis są budowane raz przy wczytywaniu sezonu (kolumnowo, dla wszystkich meczów naraz),
+# a nie odczytywane wiersz po wierszu w trakcie symulacji.
+#
+# Źródła kursów:
+#   - kod bukmachera, np. "B365", "BW", "PS", "WH", "VC" (kolumna <kod>D),
+#   - "PSC" - kurs zamknięcia Pinnacle (PSCD),
+#   - "best" - najlepszy dostępny kurs (MaxD / BbMxD, w razie braku maksimum z bukmacherów),
+#   - "average" - średnia rynkowa (AvgD / BbAvD, w razie braku średnia z bukmacherów),
+#   - "fixed" - stały kurs (np. DRAW_ODDS z konfiguracji symulacji).
+# Łańcuch źródeł (np. ("PSC", "PS", "average", "fixed")) wybiera dla każdego meczu pierwsze dostępne.
+
+BOOKMAKER_DRAW_COLUMNS = {
+    "B365": "B365D", "BW": "BWD", "IW": "IWD", "LB": "LBD", "PS": "PSD", "WH": "WHD",
+    "VC": "VCD", "SJ": "SJD", "GB": "GBD", "SB": "SBD", "BS": "BSD", "SO": "SOD",
+    "SY": "SYD", "1XB": "1XBD", "BF": "BFD", "BFE": "BFED",
+}
+CLOSING_DRAW_COLUMNS = {"PSC": "PSCD", "B365C": "B365CD", "BWC": "BWCD", "WHC": "WHCD", "VCC": "VCCD"}
+MARKET_MAX_COLUMNS = ["MaxD", "BbMxD"]
+MARKET_AVG_COLUMNS = ["AvgD", "BbAvD"]
+
+FIXED_SOURCE = "fixed"
+
+
+def source_columns(source):
+    """Kolumny CSV potrzebne do wyznaczenia kursu z danego źródła."""
+    if source == FIXED_SOURCE:
+        return []
+    if source in BOOKMAKER_DRAW_COLUMNS:
+        return [BOOKMAKER_DRAW_COLUMNS[source]]
+    if source in CLOSING_DRAW_COLUMNS:
+        return [CLOSING_DRAW_COLUMNS[source]]
+    if source == "best":
+        return MARKET_MAX_COLUMNS + list(BOOKMAKER_DRAW_COLUMNS.values())
+    if source == "average":
+        return MARKET_AVG_COLUMNS + list(BOOKMAKER_DRAW_COLUMNS.values())
+    raise ValueError(f"Nieznane źródło kursów: {source}")
+
+
+def required_columns(sources):
+    """Suma kolumn potrzebnych dla listy źródeł (bez duplikatów, w stałej kolejności)."""
+    columns = []
+    for source in sources:
+        for col in source_columns(source):
+            if col not in columns:
+                columns.append(col)
+    return columns
+
+
+def _column_values(df, columns):
+    """
+    Wartości kolumn kursów jako float64. Magazyn trzyma kursy jako float32, więc zaokrąglamy
+    do 4 miejsc, żeby np. 3.3 nie zamieniało się w 3.2999999523.
+    """
+    values = df[columns].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+    return np.round(values, 4)
+
+
+def _first_available(df, columns):
+    """Pierwsza niepusta wartość z listy kolumn (kolumnowo dla wszystkich wierszy)."""
+    values = np.full(len(df), np.nan)
+    for col in columns:
+        if col in df.columns:
+            column = _column_values(df, [col])[:, 0]
+            values = np.where(np.isnan(values), column, values)
+    return values
+
+
+def _valid(values):
+    """Kurs na remis musi być większy od 1 - inne wartości traktujemy jak brak danych."""
+    return np.where(values > 1.0, values, np.nan)
+
+
+def source_odds(df, source):
+    """Kurs na remis z jednego źródła dla wszystkich meczów ramki (NaN, gdy brak)."""
+    if source == FIXED_SOURCE:
+        return np.full(len(df), np.nan)
+    if source in BOOKMAKER_DRAW_COLUMNS or source in CLOSING_DRAW_COLUMNS:
+        return _valid(_first_available(df, source_columns(source)))
+
+    bookmakers = [c for c in BOOKMAKER_DRAW_COLUMNS.values() if c in df.columns]
+    if bookmakers:
+        bookmaker_odds = _valid(_column_values(df, bookmakers))
+    else:
+        bookmaker_odds = np.full((len(df), 1), np.nan)
+    available = ~np.isnan(bookmaker_odds)
+    has_any = available.any(axis=1)
+
+    if source == "best":
+        market = _valid(_first_available(df, MARKET_MAX_COLUMNS))
+        fallback = np.where(available, bookmaker_odds, -np.inf).max(axis=1)
+    else:
+        market = _valid(_first_available(df, MARKET_AVG_COLUMNS))
+        fallback = np.where(available, bookmaker_odds, 0.0).sum(axis=1) / np.maximum(available.sum(axis=1), 1)
+    fallback = np.where(has_any, fallback, np.nan)
+    return np.where(np.isnan(market), fallback, market)
+
+
+def build_odds_index(df, sources):
+    """
+    Indeks kursów: ramka z jedną kolumną na źródło (NaN, gdy kursu brak),
+    wyrównana wierszami z ramką meczów.
+    """
+    return pd.DataFrame({source: source_odds(df, source) for source in sources},
+                        index=df.index)
+
+
+def resolve_odds(odds_index, chain, fixed_odds):
+    """
+    Kurs dla każdego meczu według łańcucha źródeł: pierwsze dostępne źródło,
+    a na końcu (lub przy źródle "fixed") stały kurs fixed_odds.
+    """
+    values = np.full(len(odds_index), np.nan)
+    for source in chain:
+        if source == FIXED_SOURCE:
+            break
+        values = np.where(np.isnan(values), odds_index[source].to_numpy(dtype=float), values)
+    return np.where(np.isnan(values), fixed_odds, values)
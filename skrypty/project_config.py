@@ -0,0 +1,131 @@
+import json
+import os
+from pathlib import Path
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11 - pliki konfiguracji tylko w JSON
+    tomllib = None
+
+# --- WSPÓLNA KONFIGURACJA SKRYPTÓW ---
+#
+# Domyślne ustawienia wszystkich skryptów (pobieranie, analiza, symulacja, wykresy) w jednym miejscu.
+# Skrypty biorą stąd wartości swoich stałych modułu; cli.py nadpisuje je flagami albo plikiem konfiguracji.
+
+# 1. Folder z danymi (pliki <sezon>/<kraj>/<liga>.csv); na innych maszynach - zmienna środowiskowa
+DATA_PATH_ENV = "FOOTBALL_DATA_PATH"
+BASE_PATH = Path(os.environ.get(DATA_PATH_ENV) or "D:/football_data")
+
+# 2. Podfoldery wyników w folderze z danymi
+ANALYSIS_DIRNAME = "analiza_1"
+SIMULATION_DIRNAME = "symulacja_1"
+
+# 3. Aktualny sezon (rok zakończenia; sezon 2024-2025 = 2025)
+CURRENT_SEASON_END_YEAR = 2025
+
+# 4. Zestawy lig: analiza, symulacja (ograniczony dla szybszego testowania) i pobieranie
+LEAGUE_SETS = {
+    'analysis': {
+        "England": ["E0", "E1", "E2"],
+        "Germany": ["D1", "D2"],
+        "Italy": ["I1", "I2"],
+        "Spain": ["SP1", "SP2"],
+        "France": ["F1", "F2"],
+        "Scotland": ["SC0", "SC1", "SC2"],
+        "Netherlands": ["N1"],
+        "Belgium": ["B1"],
+        "Portugal": ["P1"],
+        "Turkey": ["T1"],
+        "Greece": ["G1"],
+    },
+    'simulation': {
+        "England": ["E0", "E1"],
+        "Germany": ["D1"],
+        "Italy": ["I1"],
+        "Spain": ["SP1"],
+        "France": ["F1"],
+        "Scotland": ["SC0"],
+        "Netherlands": ["N1"],
+        "Belgium": ["B1"],
+        "Portugal": ["P1"],
+        "Turkey": ["T1"],
+        "Greece": ["G1"],
+    },
+    'download': {
+        "England": ["E0", "E1", "E2"],
+        "Germany": ["D1", "D2", "D3"],
+        "Italy": ["I1", "I2"],
+        "Spain": ["SP1", "SP2"],
+        "France": ["F1", "F2"],
+        "Scotland": ["SC0", "SC1", "SC2"],
+        "Netherlands": ["N1"],
+        "Belgium": ["B1"],
+        "Portugal": ["P1"],
+        "Turkey": ["T1"],
+        "Greece": ["G1"],
+    },
+}
+
+
+# --- SEZONY I LIGI ---
+
+def get_seasons_to_analyze(last_season_end_year, num_seasons):
+    """Generuje listę nazw folderów sezonów do analizy (od najnowszego, format 2023-2024)."""
+    seasons = []
+    for i in range(num_seasons):
+        start_year = last_season_end_year - 1 - i
+        end_year = last_season_end_year - i
+        seasons.append(f"{start_year}-{end_year}")
+    return seasons
+
+
+def all_leagues():
+    """Suma wszystkich zestawów lig (kraj -> ligi, bez powtórzeń, w kolejności zestawów)."""
+    combined = {}
+    for league_set in LEAGUE_SETS.values():
+        for country, leagues in league_set.items():
+            combined[country] = list(dict.fromkeys(combined.get(country, []) + list(leagues)))
+    return combined
+
+
+def select_leagues(countries_leagues, selection):
+    """
+    Wybór lig ze struktury kraj -> ligi. Element selection to kod ligi ("E0"), kraj ("England" - ligi kraju
+    z countries_leagues) albo para "England/D3" (także liga spoza zestawu). Kolejność jak w selection.
+    ValueError dla nieznanych nazw.
+    """
+    if not selection:
+        return {country: list(leagues) for country, leagues in countries_leagues.items()}
+    catalogue = all_leagues()
+    selected = {}
+    for item in selection:
+        if "/" in item:
+            pairs = [tuple(item.split("/", 1))]
+        elif item in catalogue:
+            pairs = [(item, league) for league in countries_leagues.get(item, catalogue[item])]
+        else:
+            pairs = [(country, item) for country, leagues in catalogue.items() if item in leagues]
+            if not pairs:
+                raise ValueError(f"Nieznana liga lub kraj: {item}")
+        for country, league in pairs:
+            if league not in selected.setdefault(country, []):
+                selected[country].append(league)
+    return selected
+
+
+# --- PLIK KONFIGURACJI ---
+
+def read_config_file(path):
+    """
+    Wczytuje plik konfiguracji (.toml albo .json). Klucze główne: data_root, current_season_end_year;
+    sekcje poleceń (download / analyze / simulate / report): seasons, leagues, start_year i args
+    (dodatkowe argumenty skryptu, np. ["--workers", "4"]).
+    """
+    path = Path(path)
+    if path.suffix.lower() == ".toml":
+        if tomllib is None:
+            raise ValueError("Pliki .toml wymagają Pythona 3.11+ - użyj pliku .json.")
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
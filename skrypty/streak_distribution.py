@@ -0,0 +1,289 @@
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import match_store
+import project_config
+import sweep
+
+# --- ROZKŁAD SERII BEZ REMISU, HAZARD I KRZYWE PRZEŻYCIA ---
+#
+# Seria przed meczem (s) = liczba meczów drużyny bez remisu od jej ostatniego remisu (przez granice
+# sezonów i lig kraju - drużyna po spadku kontynuuje serię). Dla każdej grupy (liga albo drużyna)
+# liczymy wektorowo, ile meczów rozegrano przy serii s i w ilu padł remis:
+#   hazard h(s)                = P(remis w następnym meczu | seria s)
+#   przeżycie S(k | s)         = prod_{j=0..k-1} (1 - h(s + j))
+#   P(remis w ciągu k | s)     = 1 - S(k | s)
+# Rzadkie długie serie drużyny są ściągane do hazardu jej ligi (siła PRIOR_STRENGTH meczów),
+# hazard ligi - do jej ogólnego odsetka remisów. Serie od MAX_STREAK w górę tworzą jeden przedział.
+# Wynik to tablica P[wiersz, s, k - 1] zapisana w .npz - symulacja odczytuje ją indeksowaniem, O(1).
+
+# --- SEKCJA KONFIGURACJI ---
+
+# 1. Liczba ostatnich sezonów (pełna historia danych)
+STREAK_SEASONS = 25
+
+# 2. Najdłuższa seria z osobnym przedziałem i najdalszy horyzont k tablicy
+MAX_STREAK = 40
+MAX_HORIZON = 15
+
+# 3. Siła ściągania hazardu drużyny do hazardu ligi (w meczach)
+PRIOR_STRENGTH = 10.0
+
+# 4. Pliki wynikowe (w folderze analizy)
+STREAK_OUTPUT_DIRNAME = "rozklad_serii"
+LOOKUP_FILENAME = "streak_lookup.npz"
+HISTOGRAM_FILENAME = "histogram_serii.csv"
+LEAGUE_CURVES_FILENAME = "hazard_lig.csv"
+
+# Horyzonty pokazywane w tabeli krzywych lig
+REPORT_HORIZONS = [1, 3, 5, 10]
+
+MATCH_COLUMNS = ['Date', 'HomeTeam', 'AwayTeam', 'FTR', 'Season']
+
+
+class StreakLookup:
+    """
+    Tablica P(remis w ciągu k meczów | seria s) dla lig i drużyn.
+    probs[wiersz, s, k - 1] (s obcięte do max_streak), hazard[wiersz, s]; wiersze: row(country, league=..., team=...).
+    """
+
+    def __init__(self, level, country, name, probs, hazard, exposure, events):
+        self.level = np.asarray(level)
+        self.country = np.asarray(country)
+        self.name = np.asarray(name)
+        self.probs = probs
+        self.hazard = hazard
+        self.exposure = exposure
+        self.events = events
+        self.max_streak = probs.shape[1] - 1
+        self.max_horizon = probs.shape[2]
+        self._rows = {(lvl, c, n): i for i, (lvl, c, n) in enumerate(zip(self.level, self.country, self.name))}
+
+    def __len__(self):
+        return len(self.level)
+
+    def row(self, country, league=None, team=None):
+        """Wiersz drużyny (team) albo ligi (league); KeyError, jeśli grupy nie ma w tablicy."""
+        if team is not None:
+            return self._rows[('team', country, team)]
+        return self._rows[('league', country, league)]
+
+    def p_draw_within(self, row, streak, k):
+        """P(remis w ciągu k meczów | bieżąca seria bez remisu = streak); row / streak / k mogą być tablicami."""
+        return self.probs[row, np.minimum(streak, self.max_streak), np.asarray(k) - 1]
+
+    def survival(self, row, streak=0):
+        """Krzywa przeżycia S(k | streak) dla k = 1..max_horizon."""
+        return 1 - self.probs[row, min(streak, self.max_streak)]
+
+    def save(self, path):
+        """Zapis do jednego pliku .npz (bez pickle)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(path, level=self.level.astype(str), country=self.country.astype(str),
+                            name=self.name.astype(str), probs=self.probs, hazard=self.hazard,
+                            exposure=self.exposure, events=self.events)
+
+
+def load_streak_lookup(path):
+    """Wczytuje tablicę zapisaną przez StreakLookup.save."""
+    with np.load(path) as data:
+        return StreakLookup(data['level'], data['country'], data['name'], data['probs'], data['hazard'],
+                            data['exposure'], data['events'])
+
+
+# --- SERIE PRZED MECZEM (WEKTOROWO) ---
+
+def load_country_matches(base_path, country, league_codes, seasons_list, columns=MATCH_COLUMNS):
+    """Mecze wszystkich lig kraju z kolumną League, chronologicznie (w obrębie dnia stabilnie: sezon, liga, plik)."""
+    frames = []
+    for league_code in league_codes:
+        for season, df in match_store.iter_league_seasons(base_path, country, league_code, seasons_list,
+                                                          columns=columns, chronological=True):
+            frames.append(df.assign(League=league_code))
+    if not frames:
+        return None
+    matches = match_store.concat_frames(frames)
+    season_key = matches['Season'].map(match_store.season_sort_key).to_numpy()
+    order = np.lexsort((np.arange(len(matches)), season_key, matches['Date'].to_numpy()))
+    return matches.iloc[order].reset_index(drop=True)
+
+
+def pre_match_streaks(matches_df):
+    """
+    Serie drużyn przed każdym meczem. Zwraca słownik tablic długości 2 x liczba meczów (wiersze drużyna-mecz,
+    kolejno dla każdej drużyny chronologicznie): team, league, streak, is_draw, last (ostatni mecz drużyny),
+    match (wiersz meczu w matches_df; + liczba meczów dla drużyny gości) oraz teams (nazwy drużyn) i leagues (kody lig).
+    """
+    n = len(matches_df)
+    teams, team_codes = np.unique(np.concatenate([matches_df['HomeTeam'].to_numpy(dtype=object),
+                                                  matches_df['AwayTeam'].to_numpy(dtype=object)]).astype(str),
+                                  return_inverse=True)
+    leagues, league_codes = np.unique(np.tile(matches_df['League'].to_numpy(dtype=str), 2), return_inverse=True)
+    is_draw = np.tile((matches_df['FTR'] == 'D').to_numpy(dtype=bool), 2)
+
+    # Kolejne mecze drużyny: sortowanie po (drużyna, pozycja meczu)
+    position = np.tile(np.arange(n), 2)
+    order = np.lexsort((position, team_codes))
+    team, league, draw = team_codes[order], league_codes[order], is_draw[order]
+
+    # Nowy odcinek serii zaczyna się przy pierwszym meczu drużyny i po każdym remisie
+    new_team = np.ones(len(team), dtype=bool)
+    new_team[1:] = team[1:] != team[:-1]
+    segment_start = new_team.copy()
+    segment_start[1:] |= draw[:-1]
+    starts = np.flatnonzero(segment_start)
+    streak = np.arange(len(team)) - starts[np.cumsum(segment_start) - 1]
+    last = np.r_[new_team[1:], True]
+    return {'team': team, 'league': league, 'streak': streak, 'is_draw': draw, 'last': last, 'match': order,
+            'teams': teams, 'leagues': leagues}
+
+
+def streak_counts(group, streak, is_draw, n_groups, max_streak=MAX_STREAK):
+    """Macierze (grupa x seria): liczba meczów przy serii s i liczba remisów (serie >= max_streak razem)."""
+    index = group * (max_streak + 1) + np.minimum(streak, max_streak)
+    size = n_groups * (max_streak + 1)
+    exposure = np.bincount(index, minlength=size).reshape(n_groups, max_streak + 1)
+    events = np.bincount(index, weights=is_draw, minlength=size).astype(np.int64).reshape(n_groups, max_streak + 1)
+    return exposure, events
+
+
+def shrunk_hazard(exposure, events, prior, prior_strength=PRIOR_STRENGTH):
+    """Hazard (remisy + m * prior) / (mecze + m) - przy braku meczów przy danej serii równy prior."""
+    return (events + prior_strength * prior) / (exposure + prior_strength)
+
+
+def draw_within_table(hazard, max_horizon=MAX_HORIZON):
+    """P[g, s, k - 1] = 1 - prod_{j<k} (1 - h[g, min(s + j, max_streak)]) dla wszystkich grup naraz."""
+    max_streak = hazard.shape[1] - 1
+    steps = np.minimum(np.arange(max_streak + 1)[:, None] + np.arange(max_horizon)[None, :], max_streak)
+    survival = np.cumprod(1 - hazard[:, steps], axis=2)
+    return (1 - survival).astype(np.float32)
+
+
+def completed_run_histogram(streaks):
+    """Histogram zakończonych serii (długość serii przed remisem) i serie otwarte na końcu danych, per drużyna."""
+    team, streak, draw, last = streaks['team'], streaks['streak'], streaks['is_draw'], streaks['last']
+    completed = pd.DataFrame({'team': team[draw], 'length': streak[draw], 'censored': False})
+    # Seria otwarta po ostatnim meczu drużyny: długość = seria przed meczem + 1 (albo 0 po remisie)
+    open_runs = last & ~draw
+    censored = pd.DataFrame({'team': team[open_runs], 'length': streak[open_runs] + 1, 'censored': True})
+    runs = pd.concat([completed, censored], ignore_index=True)
+    return (runs.groupby(['team', 'length', 'censored']).size().rename('Runs').reset_index()
+            .sort_values(['team', 'censored', 'length'], kind='stable'))
+
+
+# --- ETAP ANALIZY DLA WSZYSTKICH LIG ---
+
+def country_streak_tables(base_path, country, league_codes, seasons_list,
+                          max_streak=MAX_STREAK, max_horizon=MAX_HORIZON, prior_strength=PRIOR_STRENGTH):
+    """
+    Tablice jednego kraju: hazard i P(remis w ciągu k | s) dla jego lig i drużyn oraz histogram serii drużyn.
+    Zwraca (słownik tablic, histogram) albo None, jeśli brak danych.
+    """
+    matches = load_country_matches(base_path, country, league_codes, seasons_list)
+    if matches is None or matches.empty:
+        return None
+    streaks = pre_match_streaks(matches)
+    teams, leagues = streaks['teams'], streaks['leagues']
+
+    league_exposure, league_events = streak_counts(streaks['league'], streaks['streak'], streaks['is_draw'],
+                                                   len(leagues), max_streak)
+    league_rate = league_events.sum(axis=1) / np.maximum(league_exposure.sum(axis=1), 1)
+    league_hazard = shrunk_hazard(league_exposure, league_events, league_rate[:, None], prior_strength)
+
+    team_exposure, team_events = streak_counts(streaks['team'], streaks['streak'], streaks['is_draw'],
+                                               len(teams), max_streak)
+    # Liga odniesienia drużyny = liga, w której rozegrała najwięcej meczów
+    team_league_matches = np.zeros((len(teams), len(leagues)), dtype=np.int64)
+    np.add.at(team_league_matches, (streaks['team'], streaks['league']), 1)
+    home_league = team_league_matches.argmax(axis=1)
+    team_hazard = shrunk_hazard(team_exposure, team_events, league_hazard[home_league], prior_strength)
+
+    hazard = np.vstack([league_hazard, team_hazard])
+    tables = {
+        'level': np.array(['league'] * len(leagues) + ['team'] * len(teams)),
+        'country': np.full(len(hazard), country),
+        'name': np.concatenate([leagues, teams]),
+        'hazard': hazard.astype(np.float32),
+        'probs': draw_within_table(hazard, max_horizon),
+        'exposure': np.vstack([league_exposure, team_exposure]),
+        'events': np.vstack([league_events, team_events]),
+    }
+    histogram = completed_run_histogram(streaks)
+    histogram.insert(0, 'Team', teams[histogram.pop('team').to_numpy()])
+    histogram.insert(0, 'League', leagues[home_league[pd.Index(teams).get_indexer(histogram['Team'])]])
+    histogram.insert(0, 'Country', country)
+    return tables, histogram.rename(columns={'length': 'Run Length', 'censored': 'Open'})
+
+
+def build_streak_lookup(base_path, countries_leagues, seasons_list, **params):
+    """Tablice wszystkich krajów w jednym StreakLookup oraz wspólny histogram serii drużyn."""
+    parts, histograms = [], []
+    for country, league_codes in countries_leagues.items():
+        result = country_streak_tables(base_path, country, league_codes, seasons_list, **params)
+        if result is not None:
+            parts.append(result[0])
+            histograms.append(result[1])
+    if not parts:
+        return None, None
+    merged = {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+    lookup = StreakLookup(merged['level'], merged['country'], merged['name'], merged['probs'], merged['hazard'],
+                          merged['exposure'], merged['events'])
+    return lookup, pd.concat(histograms, ignore_index=True)
+
+
+def league_curves_frame(lookup, horizons=REPORT_HORIZONS):
+    """Tabela krzywych lig: seria, mecze przy serii, remisy, hazard i P(remis w ciągu k)."""
+    rows = np.flatnonzero(lookup.level == 'league')
+    streak = np.arange(lookup.max_streak + 1)
+    frame = pd.DataFrame({
+        'Country': np.repeat(lookup.country[rows], len(streak)),
+        'League': np.repeat(lookup.name[rows], len(streak)),
+        'Streak': np.tile(streak, len(rows)),
+        'Matches At Streak': lookup.exposure[rows].ravel(),
+        'Draws': lookup.events[rows].ravel(),
+        'Hazard': np.round(lookup.hazard[rows].ravel(), 4),
+    })
+    for k in horizons:
+        if k <= lookup.max_horizon:
+            frame[f'P(Draw Within {k})'] = np.round(lookup.probs[rows, :, k - 1].ravel(), 4)
+    return frame
+
+
+def write_streak_distribution(base_path, countries_leagues, seasons_list, output_dir):
+    """Etap analizy: buduje tablicę, zapisuje .npz, histogram serii i krzywe lig. Zwraca ścieżkę tablicy."""
+    lookup, histogram = build_streak_lookup(base_path, countries_leagues, seasons_list)
+    if lookup is None:
+        print("Brak danych do rozkładu serii.")
+        return None
+    output_dir = Path(output_dir)
+    lookup_path = output_dir / LOOKUP_FILENAME
+    lookup.save(lookup_path)
+    sweep.write_csv_atomic(histogram, output_dir / HISTOGRAM_FILENAME, index=False)
+    sweep.write_csv_atomic(league_curves_frame(lookup), output_dir / LEAGUE_CURVES_FILENAME, index=False)
+    print(f"✅ Rozkład serii: {int((lookup.level == 'league').sum())} lig, {int((lookup.level == 'team').sum())} "
+          f"drużyn. Tablica zapisana w: {lookup_path}")
+    return lookup_path
+
+
+def get_output_dir(base_path=None):
+    """Folder wyników etapu w folderze analizy."""
+    return Path(base_path or project_config.BASE_PATH) / project_config.ANALYSIS_DIRNAME / STREAK_OUTPUT_DIRNAME
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rozkład serii bez remisu, hazard i P(remis w ciągu k | seria).")
+    parser.add_argument('--seasons', type=int, default=STREAK_SEASONS, help="Liczba ostatnich sezonów")
+    parser.add_argument('--leagues', nargs='+', default=None, help="Ligi lub kraje, np. E0 Germany")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    seasons = project_config.get_seasons_to_analyze(project_config.CURRENT_SEASON_END_YEAR, args.seasons)
+    leagues = project_config.select_leagues(project_config.LEAGUE_SETS['analysis'], args.leagues)
+    write_streak_distribution(project_config.BASE_PATH, leagues, seasons, get_output_dir())
+    print(f"Czas: {time.perf_counter() - start:.2f} s")
@@ -0,0 +1,277 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+import pandas as pd
+
+import match_store
+import project_config
+
+# --- MONITOR SERII BEZ REMISU W TRAKCIE SEZONU (PRZYROSTOWO) ---
+#
+# analysis_1 liczy 'Current Streak Without Draw' od nowa z całych sezonów. Monitor trzyma stan
+# każdej drużyny ligi w pliku JSON i po każdej kolejce parsuje z pliku CSV sezonu tylko dopisane bajty
+# (od zapamiętanego przesunięcia), więc aktualizacja kosztuje O(nowe mecze) plus skrót SHA-256 pliku (~100 KB).
+# Stan drużyny: bieżąca seria bez remisu (łączona przez granice sezonów, jak w analysis_1),
+# histogram zakończonych serii (długość serii przed remisem -> liczba) i mecze / remisy w sezonach.
+# Alert: seria drużyny przekracza percentyl jej własnego rozkładu zakończonych serii.
+# Zmiana już przeczytanej części pliku (poprawki wyników) wymusza odbudowę stanu od zera; alerty są wtedy
+# zwracane tylko dla wierszy sezonu spoza poprzedniego stanu (stan pliku pamięta liczbę przeczytanych wierszy).
+
+# --- SEKCJA KONFIGURACJI ---
+
+# 1. Liczba ostatnich sezonów, od których budowany jest stan (jak X_SEASONS w analysis_1)
+X_SEASONS = 5
+
+# 2. Percentyle własnego rozkładu serii drużyny, których przekroczenie daje alert
+ALERT_PERCENTILES = [90, 95]
+
+# 3. Minimalna liczba zakończonych serii drużyny, od której rozkład jest wiarygodny
+MIN_HISTORY_RUNS = 5
+
+# 4. Folder stanu (w folderze z danymi) i plik alertów
+MONITOR_DIRNAME = "monitor_remisow"
+ALERTS_FILENAME = "alerty.csv"
+
+STATE_VERSION = 3
+MONITOR_COLUMNS = ['Date', 'HomeTeam', 'AwayTeam', 'FTR']
+
+
+def get_state_path(state_dir, country, league_code):
+    """Plik stanu monitora jednej ligi."""
+    return Path(state_dir) / f"{country}_{league_code}.json"
+
+
+def new_state(country, league_code):
+    """Pusty stan ligi."""
+    return {'version': STATE_VERSION, 'country': country, 'league': league_code, 'files': {}, 'teams': {}}
+
+
+def load_state(state_path):
+    """Wczytuje stan ligi (klucze histogramu jako liczby); None, jeśli brak pliku lub inna wersja."""
+    try:
+        with open(state_path, encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if state.get('version') != STATE_VERSION:
+        return None
+    for team_state in state['teams'].values():
+        team_state['histogram'] = {int(length): count for length, count in team_state['histogram'].items()}
+    return state
+
+
+def save_state(state_path, state):
+    """Zapisuje stan atomowo (plik tymczasowy podmieniany jedną operacją)."""
+    state_path = Path(state_path)
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = state_path.with_name(f".{state_path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False)
+    os.replace(tmp_path, state_path)
+
+
+# --- ROZKŁAD SERII DRUŻYNY ---
+
+def histogram_quantile(histogram, percentile):
+    """Najmniejsza długość serii L, dla której co najmniej percentile% zakończonych serii ma długość <= L."""
+    total = sum(histogram.values())
+    if total == 0:
+        return None
+    needed = percentile / 100 * total
+    cumulative = 0
+    for length in sorted(histogram):
+        cumulative += histogram[length]
+        if cumulative >= needed:
+            return length
+    return max(histogram)
+
+
+def streak_percentile(histogram, streak):
+    """Odsetek zakończonych serii drużyny krótszych niż bieżąca seria."""
+    total = sum(histogram.values())
+    if total == 0:
+        return None
+    return 100 * sum(count for length, count in histogram.items() if length < streak) / total
+
+
+def team_state(state, team):
+    return state['teams'].setdefault(team, {'streak': 0, 'histogram': {}, 'seasons': {}, 'last_date': None})
+
+
+def apply_matches(state, matches_df, season, percentiles=ALERT_PERCENTILES, min_runs=MIN_HISTORY_RUNS,
+                  alert_from=0):
+    """
+    Dopisuje mecze (chronologicznie) do stanu ligi i zwraca listę alertów - drużyn, których seria
+    bez remisu w tym meczu osiągnęła próg percentyla (poprzednia seria była poniżej progu).
+    Wiersze przed alert_from (znane z poprzedniego stanu) zmieniają stan, ale nie dają alertów.
+    """
+    alerts = []
+    dates = matches_df['Date'].dt.strftime("%Y-%m-%d").to_numpy(dtype=object, na_value=None)
+    rows = zip(dates, matches_df['HomeTeam'].astype(object), matches_df['AwayTeam'].astype(object),
+               matches_df['FTR'].astype(object))
+    for row, (date, home, away, ftr) in enumerate(rows):
+        if ftr not in ('H', 'D', 'A'):
+            continue  # mecz bez wyniku (np. przełożony) nie zmienia serii
+        for team in (home, away):
+            ts = team_state(state, team)
+            counts = ts['seasons'].setdefault(season, [0, 0])
+            counts[0] += 1
+            ts['last_date'] = date
+            if ftr == 'D':
+                counts[1] += 1
+                ts['histogram'][ts['streak']] = ts['histogram'].get(ts['streak'], 0) + 1
+                ts['streak'] = 0
+                continue
+            ts['streak'] += 1
+            runs = sum(ts['histogram'].values())
+            if runs < min_runs or row < alert_from:
+                continue
+            for p in percentiles:
+                threshold = histogram_quantile(ts['histogram'], p)
+                if ts['streak'] - 1 < threshold <= ts['streak']:
+                    alerts.append({
+                        'Country': state['country'], 'League': state['league'], 'Season': season,
+                        'Date': date, 'Team': team, 'Streak': ts['streak'], 'Percentile': p,
+                        'Threshold': threshold, 'Historical Runs': runs,
+                    })
+    return alerts
+
+
+# --- PRZYROSTOWE CZYTANIE PLIKÓW SEZONÓW ---
+
+def read_appended_matches(csv_path, file_state, season, country):
+    """
+    Mecze dopisane do pliku od ostatniego odczytu (tylko pełne wiersze) i nowy stan pliku
+    (przesunięcie, skrót SHA-256 całej przeczytanej części, liczba przeczytanych wierszy).
+    Zwraca (ramka albo None, stan pliku); None jako stan = przeczytana część pliku się zmieniła.
+    """
+    offset = file_state.get('offset', 0) if file_state else 0
+    rows = file_state.get('rows', 0) if file_state else 0
+    data = csv_path.read_bytes()
+    header = data[:data.find(b"\n") + 1]
+    if file_state:
+        if len(data) < offset or hashlib.sha256(data[:offset]).hexdigest() != file_state['prefix']:
+            return None, None
+    else:
+        offset = len(header)
+    appended = data[offset:]
+
+    complete = appended[:appended.rfind(b"\n") + 1]
+    new_offset = offset + len(complete)
+    new_file_state = {'offset': new_offset, 'prefix': hashlib.sha256(data[:new_offset]).hexdigest(), 'rows': rows}
+    if not complete.strip():
+        return None, new_file_state
+
+    text, _ = match_store.decode_csv_bytes(header + complete)
+    df = match_store.canonicalize_team_names(match_store.parse_csv_text(text, season, MONITOR_COLUMNS), country)
+    # Kolejność jak w analysis_1: chronologicznie, stabilnie w obrębie dnia
+    df = df.sort_values(by='Date', kind='stable').reset_index(drop=True)
+    new_file_state['rows'] = rows + len(df)
+    return df, new_file_state
+
+
+def update_league(country, league_code, seasons_list, state_dir, base_path=None, rebuild=False,
+                  percentiles=ALERT_PERCENTILES, known_rows=None):
+    """
+    Aktualizuje stan ligi o mecze dopisane do plików sezonów (sezony chronologicznie).
+    Zwraca (stan, alerty, liczba nowych meczów). Gdy przeczytana część pliku się zmieniła, stan jest budowany
+    od nowa, a alerty i nowe mecze dotyczą tylko wierszy spoza poprzedniego stanu (known_rows: sezon -> liczba
+    wierszy już przeczytanych). Budowa bez poprzedniego stanu (rebuild, brak pliku stanu) nie daje alertów.
+    """
+    base_path = Path(base_path or project_config.BASE_PATH)
+    state_path = get_state_path(state_dir, country, league_code)
+    state = None if rebuild else load_state(state_path)
+    if state is None:
+        state = new_state(country, league_code)
+    else:
+        known_rows = {}  # stan wczytany: wszystkie wiersze dopisane od ostatniego odczytu są nowe
+    previous_rows = {season: file_state.get('rows', 0) for season, file_state in state['files'].items()}
+
+    alerts, new_matches = [], 0
+    for season in sorted(seasons_list, key=match_store.season_sort_key):
+        csv_path = match_store.get_source_path(base_path, season, country, league_code)
+        if not csv_path.exists():
+            continue
+        df, file_state = read_appended_matches(csv_path, state['files'].get(season), season, country)
+        if file_state is None:
+            # Przeczytana część pliku się zmieniła - stan budujemy od nowa, alerty tylko dla nowych wierszy
+            return update_league(country, league_code, seasons_list, state_dir, base_path, True, percentiles,
+                                 known_rows=previous_rows)
+        state['files'][season] = file_state
+        if df is not None:
+            known = min(known_rows.get(season, 0), len(df)) if known_rows else 0
+            new_matches += len(df) - known
+            alert_from = len(df) if known_rows is None else known
+            alerts.extend(apply_matches(state, df, season, percentiles, alert_from=alert_from))
+
+    save_state(state_path, state)
+    return state, alerts, new_matches
+
+
+def streaks_frame(state):
+    """Bieżące serie i rozkład serii drużyn ligi (tabela do porównania z analysis_1)."""
+    rows = []
+    for team, ts in state['teams'].items():
+        rows.append({
+            'Team': team,
+            'Current Streak Without Draw': ts['streak'],
+            'Streak Percentile': streak_percentile(ts['histogram'], ts['streak']),
+            'Historical Runs': sum(ts['histogram'].values()),
+            'Last Match': ts['last_date'],
+            **{f'P{p} Streak': histogram_quantile(ts['histogram'], p) for p in ALERT_PERCENTILES},
+        })
+    return pd.DataFrame(rows).sort_values('Current Streak Without Draw', ascending=False, kind='stable')
+
+
+def append_alerts(alerts, alerts_path):
+    """Dopisuje alerty do pliku CSV (nagłówek przy pierwszym zapisie)."""
+    if not alerts:
+        return
+    alerts_path = Path(alerts_path)
+    alerts_path.parent.mkdir(parents=True, exist_ok=True)
+    pd.DataFrame(alerts).to_csv(alerts_path, mode="a", header=not alerts_path.exists(), index=False)
+
+
+def parse_monitor_args(argv=None):
+    """Argumenty wiersza poleceń monitora."""
+    parser = argparse.ArgumentParser(description="Przyrostowy monitor serii bez remisu (alerty percentylowe).")
+    parser.add_argument('--leagues', nargs='+', default=None, help="Ligi lub kraje, np. E0 Germany")
+    parser.add_argument('--seasons', type=int, default=X_SEASONS, help="Liczba ostatnich sezonów stanu")
+    parser.add_argument('--percentiles', nargs='+', type=float, default=ALERT_PERCENTILES)
+    parser.add_argument('--state-dir', type=Path, default=None,
+                        help=f"Folder stanu (domyślnie <dane>/{MONITOR_DIRNAME})")
+    parser.add_argument('--rebuild', action='store_true', help="Zbuduj stan od nowa ze wszystkich sezonów")
+    parser.add_argument('--show', action='store_true', help="Wypisz najdłuższe bieżące serie każdej ligi")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_monitor_args(argv)
+    state_dir = args.state_dir or project_config.BASE_PATH / MONITOR_DIRNAME
+    seasons = project_config.get_seasons_to_analyze(project_config.CURRENT_SEASON_END_YEAR, args.seasons)
+    leagues = project_config.select_leagues(project_config.LEAGUE_SETS['analysis'], args.leagues)
+
+    all_alerts = []
+    for country, league_codes in leagues.items():
+        for league_code in league_codes:
+            start = time.perf_counter()
+            state, alerts, new_matches = update_league(country, league_code, seasons, state_dir,
+                                                       rebuild=args.rebuild, percentiles=args.percentiles)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            print(f"{country} {league_code}: nowe mecze {new_matches}, alerty {len(alerts)} ({elapsed_ms:.1f} ms)")
+            for alert in alerts:
+                print(f"  ⚠️ {alert['Date']} {alert['Team']}: seria {alert['Streak']} bez remisu "
+                      f">= P{alert['Percentile']:g} ({alert['Threshold']}, {alert['Historical Runs']} serii)")
+            if args.show and state['teams']:
+                print(streaks_frame(state).head(5).to_string(index=False))
+            all_alerts.extend(alerts)
+
+    append_alerts(all_alerts, Path(state_dir) / ALERTS_FILENAME)
+
+
+if __name__ == "__main__":
+    main()
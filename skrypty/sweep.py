@@ -0,0 +1,132 @@
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+
+import instrumentation
+
+# --- WSPÓLNA WARSTWA URUCHAMIANIA ZADAŃ DLA LIG ---
+#
+# Każda liga (lub sezon ligi) jest niezależna, więc zadania (kraj, liga) albo (kraj, liga, sezon)
+# rozdzielamy na pulę procesów. Wynik każdego zadania to słownik z polami TASK_RESULT_COLUMNS,
+# a błędy są zbierane zamiast przerywać cały przebieg. Błąd jednego sezonu w zadaniu ligi (record_season_error)
+# pomija tylko ten sezon - zadanie liczy pozostałe, a błąd trafia do pola 'Errors' wyniku.
+
+TASK_RESULT_COLUMNS = ['Country', 'League', 'Season', 'Status', 'Rows', 'Output', 'Error', 'Errors', 'Seconds']
+
+_season_errors = []  # błędy sezonów bieżącego zadania w procesie (zerowane przez run_task)
+
+
+def record_season_error(season, error):
+    """Zapisuje błąd sezonu pominiętego w bieżącym zadaniu (trafia do pola 'Errors' wyniku run_task)."""
+    _season_errors.append(f"{season}: {type(error).__name__}: {error}")
+
+
+def write_csv_atomic(df, output_filepath, **to_csv_kwargs):
+    """Zapisuje CSV do pliku tymczasowego w tym samym folderze i podmienia go jedną operacją."""
+    output_filepath = Path(output_filepath)
+    output_filepath.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_filepath.with_name(f".{output_filepath.name}.{os.getpid()}.tmp")
+    try:
+        df.to_csv(tmp_path, **to_csv_kwargs)
+        os.replace(tmp_path, output_filepath)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    return output_filepath
+
+
+def build_tasks(countries_leagues, seasons_list=None):
+    """Lista zadań (kraj, liga) albo - jeśli podano sezony - (kraj, liga, sezon)."""
+    tasks = []
+    for country, leagues in countries_leagues.items():
+        for league in leagues:
+            if seasons_list is None:
+                tasks.append((country, league))
+            else:
+                tasks.extend((country, league, season) for season in seasons_list)
+    return tasks
+
+
+def run_task(task_fn, task, *args):
+    """
+    Uruchamia jedno zadanie i zwraca ustrukturyzowany wynik.
+    task_fn zwraca DataFrame, ścieżkę zapisanego pliku albo None (brak danych).
+    """
+    country, league = task[0], task[1]
+    season = task[2] if len(task) > 2 else None
+    result = {'Country': country, 'League': league, 'Season': season, 'Status': 'ok',
+              'Rows': 0, 'Output': None, 'Error': None, 'Errors': [], 'Seconds': 0.0, 'Data': None}
+    _season_errors.clear()
+    start = time.perf_counter()
+    try:
+        with instrumentation.stage('task', country, league, season) as st, \
+                instrumentation.profile_task(country, league, season):
+            value = task_fn(*task, *args)
+            st.rows = len(value) if isinstance(value, pd.DataFrame) else None
+        if value is None:
+            result['Status'] = 'empty'
+        elif isinstance(value, pd.DataFrame):
+            result['Rows'] = len(value)
+            result['Data'] = value
+            if value.empty:
+                result['Status'] = 'empty'
+        else:
+            result['Output'] = str(value)
+    except Exception as e:
+        result['Status'] = 'error'
+        result['Error'] = f"{type(e).__name__}: {e}\n{traceback.format_exc()}"
+    result['Errors'] = list(_season_errors)
+    result['Seconds'] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def run_sweep(task_fn, tasks, *args, workers=1):
+    """
+    Wykonuje task_fn(*task, *args) dla każdego zadania - szeregowo (workers=1)
+    albo na puli procesów. Zwraca wyniki w kolejności zadań.
+    """
+    if workers <= 1 or len(tasks) <= 1:
+        return [run_task(task_fn, task, *args) for task in tasks]
+
+    results = [None] * len(tasks)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(run_task, task_fn, task, *args): i for i, task in enumerate(tasks)}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+    return results
+
+
+def summarize_results(results):
+    """Tabela podsumowania zadań (bez danych pośrednich)."""
+    rows = [{**{k: r[k] for k in TASK_RESULT_COLUMNS}, 'Errors': '; '.join(r['Errors'])} for r in results]
+    return pd.DataFrame(rows, columns=TASK_RESULT_COLUMNS)
+
+
+def report_summary(results, summary_filepath=None):
+    """Wypisuje krótkie podsumowanie przebiegu i opcjonalnie zapisuje je do CSV."""
+    summary_df = summarize_results(results)
+    counts = summary_df['Status'].value_counts().to_dict()
+    season_errors = sum(len(r['Errors']) for r in results)
+    print(f"\nZadania: {len(summary_df)} | ok: {counts.get('ok', 0)} | bez danych: {counts.get('empty', 0)} | błędy: {counts.get('error', 0)}"
+          f" | błędy sezonów: {season_errors}")
+    for _, row in summary_df[summary_df['Status'] == 'error'].iterrows():
+        season = f" {row['Season']}" if row['Season'] else ""
+        print(f"  Błąd {row['Country']} {row['League']}{season}: {row['Error'].splitlines()[0]}")
+    for r in results:
+        for error in r['Errors']:
+            print(f"  Pominięty sezon {r['Country']} {r['League']} {error}")
+    if summary_filepath is not None:
+        write_csv_atomic(summary_df, summary_filepath, index=False)
+    return summary_df
+
+
+def add_sweep_arguments(parser):
+    """Dodaje do parsera argparse wspólne opcje przebiegu po ligach."""
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Liczba procesów roboczych (domyślnie 1 - przebieg szeregowy)")
+    return parser
+
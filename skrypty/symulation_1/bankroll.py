@@ -0,0 +1,228 @@
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Moduły współdzielone z analizą leżą w folderze nadrzędnym (skrypty/)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import progression
+import sweep
+import symulation_1 as sim
+import team_schedule
+
+# --- MONTE CARLO: SKOŃCZONY KAPITAŁ I RYZYKO BANKRUCTWA ---
+#
+# simulate_fibonacci_progression zakłada nieograniczony kapitał. Tutaj symulujemy wiele trajektorii
+# kapitału naraz: kilka równoległych progresji (drużyn), limit stawki, skończony kapitał początkowy.
+# Sekwencje remisów (i kursy) losujemy z historii ligi bootstrapem blokowym - bloki kolejnych meczów
+# jednej drużyny w jednym sezonie zachowują strukturę serii bez remisu.
+# Po remisie progresja danej drużyny zaczyna się od nowa; bankructwo = brak środków na kolejne stawki.
+
+# --- SEKCJA KONFIGURACJI ---
+
+N_TRAJECTORIES = 1_000_000
+INITIAL_BANKROLL = 1000.0    # kapitał początkowy (jednostki)
+MAX_STAKE = 233.0            # limit pojedynczej stawki (jednostki)
+CONCURRENT_PROGRESSIONS = 3  # liczba drużyn obstawianych równolegle
+HORIZON_MATCHES = 38         # liczba kolejek w trajektorii
+BLOCK_LENGTH = 5             # długość bloku bootstrapu (mecze)
+RESET_ON_EXHAUSTION = False  # True = po wyczerpaniu ciągu progresja zaczyna się od nowa (stop-loss)
+BATCH_SIZE = 50_000          # trajektorie liczone w jednej paczce tablic
+SEED = 0
+
+BANKROLL_OUTPUT_FILENAME = "bankroll_monte_carlo.csv"
+PERCENTILES = [5, 25, 50, 75, 95]
+
+
+def build_draw_pool(country, league_code, seasons_list, teams=None):
+    """
+    Pula historycznych sekwencji: flagi remisów i kursy kolejnych meczów drużyn, sklejone w jedną tablicę.
+    Każdy segment to jedna drużyna w jednym sezonie (opcjonalnie tylko drużyny z `teams`).
+    Zwraca (draws[bool], odds[float], segment_lengths[int]) albo None, jeśli brak danych.
+    """
+    draws, odds, lengths = [], [], []
+    for season in seasons_list:
+        schedule = sim.load_team_match_data(country, league_code, season)
+        if schedule is None:
+            continue
+        for team in schedule:
+            if teams is not None and team not in teams:
+                continue
+            draws.append(schedule.results_of(team) == team_schedule.RESULT_DRAW)
+            odds.append(schedule.team_values(team, 'DrawOdds').astype(np.float64))
+            lengths.append(len(draws[-1]))
+    if not lengths:
+        return None
+    return np.concatenate(draws), np.concatenate(odds), np.array(lengths, dtype=np.int64)
+
+
+def valid_block_starts(segment_lengths, block_length):
+    """Pozycje w puli, od których cały blok mieści się w jednym segmencie (drużyna, sezon)."""
+    segment_starts = np.r_[0, np.cumsum(segment_lengths)[:-1]]
+    starts = [start + np.arange(length - block_length + 1)
+              for start, length in zip(segment_starts, segment_lengths) if length >= block_length]
+    if not starts:
+        raise ValueError(f"Żaden segment nie ma co najmniej {block_length} meczów - zmniejsz długość bloku.")
+    return np.concatenate(starts).astype(np.int32)
+
+
+def simulate_bankroll_batch(draws, odds, block_starts, n_trajectories, rng, fib_sequence=sim.FIBONACCI_SEQUENCE,
+                            initial_bankroll=INITIAL_BANKROLL, max_stake=MAX_STAKE,
+                            concurrent=CONCURRENT_PROGRESSIONS, horizon=HORIZON_MATCHES,
+                            block_length=BLOCK_LENGTH, reset_on_exhaustion=RESET_ON_EXHAUSTION):
+    """
+    Symuluje jedną paczkę trajektorii kapitału (tablice concurrent x n_trajectories, pętla tylko po kolejkach).
+    Zwraca słownik tablic na trajektorię: ruined, ruin_step, final_bankroll, max_drawdown,
+    max_drawdown_pct, peak_exposure.
+    """
+    stake_table = np.minimum(progression.stake_schedule(fib_sequence, len(fib_sequence)), max_stake)
+    n_levels = len(stake_table)
+    # Wynik jednostki stawki dla każdego meczu puli: kurs - 1 przy remisie, -1 przy jego braku
+    payout = np.where(draws, odds - 1, -1.0)
+
+    # Układ (progresja, trajektoria): sumy po progresjach to dodawanie ciągłych wierszy
+    n_blocks = -(-horizon // block_length)
+    starts = block_starts[rng.integers(0, len(block_starts), size=(n_blocks, concurrent, n_trajectories))]
+
+    level = np.zeros((concurrent, n_trajectories), dtype=np.intp)
+    lost_in_progression = np.zeros((concurrent, n_trajectories))
+    bankroll = np.full(n_trajectories, float(initial_bankroll))
+    peak = bankroll.copy()
+    max_drawdown = np.zeros(n_trajectories)
+    max_drawdown_pct = np.zeros(n_trajectories)
+    peak_exposure = np.zeros(n_trajectories)
+    alive = np.ones(n_trajectories, dtype=bool)
+    ruin_step = np.full(n_trajectories, -1, dtype=np.int32)
+
+    for step in range(horizon):
+        stakes = stake_table[level]
+
+        # Bankructwo: kapitał nie pokrywa stawek wszystkich otwartych progresji
+        ruined_now = alive & (bankroll < stakes.sum(axis=0))
+        ruin_step[ruined_now] = step
+        alive &= ~ruined_now
+        stakes *= alive
+
+        # Ekspozycja = stawki przegrane w bieżących progresjach + stawki tej kolejki
+        exposure = lost_in_progression + stakes
+        np.maximum(peak_exposure, exposure.sum(axis=0), out=peak_exposure)
+
+        match_payout = payout[starts[step // block_length] + step % block_length]
+        is_draw = match_payout > 0
+        bankroll += (stakes * match_payout).sum(axis=0)
+
+        exposure[is_draw] = 0.0
+        lost_in_progression = exposure
+        level += 1
+        if reset_on_exhaustion:
+            exhausted = level >= n_levels
+            level[exhausted] = 0
+            lost_in_progression[exhausted] = 0.0
+        else:
+            np.minimum(level, n_levels - 1, out=level)
+        level[is_draw] = 0
+
+        np.maximum(peak, bankroll, out=peak)
+        drawdown = peak - bankroll
+        np.maximum(max_drawdown, drawdown, out=max_drawdown)
+        np.maximum(max_drawdown_pct, drawdown / peak * 100, out=max_drawdown_pct)
+
+    return {
+        'ruined': ~alive,
+        'ruin_step': ruin_step,
+        'final_bankroll': bankroll,
+        'max_drawdown': max_drawdown,
+        'max_drawdown_pct': max_drawdown_pct,
+        'peak_exposure': peak_exposure,
+    }
+
+
+def simulate_bankroll(draws, odds, segment_lengths, n_trajectories=N_TRAJECTORIES, batch_size=BATCH_SIZE,
+                      seed=SEED, block_length=BLOCK_LENGTH, **params):
+    """Symuluje n_trajectories trajektorii w paczkach po batch_size i łączy wyniki."""
+    rng = np.random.default_rng(seed)
+    block_starts = valid_block_starts(segment_lengths, block_length)
+    batches = []
+    for first in range(0, n_trajectories, batch_size):
+        size = min(batch_size, n_trajectories - first)
+        batches.append(simulate_bankroll_batch(draws, odds, block_starts, size, rng,
+                                               block_length=block_length, **params))
+    return {key: np.concatenate([batch[key] for batch in batches]) for key in batches[0]}
+
+
+def summarize_bankroll(results):
+    """Podsumowanie trajektorii: prawdopodobieństwo bankructwa, czas do bankructwa, obsunięcia, ekspozycja."""
+    ruined = results['ruined']
+    summary = {
+        'Trajectories': len(ruined),
+        'Ruin Probability (%)': round(float(ruined.mean()) * 100, 3),
+        'Mean Final Bankroll': round(float(results['final_bankroll'].mean()), 2),
+    }
+    ruin_steps = results['ruin_step'][ruined]
+    for p in PERCENTILES:
+        summary[f'Time To Ruin P{p}'] = float(np.percentile(ruin_steps, p)) if len(ruin_steps) else np.nan
+    for key, label in [('final_bankroll', 'Final Bankroll'), ('max_drawdown', 'Max Drawdown'),
+                       ('max_drawdown_pct', 'Max Drawdown (%)'), ('peak_exposure', 'Peak Exposure')]:
+        for p, value in zip(PERCENTILES, np.percentile(results[key], PERCENTILES)):
+            summary[f'{label} P{p}'] = round(float(value), 2)
+    return summary
+
+
+def bankroll_league(country, league_code, seasons_list, params):
+    """Zadanie dla jednej ligi: pula historycznych sekwencji i symulacja Monte Carlo."""
+    print(f"\n--- Monte Carlo kapitału: {country} - {league_code} ---")
+    pool = build_draw_pool(country, league_code, seasons_list)
+    if pool is None:
+        return None
+    draws, odds, segment_lengths = pool
+    results = simulate_bankroll(draws, odds, segment_lengths, **params)
+    return pd.DataFrame([{'Country': country, 'League': league_code,
+                          'Historical Draw Rate (%)': round(draws.mean() * 100, 2),
+                          **summarize_bankroll(results)}])
+
+
+def parse_bankroll_args(argv=None):
+    """Argumenty wiersza poleceń symulacji kapitału."""
+    parser = sweep.add_sweep_arguments(argparse.ArgumentParser(
+        description="Monte Carlo kapitału dla progresji remisów (skończony kapitał, ryzyko bankructwa)."))
+    parser.add_argument('--trajectories', type=int, default=N_TRAJECTORIES)
+    parser.add_argument('--bankroll', type=float, default=INITIAL_BANKROLL, help="Kapitał początkowy (jednostki)")
+    parser.add_argument('--max-stake', type=float, default=MAX_STAKE, help="Limit pojedynczej stawki")
+    parser.add_argument('--concurrent', type=int, default=CONCURRENT_PROGRESSIONS,
+                        help="Liczba równoległych progresji (drużyn)")
+    parser.add_argument('--horizon', type=int, default=HORIZON_MATCHES, help="Liczba kolejek trajektorii")
+    parser.add_argument('--block-length', type=int, default=BLOCK_LENGTH, help="Długość bloku bootstrapu")
+    parser.add_argument('--reset-on-exhaustion', action='store_true',
+                        help="Po wyczerpaniu ciągu Fibonacciego zacznij progresję od nowa")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--seed', type=int, default=SEED)
+    args = parser.parse_args(argv)
+    params = {
+        'n_trajectories': args.trajectories, 'batch_size': args.batch_size, 'seed': args.seed,
+        'block_length': args.block_length, 'initial_bankroll': args.bankroll, 'max_stake': args.max_stake,
+        'concurrent': args.concurrent, 'horizon': args.horizon, 'reset_on_exhaustion': args.reset_on_exhaustion,
+    }
+    return args, params
+
+
+# --- GŁÓWNA PĘTLA WYKONAWCZA ---
+
+if __name__ == "__main__":
+    args, params = parse_bankroll_args()
+    seasons = sim.get_seasons_to_analyze(sim.CURRENT_SEASON_END_YEAR, sim.X_SEASONS)
+    print(f"Monte Carlo: {params['n_trajectories']} trajektorii na ligę, kapitał {params['initial_bankroll']}")
+
+    tasks = sweep.build_tasks(sim.COUNTRIES_LEAGUES)
+    results = sweep.run_sweep(bankroll_league, tasks, seasons, params, workers=args.workers)
+    sweep.report_summary(results)
+
+    frames = [r['Data'] for r in results if r['Status'] == 'ok']
+    if frames:
+        summary_df = pd.concat(frames, ignore_index=True)
+        output_filepath = sim.SIMULATION_OUTPUT_BASE_PATH / BANKROLL_OUTPUT_FILENAME
+        sweep.write_csv_atomic(summary_df, output_filepath, index=False)
+        print(summary_df[['Country', 'League', 'Ruin Probability (%)', 'Max Drawdown P95']].to_string(index=False))
+        print(f"✅ Symulacja kapitału zakończona. Wyniki zapisano w: {output_filepath}")
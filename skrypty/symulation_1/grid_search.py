@@ -0,0 +1,246 @@
+import argparse
+import itertools
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Moduły współdzielone z analizą leżą w folderze nadrzędnym (skrypty/)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import odds_index
+import progression
+import sweep
+import symulation_1 as sim
+import team_schedule
+
+# --- SEKCJA KONFIGURACJI ---
+
+# 1. Domyślna siatka = dokładnie konfiguracja z symulation_1.py
+DEFAULT_GRID = {
+    'sequence_lengths': [len(sim.FIBONACCI_SEQUENCE)],
+    'start_units': [sim.FIBONACCI_START_UNIT],
+    'odds_sources': ['fixed'],
+    'draw_odds': [sim.DRAW_ODDS],
+    'mid_season_fractions': [sim.MID_SEASON_FRACTION],
+    'top_ks': [sim.TOP_K],
+}
+
+# 2. Plik wynikowy (jedna tabela "tidy" dla wszystkich lig i konfiguracji)
+GRID_OUTPUT_FILENAME = "grid_search_wyniki.csv"
+
+GROUP_COLUMNS = ['Season', 'Mid-Season Fraction', 'Scenario']
+
+
+def fibonacci_sequence(length, start_unit=1):
+    """Ciąg Fibonacciego o zadanej długości, przeskalowany przez jednostkę startową."""
+    sequence = [start_unit, start_unit]
+    while len(sequence) < length:
+        sequence.append(sequence[-1] + sequence[-2])
+    return sequence[:length]
+
+
+def parse_grid_values(values, cast=float):
+    """
+    Zamienia wartości z wiersza poleceń na listę. Obsługuje pojedyncze liczby
+    oraz zakresy w postaci start:stop:krok (stop włącznie), np. 2.5:3.5:0.25.
+    ValueError dla niepoprawnej liczby, zakresu pustego (stop < start) albo kroku <= 0.
+    """
+    parsed = []
+    for value in values:
+        if ':' in value:
+            parts = value.split(':')
+            if len(parts) != 3:
+                raise ValueError(f"zakres '{value}' musi mieć postać start:stop:krok")
+            start, stop, step = (float(v) for v in parts)
+            if step <= 0:
+                raise ValueError(f"krok zakresu '{value}' musi być dodatni")
+            if stop < start:
+                raise ValueError(f"pusty zakres '{value}' (stop mniejszy niż start)")
+            count = int(round((stop - start) / step)) + 1
+            parsed.extend(cast(round(start + i * step, 10)) for i in range(count))
+        else:
+            parsed.append(cast(value))
+    return sorted(set(parsed))
+
+
+def odds_column(source):
+    """Kolumna wyborów z kursem meczu zamykającego progresję dla danego źródła kursów."""
+    return f'Odds {source}'
+
+
+def prepare_league_picks(country, league_code, seasons_list, mid_season_fractions, max_top_k, odds_sources=()):
+    """
+    Przygotowuje wybory drużyn dla wszystkich sezonów i punktów startu.
+    Tabele drużyn są budowane raz na sezon, statystyki połowy sezonu raz na (sezon, punkt startu),
+    a ranking każdego scenariusza raz dla największego top_k (mniejsze k to jego prefiks).
+    Zwraca DataFrame wyborów z długością progresji i wynikiem (niezależnymi od stawek i kursu)
+    oraz - dla każdego źródła z odds_sources - kursem meczu, w którym padł remis (NaN, gdy brak).
+    """
+    odds_sources = [source for source in odds_sources if source != odds_index.FIXED_SOURCE]
+    pick_frames = []
+    paths = []
+    odds_paths = {source: [] for source in odds_sources}
+    for season in seasons_list:
+        team_match_data = sim.load_team_match_data(country, league_code, season, odds_sources)
+        if team_match_data is None:
+            continue
+        for fraction in mid_season_fractions:
+            teams_mid_season_df = sim.compute_mid_season_stats(team_match_data, fraction)
+            if teams_mid_season_df.empty:
+                continue
+            picks = sim.select_scenario_picks(teams_mid_season_df, max_top_k)
+            pick_frames.append(picks[['Scenario', 'Rank', 'Team']].assign(**{'Season': season, 'Mid-Season Fraction': fraction}))
+            for team, start in zip(picks['Team'], picks['StartIndex']):
+                paths.append(team_match_data.results_of(team)[start:] == team_schedule.RESULT_DRAW)
+                for source in odds_sources:
+                    odds_paths[source].append(team_match_data.team_values(team, f'DrawOdds {source}')[start:])
+
+    if not pick_frames:
+        return pd.DataFrame()
+    picks_df = pd.concat(pick_frames, ignore_index=True)[GROUP_COLUMNS + ['Rank', 'Team']]
+    draw_flags, lengths = progression.pack_draw_flags(paths)
+    games, won = progression.first_draw_games(draw_flags, lengths)
+    picks_df['Games In Progression'] = games
+    picks_df['Won'] = won
+    for source in odds_sources:
+        match_odds = progression.pack_match_odds(odds_paths[source])
+        picks_df[odds_column(source)] = progression.draw_step_odds(match_odds, games)
+    return picks_df
+
+
+def evaluate_grid(picks_df, grid):
+    """
+    Ocenia wszystkie kombinacje parametrów na przygotowanych wyborach.
+    Dla każdego top_k wykonywane jest jedno grupowanie na macierzy (wybory x konfiguracje stawek i kursów).
+    Dla źródeł kursów innych niż "fixed" wartość 'Draw Odds' jest kursem zapasowym (gdy brak kursu bukmachera).
+    """
+    games = picks_df['Games In Progression'].to_numpy()
+    won = picks_df['Won'].to_numpy()
+    n_steps = max(int(games.max()), 1)
+
+    stake_configs = list(itertools.product(grid['sequence_lengths'], grid['start_units'],
+                                           grid['odds_sources'], grid['draw_odds']))
+    profits = np.empty((len(picks_df), len(stake_configs)))
+    max_capitals = np.empty_like(profits)
+    for j, (length, start_unit, odds_source, draw_odds) in enumerate(stake_configs):
+        stakes = progression.stake_schedule(fibonacci_sequence(length, start_unit), n_steps)
+        if odds_source != odds_index.FIXED_SOURCE:
+            draw_odds = picks_df[odds_column(odds_source)].fillna(draw_odds).to_numpy()
+        profits[:, j], max_capitals[:, j] = progression.progression_profits(games, won, stakes, draw_odds)
+
+    tables = []
+    for top_k in grid['top_ks']:
+        mask = (picks_df['Rank'] < top_k).to_numpy()
+        keys = picks_df.loc[mask, GROUP_COLUMNS]
+        base = keys.assign(Won=won[mask], Games=games[mask]).groupby(GROUP_COLUMNS, sort=False).agg(
+            Progressions=('Won', 'size'), Wins=('Won', 'sum'), AvgGames=('Games', 'mean'))
+        profit_sums = pd.DataFrame(profits[mask], index=pd.MultiIndex.from_frame(keys)).groupby(level=GROUP_COLUMNS, sort=False).sum()
+        capital_max = pd.DataFrame(max_capitals[mask], index=pd.MultiIndex.from_frame(keys)).groupby(level=GROUP_COLUMNS, sort=False).max()
+
+        # Rozwinięcie do formatu "tidy": jeden wiersz na (grupa, konfiguracja stawek i kursu)
+        n_groups, n_configs = len(base), len(stake_configs)
+        config_values = pd.DataFrame(stake_configs)
+        table = base.reset_index().loc[np.repeat(np.arange(n_groups), n_configs)].reset_index(drop=True)
+        table.insert(1, 'Top K', top_k)
+        table.insert(2, 'Sequence Length', np.tile(config_values[0].to_numpy(dtype=int), n_groups))
+        table.insert(3, 'Start Unit', np.tile(config_values[1].to_numpy(dtype=float), n_groups))
+        table.insert(4, 'Odds Source', np.tile(config_values[2].to_numpy(dtype=object), n_groups))
+        table.insert(5, 'Draw Odds', np.tile(config_values[3].to_numpy(dtype=float), n_groups))
+        table['Profit/Loss (Units)'] = profit_sums.to_numpy().ravel().round(2)
+        table['Max Capital Needed (Units)'] = capital_max.to_numpy().ravel()
+        tables.append(table)
+
+    results_df = pd.concat(tables, ignore_index=True)
+    results_df['Losses'] = results_df['Progressions'] - results_df['Wins']
+    results_df['Avg Games In Progression'] = results_df.pop('AvgGames').round(2)
+    return results_df
+
+
+def grid_search_league(country, league_code, seasons_list, grid):
+    """Zadanie dla jednej ligi: przygotowanie wyborów raz, potem ocena całej siatki."""
+    print(f"\n--- Siatka parametrów: {country} - {league_code} dla {len(seasons_list)} sezonów ---")
+    picks_df = prepare_league_picks(country, league_code, seasons_list,
+                                    grid['mid_season_fractions'], max(grid['top_ks']), grid['odds_sources'])
+    if picks_df.empty:
+        return None
+    results_df = evaluate_grid(picks_df, grid)
+    results_df.insert(0, 'Country', country)
+    results_df.insert(1, 'League', league_code)
+    return results_df
+
+
+def parse_grid_option(parser, option, values, cast, minimum=None, above=None, maximum=None):
+    """
+    Wartości jednej opcji siatki (parse_grid_values) w granicach: >= minimum, > above, <= maximum.
+    Błędne wartości kończą program przez parser.error.
+    """
+    try:
+        parsed = parse_grid_values(values, cast)
+    except ValueError as e:
+        parser.error(f"{option}: {e}")
+    if minimum is not None and parsed[0] < minimum:
+        parser.error(f"{option}: wartości muszą być >= {minimum}")
+    if above is not None and parsed[0] <= above:
+        parser.error(f"{option}: wartości muszą być > {above}")
+    if maximum is not None and parsed[-1] > maximum:
+        parser.error(f"{option}: wartości muszą być <= {maximum}")
+    return parsed
+
+
+def parse_grid_args(argv=None):
+    """Argumenty wiersza poleceń: zakresy parametrów siatki oraz liczba procesów."""
+    parser = sweep.add_sweep_arguments(argparse.ArgumentParser(
+        description="Backtest progresji remisów na siatce parametrów."))
+    parser.add_argument('--sequence-lengths', nargs='+', default=None,
+                        help="Długości ciągu Fibonacciego, np. 8 13 21 albo 8:21:1")
+    parser.add_argument('--start-units', nargs='+', default=None, help="Jednostki startowe ciągu")
+    parser.add_argument('--odds-sources', nargs='+', default=None,
+                        help="Źródła kursów na remis, np. fixed PSC PS best average (kurs zapasowy: --draw-odds)")
+    parser.add_argument('--draw-odds', nargs='+', default=None, help="Kursy na remis, np. 2.8:3.6:0.1")
+    parser.add_argument('--mid-season-fractions', nargs='+', default=None,
+                        help="Punkt startu progresji jako ułamek meczów drużyny, np. 0.3:0.7:0.1")
+    parser.add_argument('--top-ks', nargs='+', default=None, help="Liczba drużyn w scenariuszu, np. 1:5:1")
+    args = parser.parse_args(argv)
+
+    grid = dict(DEFAULT_GRID)
+    if args.sequence_lengths:
+        grid['sequence_lengths'] = parse_grid_option(parser, '--sequence-lengths', args.sequence_lengths, int, 1)
+    if args.start_units:
+        grid['start_units'] = parse_grid_option(parser, '--start-units', args.start_units, float, above=0)
+    if args.odds_sources:
+        for source in args.odds_sources:
+            try:
+                odds_index.source_columns(source)  # nieznane źródło - błąd przed startem przebiegu
+            except ValueError as e:
+                parser.error(f"--odds-sources: {e}")
+        grid['odds_sources'] = list(dict.fromkeys(args.odds_sources))
+    if args.draw_odds:
+        grid['draw_odds'] = parse_grid_option(parser, '--draw-odds', args.draw_odds, float, above=1)
+    if args.mid_season_fractions:
+        grid['mid_season_fractions'] = parse_grid_option(parser, '--mid-season-fractions',
+                                                         args.mid_season_fractions, float, above=0, maximum=1)
+    if args.top_ks:
+        grid['top_ks'] = parse_grid_option(parser, '--top-ks', args.top_ks, int, 1)
+    return args, grid
+
+
+# --- GŁÓWNA PĘTLA WYKONAWCZA ---
+
+if __name__ == "__main__":
+    args, grid = parse_grid_args()
+    n_configs = int(np.prod([len(values) for values in grid.values()]))
+
+    seasons = sim.get_seasons_to_analyze(sim.CURRENT_SEASON_END_YEAR, sim.X_SEASONS)
+    print(f"Rozpoczynam backtest {n_configs} konfiguracji dla sezonów: {seasons}")
+
+    tasks = sweep.build_tasks(sim.COUNTRIES_LEAGUES)
+    results = sweep.run_sweep(grid_search_league, tasks, seasons, grid, workers=args.workers)
+    sweep.report_summary(results)
+
+    frames = [r['Data'] for r in results if r['Status'] == 'ok']
+    if frames:
+        output_filepath = sim.SIMULATION_OUTPUT_BASE_PATH / GRID_OUTPUT_FILENAME
+        sweep.write_csv_atomic(pd.concat(frames, ignore_index=True), output_filepath, index=False)
+        print(f"✅ Backtest zakończony. Wyniki zapisano w: {output_filepath}")
@@ -0,0 +1,235 @@
+import argparse
+import heapq
+import itertools
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Moduły współdzielone z analizą leżą w folderze nadrzędnym (skrypty/)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import progression
+import project_config
+import staking
+import sweep
+import symulation_1 as sim
+
+# --- PORTFEL: WSZYSTKIE LIGI CHRONOLOGICZNIE Z JEDNYM KAPITAŁEM ---
+#
+# symulation_1 liczy każdą progresję osobno, a visualization.py sumuje wyniki. W praktyce wiele progresji
+# trwa jednocześnie i korzysta z jednego kapitału. Tutaj każde zadanie ligi zwraca zdarzenia swoich
+# progresji (mecz wybranej drużyny: data, krok, remis, kurs, stawka strategii) posortowane po dacie,
+# a strumienie lig są łączone heapq.merge w jeden strumień chronologiczny.
+# Dzień po dniu: najpierw stawki wszystkich meczów dnia (kontynuowane progresje przed nowymi, z limitami
+# ekspozycji), potem rozliczenie. Progresja, której kolejna stawka nie mieści się w limitach, jest
+# przerywana (strata dotychczasowych stawek); nowa progresja bez miejsca w limitach jest pomijana.
+
+# --- SEKCJA KONFIGURACJI ---
+
+# 1. Kapitał i limity
+INITIAL_BANKROLL = 1000.0         # kapitał początkowy (jednostki)
+MAX_STAKE = 233.0                 # limit pojedynczej stawki (jak w bankroll.py)
+MAX_OPEN_PROGRESSIONS = 10        # maksymalna liczba progresji trwających jednocześnie
+MAX_DAILY_EXPOSURE = 0.25         # suma stawek jednego dnia jako ułamek kapitału na początku dnia
+
+# 2. Strategia stawek (nazwa z staking.STAKING_STRATEGIES)
+PORTFOLIO_STRATEGY = 'Fibonacci'
+
+# 3. Folder wyników (w folderze symulacji)
+PORTFOLIO_DIRNAME = "portfel"
+EQUITY_FILENAME = "krzywa_kapitalu.csv"
+PROGRESSIONS_FILENAME = "progresje_portfela.csv"
+
+STATUS_WIN = "Win"
+STATUS_LOSS = "Loss"
+STATUS_STOPPED = "Stopped"
+STATUS_SKIPPED = "Skipped"
+
+
+def league_progression_events(country, league_code, seasons_list, strategy=None):
+    """
+    Zdarzenia progresji ligi we wszystkich sezonach: jeden wiersz na mecz wybranej drużyny od punktu startu
+    do pierwszego remisu (włącznie) albo końca sezonu. Stawki z funkcji strategii liczone raz dla wszystkich ścieżek.
+    Zwraca DataFrame posortowany po dacie albo None, jeśli brak danych.
+    """
+    name, stakes_fn, params, odds_key = strategy or staking.select_strategies([PORTFOLIO_STRATEGY])[0]
+    prepared = staking.prepare_league_paths(country, league_code, seasons_list)
+    if prepared is None:
+        return None
+
+    picks_df, paths = prepared
+    draw_flags, match_odds, dates = paths['draw_flags'], paths[odds_key], paths['dates']
+    games, _ = progression.first_draw_games(draw_flags, paths['lengths'])
+    n_steps = max(draw_flags.shape[1], 1)
+    stakes = np.broadcast_to(stakes_fn(n_steps, match_odds, picks_df['DrawProbability'].to_numpy(), **params),
+                             (len(picks_df), n_steps))
+
+    pick, step = np.nonzero(np.arange(draw_flags.shape[1]) < games[:, None])
+    events = pd.DataFrame({
+        'Date': dates[pick, step],
+        'Pick': pick,
+        'Step': step,
+        'Last': step == games[pick] - 1,
+        'Draw': draw_flags[pick, step],
+        'Odds': match_odds[pick, step],
+        'Stake': stakes[pick, step],
+        'Season': picks_df['Season'].to_numpy()[pick],
+        'Scenario': picks_df['Scenario'].to_numpy()[pick],
+        'Team': picks_df['Team'].to_numpy()[pick],
+    })
+    events = events[events['Date'].notna()]
+    return events.sort_values(['Date', 'Pick', 'Step'], kind='stable').reset_index(drop=True)
+
+
+def merged_event_stream(league_events):
+    """
+    Jeden strumień chronologiczny z posortowanych zdarzeń lig (k-way merge na kopcu).
+    Elementy: (data w ns, indeks ligi, wiersz zdarzenia w tabeli ligi).
+    """
+    streams = [zip(events['Date'].to_numpy().view(np.int64).tolist(), itertools.repeat(i), range(len(events)))
+               for i, events in enumerate(league_events)]
+    return heapq.merge(*streams)
+
+
+def run_portfolio(league_events, initial_bankroll=INITIAL_BANKROLL, max_stake=MAX_STAKE,
+                  max_open=MAX_OPEN_PROGRESSIONS, max_daily_exposure=MAX_DAILY_EXPOSURE):
+    """
+    Symuluje wszystkie progresje z jednym kapitałem (pętla po dniach strumienia zdarzeń).
+    Zwraca (krzywa kapitału - DataFrame na dzień, słownik stanów progresji (liga, wybór) -> stan).
+    """
+    columns = [{name: events[name].to_numpy().tolist() for name in ('Pick', 'Step', 'Last', 'Draw', 'Odds', 'Stake')}
+               for events in league_events]
+    bankroll = float(initial_bankroll)
+    peak = bankroll
+    progressions = {}
+    open_keys = set()
+    equity = []
+
+    for date_ns, day_events in itertools.groupby(merged_event_stream(league_events), key=lambda event: event[0]):
+        # Kontynuowane progresje mają pierwszeństwo przed nowymi (stabilnie w kolejności strumienia)
+        day_events = sorted(day_events, key=lambda event: columns[event[1]]['Step'][event[2]] == 0)
+        day_limit = max_daily_exposure * bankroll
+        day_stakes = 0.0
+        bets = []
+        for _, league_i, row in day_events:
+            col = columns[league_i]
+            key = (league_i, col['Pick'][row])
+            if col['Step'][row] == 0:
+                state = progressions[key] = {'Status': None, 'Start': date_ns, 'End': date_ns,
+                                             'Games': 0, 'Spent': 0.0, 'Profit': 0.0}
+                if len(open_keys) >= max_open:
+                    state['Status'] = STATUS_SKIPPED
+                    continue
+                open_keys.add(key)
+            else:
+                state = progressions.get(key)
+                if state is None or key not in open_keys:
+                    continue
+
+            stake = min(col['Stake'][row], max_stake)
+            if day_stakes + stake > min(day_limit, bankroll):
+                # Brak miejsca w limitach: nowa progresja jest pomijana, trwająca - przerywana
+                state['Status'] = STATUS_SKIPPED if state['Games'] == 0 else STATUS_STOPPED
+                state['Profit'] = -state['Spent']
+                open_keys.discard(key)
+                continue
+            day_stakes += stake
+            bets.append((key, state, stake, row, col))
+
+        committed = day_stakes + sum(progressions[key]['Spent'] for key in open_keys)
+        open_count = len(open_keys)
+        for key, state, stake, row, col in bets:
+            state['Games'] += 1
+            state['End'] = date_ns
+            if col['Draw'][row]:
+                bankroll += stake * (col['Odds'][row] - 1)
+                state['Status'] = STATUS_WIN
+                state['Profit'] = stake * (col['Odds'][row] - 1) - state['Spent']
+                open_keys.discard(key)
+                continue
+            bankroll -= stake
+            state['Spent'] += stake
+            if col['Last'][row]:
+                state['Status'] = STATUS_LOSS
+                state['Profit'] = -state['Spent']
+                open_keys.discard(key)
+
+        peak = max(peak, bankroll)
+        equity.append((date_ns, bankroll, peak - bankroll, open_count, len(bets), day_stakes, committed))
+
+    equity_df = pd.DataFrame(equity, columns=['Date', 'Bankroll', 'Drawdown', 'Open Progressions', 'Bets',
+                                              'Day Stakes', 'Committed Capital'])
+    equity_df['Date'] = pd.to_datetime(equity_df['Date'])
+    return equity_df, progressions
+
+
+def progressions_frame(progressions, league_events, league_labels):
+    """Tabela progresji portfela: liga, sezon, scenariusz, drużyna, daty, liczba meczów, status i wynik."""
+    first_rows = [events.groupby('Pick', sort=False).head(1).set_index('Pick') for events in league_events]
+    rows = []
+    for (league_i, pick), state in progressions.items():
+        first = first_rows[league_i].loc[pick]
+        country, league_code = league_labels[league_i]
+        rows.append({
+            'Country': country, 'League': league_code, 'Season': first['Season'],
+            'Scenario': first['Scenario'], 'Team': first['Team'],
+            'Start Date': pd.Timestamp(state['Start']).date(), 'End Date': pd.Timestamp(state['End']).date(),
+            'Games In Progression': state['Games'], 'Status': state['Status'] or 'Open',
+            'Profit/Loss (Units)': round(state['Profit'], 2),
+        })
+    return pd.DataFrame(rows)
+
+
+def parse_portfolio_args(argv=None):
+    """Argumenty wiersza poleceń symulacji portfela."""
+    parser = sweep.add_sweep_arguments(argparse.ArgumentParser(
+        description="Chronologiczna symulacja progresji wszystkich lig z jednym kapitałem."))
+    parser.add_argument('--leagues', nargs='+', default=None, help="Ligi lub kraje, np. E0 Germany")
+    parser.add_argument('--seasons', type=int, default=sim.X_SEASONS, help="Liczba ostatnich sezonów")
+    parser.add_argument('--strategy', default=PORTFOLIO_STRATEGY, help="Strategia stawek (staking.py)")
+    parser.add_argument('--bankroll', type=float, default=INITIAL_BANKROLL, help="Kapitał początkowy (jednostki)")
+    parser.add_argument('--max-stake', type=float, default=MAX_STAKE, help="Limit pojedynczej stawki")
+    parser.add_argument('--max-open', type=int, default=MAX_OPEN_PROGRESSIONS,
+                        help="Maksymalna liczba jednoczesnych progresji")
+    parser.add_argument('--max-daily-exposure', type=float, default=MAX_DAILY_EXPOSURE,
+                        help="Suma stawek dnia jako ułamek kapitału")
+    return parser.parse_args(argv)
+
+
+# --- GŁÓWNA PĘTLA WYKONAWCZA ---
+
+def main(argv=None):
+    args = parse_portfolio_args(argv)
+    strategy = staking.select_strategies([args.strategy])[0]
+    seasons = sim.get_seasons_to_analyze(sim.CURRENT_SEASON_END_YEAR, args.seasons)
+    leagues = project_config.select_leagues(sim.COUNTRIES_LEAGUES, args.leagues)
+    print(f"Portfel: {strategy[0]}, kapitał {args.bankroll}, {args.seasons} sezonów")
+
+    tasks = sweep.build_tasks(leagues)
+    results = sweep.run_sweep(league_progression_events, tasks, seasons, strategy, workers=args.workers)
+    sweep.report_summary(results)
+    loaded = [r for r in results if r['Status'] == 'ok']
+    if not loaded:
+        return
+
+    league_events = [r['Data'] for r in loaded]
+    league_labels = [(r['Country'], r['League']) for r in loaded]
+    equity_df, progressions = run_portfolio(league_events, args.bankroll, args.max_stake,
+                                            args.max_open, args.max_daily_exposure)
+    progressions_df = progressions_frame(progressions, league_events, league_labels)
+
+    output_dir = sim.SIMULATION_OUTPUT_BASE_PATH / PORTFOLIO_DIRNAME
+    sweep.write_csv_atomic(equity_df, output_dir / EQUITY_FILENAME, index=False)
+    sweep.write_csv_atomic(progressions_df, output_dir / PROGRESSIONS_FILENAME, index=False)
+
+    print(progressions_df['Status'].value_counts().to_string())
+    print(f"Kapitał końcowy: {equity_df['Bankroll'].iloc[-1]:.2f} | maks. obsunięcie: {equity_df['Drawdown'].max():.2f}"
+          f" | maks. zaangażowany kapitał: {equity_df['Committed Capital'].max():.2f}"
+          f" | maks. jednoczesnych progresji: {equity_df['Open Progressions'].max()}")
+    print(f"✅ Symulacja portfela zakończona. Wyniki zapisano w: {output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+import numpy as np
+
+try:
+    import numba
+except ImportError:  # Numba jest opcjonalna - bez niej używamy wersji NumPy
+    numba = None
+
+# --- KERNEL PROGRESJI NA TABLICACH ---
+#
+# Ścieżka = kolejne mecze jednej drużyny (np. od połowy sezonu do końca).
+# Wszystkie ścieżki pakujemy w tablicę 2-D flag remisów (wiersz = ścieżka, dopełnienie False)
+# i liczymy wynik progresji dla wszystkich naraz.
+
+OUTCOME_WIN = "Win"
+OUTCOME_LOSS = "Loss"
+
+
+def pack_paths(paths, dtype=bool, fill_value=False):
+    """
+    Pakuje listę sekwencji (różnej długości) do tablicy 2-D dopełnionej wartością fill_value.
+    Zwraca (values[n_paths x max_len], lengths[int]).
+    """
+    lengths = np.array([len(p) for p in paths], dtype=np.int64)
+    max_len = int(lengths.max()) if len(lengths) else 0
+    values = np.full((len(paths), max_len), fill_value, dtype=dtype)
+    if max_len:
+        mask = np.arange(max_len) < lengths[:, None]
+        values[mask] = np.concatenate([np.asarray(p, dtype=dtype) for p in paths])
+    return values, lengths
+
+
+def pack_draw_flags(paths):
+    """
+    Pakuje listę sekwencji flag remisów (różnej długości) do tablicy 2-D.
+    Zwraca (draw_flags[bool, n_paths x max_len], lengths[int]).
+    """
+    return pack_paths(paths, dtype=bool, fill_value=False)
+
+
+def pack_match_odds(odds_paths):
+    """Pakuje kursy na remis kolejnych meczów ścieżek (jak pack_draw_flags, dopełnienie NaN)."""
+    match_odds, _ = pack_paths(odds_paths, dtype=np.float64, fill_value=np.nan)
+    return match_odds
+
+
+def stake_schedule(fib_sequence, n_steps):
+    """Stawki kolejnych kroków progresji; po wyczerpaniu ciągu powtarzana jest ostatnia stawka."""
+    fib = np.asarray(fib_sequence, dtype=np.float64)
+    steps = np.minimum(np.arange(n_steps), len(fib) - 1)
+    return fib[steps]
+
+
+def first_draw_games(draw_flags, lengths):
+    """
+    Długość progresji każdej ścieżki (mecz z pierwszym remisem albo cała ścieżka) i czy zakończyła się wygraną.
+    Nie zależy od stawek ani kursu, więc można ją policzyć raz dla wielu konfiguracji.
+    """
+    n_paths, max_len = draw_flags.shape
+    if max_len == 0:
+        return np.zeros(n_paths, dtype=np.int64), np.zeros(n_paths, dtype=bool)
+    hits = draw_flags & (np.arange(max_len) < lengths[:, None])
+    won = hits.any(axis=1)
+    games = np.where(won, hits.argmax(axis=1) + 1, lengths)
+    return games, won
+
+
+def draw_step_odds(draw_odds, games):
+    """
+    Kurs, po którym rozliczany jest ostatni krok progresji każdej ścieżki.
+    draw_odds - liczba (stały kurs) albo macierz kursów meczów [n_paths x max_len] z pack_match_odds.
+    """
+    if np.ndim(draw_odds) < 2:
+        return draw_odds
+    draw_odds = np.asarray(draw_odds, dtype=np.float64)
+    if draw_odds.shape[1] == 0:
+        return np.full(len(games), np.nan)
+    return draw_odds[np.arange(len(games)), np.maximum(games - 1, 0)]
+
+
+def progression_profits(games, won, stakes, draw_odds):
+    """
+    Zysk/strata i maksymalna stawka dla znanych długości progresji.
+    stakes - harmonogram stawek (co najmniej max(games) kroków) albo macierz stawek ścieżek
+    [n_paths x n_steps] (np. stawki zależne od kursu meczu), draw_odds - liczba lub tablica na ścieżkę.
+    """
+    stakes = np.asarray(stakes, dtype=np.float64)
+    if stakes.shape[-1] == 0:
+        return np.zeros(len(games)), np.zeros(len(games))
+    cum_stakes = np.cumsum(stakes, axis=-1)
+    max_stakes = np.maximum.accumulate(stakes, axis=-1)
+
+    last = np.maximum(games - 1, 0)
+    at_last = (np.arange(len(games)), last) if stakes.ndim == 2 else last
+    spent_before = cum_stakes[at_last] - stakes[at_last]
+    profit = np.where(won, stakes[at_last] * (np.asarray(draw_odds) - 1) - spent_before, -cum_stakes[at_last])
+    profit = np.where(games > 0, profit, 0.0)
+    max_capital = np.where(games > 0, max_stakes[at_last], 0.0)
+    return profit, max_capital
+
+
+def _progression_numpy(draw_flags, lengths, stakes, draw_odds):
+    games, won = first_draw_games(draw_flags, lengths)
+    profit, max_capital = progression_profits(games, won, stakes, draw_step_odds(draw_odds, games))
+    return games, profit, max_capital, won
+
+
+if numba is not None:
+    @numba.njit(cache=True)
+    def _progression_numba(draw_flags, lengths, stakes, draw_odds):
+        n_paths = draw_flags.shape[0]
+        games = np.zeros(n_paths, dtype=np.int64)
+        profit = np.zeros(n_paths)
+        max_capital = np.zeros(n_paths)
+        won = np.zeros(n_paths, dtype=np.bool_)
+        for p in range(n_paths):
+            spent = 0.0
+            for i in range(lengths[p]):
+                stake = stakes[i]
+                games[p] = i + 1
+                if stake > max_capital[p]:
+                    max_capital[p] = stake
+                if draw_flags[p, i]:
+                    profit[p] = stake * (draw_odds[p, i] - 1) - spent
+                    won[p] = True
+                    break
+                spent += stake
+            if not won[p]:
+                profit[p] = -spent
+        return games, profit, max_capital, won
+else:
+    _progression_numba = None
+
+
+def simulate_progressions(draw_flags, lengths, fib_sequence, draw_odds, engine="auto"):
+    """
+    Symuluje progresję Fibonacciego dla wszystkich ścieżek naraz.
+    draw_odds: stały kurs albo macierz kursów meczów (pack_match_odds) - kurs brany z meczu, w którym padł remis.
+    Zwraca (games_in_progression, profit_loss, max_capital_needed, won) - tablice długości n_paths.
+    engine: "auto" (Numba, jeśli zainstalowana), "numpy" lub "numba".
+    """
+    draw_flags = np.ascontiguousarray(draw_flags, dtype=bool)
+    lengths = np.asarray(lengths, dtype=np.int64)
+    stakes = stake_schedule(fib_sequence, max(draw_flags.shape[1], 1))
+
+    if engine == "numba" and _progression_numba is None:
+        raise ImportError("Numba nie jest zainstalowana - użyj engine='numpy'.")
+    if engine in ("auto", "numba") and _progression_numba is not None:
+        if np.ndim(draw_odds) < 2:
+            match_odds = np.full(draw_flags.shape, float(draw_odds))
+        else:
+            match_odds = np.ascontiguousarray(draw_odds, dtype=np.float64)
+        return _progression_numba(draw_flags, lengths, stakes, match_odds)
+    if np.ndim(draw_odds) < 2:
+        draw_odds = float(draw_odds)
+    return _progression_numpy(draw_flags, lengths, stakes, draw_odds)
+
+
+def outcome_labels(won):
+    """Zamienia tablicę wygranych na etykiety 'Win'/'Loss' używane w plikach wyników."""
+    return np.where(won, OUTCOME_WIN, OUTCOME_LOSS)
+
+
+# --- KONTROLA ZGODNOŚCI Z simulate_fibonacci_progression ---
+
+def check_parity(n_paths=2000, max_len=40, draw_rate=0.27, seed=0):
+    """
+    Porównuje kernel z dotychczasową funkcją simulate_fibonacci_progression
+    na losowych ścieżkach (również pustych i dłuższych niż ciąg Fibonacciego).
+    """
+    import pandas as pd
+    from symulation_1 import DRAW_ODDS, FIBONACCI_SEQUENCE, simulate_fibonacci_progression
+
+    rng = np.random.default_rng(seed)
+    paths = [rng.random(rng.integers(0, max_len + 1)) < draw_rate for _ in range(n_paths)]
+    draw_flags, lengths = pack_draw_flags(paths)
+
+    # Kurs stały oraz kursy meczów z indeksu kursów (różne dla każdego meczu)
+    odds_paths = [rng.uniform(2.5, 4.0, len(path)) for path in paths]
+    odds_variants = [(DRAW_ODDS, [DRAW_ODDS] * n_paths), (pack_match_odds(odds_paths), odds_paths)]
+
+    engines = ["numpy"] + (["numba"] if _progression_numba is not None else [])
+    for engine in engines:
+        for draw_odds, reference_odds in odds_variants:
+            games, profit, max_cap, won = simulate_progressions(
+                draw_flags, lengths, FIBONACCI_SEQUENCE, draw_odds, engine=engine)
+            for i, path in enumerate(paths):
+                team_matches = pd.DataFrame({'FTR': np.where(path, 'D', 'H')})
+                expected = simulate_fibonacci_progression(team_matches, FIBONACCI_SEQUENCE, reference_odds[i])
+                actual = (games[i], profit[i], max_cap[i], outcome_labels(won[i]))
+                assert expected[0] == actual[0] and np.isclose(expected[1], actual[1]) \
+                    and expected[2] == actual[2] and expected[3] == actual[3], (engine, i, expected, actual)
+    return engines
+
+
+if __name__ == "__main__":
+    checked = check_parity()
+    print(f"✅ Kernel progresji zgodny z simulate_fibonacci_progression (silniki: {', '.join(checked)}).")
@@ -0,0 +1,124 @@
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+# Moduły współdzielone z analizą leżą w folderze nadrzędnym (skrypty/)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import match_store
+
+# --- ZBIORCZY MAGAZYN WYNIKÓW SYMULACJI (PARQUET) ---
+#
+# Obok plików <Kraj>/<Kraj>_<Liga>_symulacja_progresji.csv symulacja zapisuje wyniki do jednego
+# zbioru z typowanymi kolumnami, partycjonowanego po lidze:
+#   <symulacja_1>/wyniki_symulacji/League=<Kraj>_<Liga>/part-0.parquet
+# Filtry ligi i scenariusza są przekazywane do odczytu - wykres jednej ligi czyta tylko jej partycję.
+
+RESULTS_DATASET_DIRNAME = "wyniki_symulacji"
+PARTITION_COLUMN = "League"
+
+# Kolumny tekstowe o niewielu wartościach zapisywane jako kategorie; liczby z ustalonymi typami
+CATEGORICAL_COLUMNS = ["Season", "Scenario", "Team", "Outcome"]
+COLUMN_DTYPES = {
+    'Matches To 50% Mark': 'int16',
+    'Games In Progression': 'int16',
+    'Profit/Loss (Units)': 'float64',
+    'Max Capital Needed (Units)': 'int64',
+}
+
+
+def get_dataset_path(output_base_path):
+    """Folder zbiorczego magazynu wyników."""
+    return Path(output_base_path) / RESULTS_DATASET_DIRNAME
+
+
+def league_label(country, league_code):
+    """Nazwa ligi w magazynie i na wykresach (Kraj_Liga)."""
+    return f"{country}_{league_code}"
+
+
+def get_partition_path(output_base_path, label):
+    """Plik Parquet partycji jednej ligi."""
+    return get_dataset_path(output_base_path) / f"{PARTITION_COLUMN}={label}" / "part-0.parquet"
+
+
+def typed_results(results_df):
+    """
+    Kopia wyników z typami magazynu: kategorie dla kolumn tekstowych (w kolejności pierwszego
+    wystąpienia - wykresy zachowują kolejność scenariuszy z symulacji) i węższe liczby całkowite.
+    """
+    typed = results_df.astype({col: pd.CategoricalDtype(pd.unique(results_df[col]))
+                               for col in CATEGORICAL_COLUMNS if col in results_df.columns})
+    return typed.astype({col: dtype for col, dtype in COLUMN_DTYPES.items() if col in typed.columns})
+
+
+def write_results_partition(output_base_path, country, league_code, results_df):
+    """Zapisuje (nadpisuje) partycję ligi atomowo i zwraca jej ścieżkę."""
+    partition_path = get_partition_path(output_base_path, league_label(country, league_code))
+    partition_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = partition_path.with_name(f".{partition_path.name}.{os.getpid()}.tmp")
+    typed_results(results_df.drop(columns=[PARTITION_COLUMN], errors='ignore')).to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, partition_path)
+    return partition_path
+
+
+def list_partitions(output_base_path):
+    """Partycje magazynu: {Kraj_Liga: ścieżka pliku}."""
+    dataset_path = get_dataset_path(output_base_path)
+    if not dataset_path.is_dir():
+        return {}
+    return {path.parent.name.split("=", 1)[1]: path
+            for path in sorted(dataset_path.glob(f"{PARTITION_COLUMN}=*/part-0.parquet"))}
+
+
+def read_partition(partition_path, label, scenarios=None, columns=None):
+    """Wczytuje partycję jednej ligi; filtr scenariuszy i wybór kolumn są wykonywane przy odczycie."""
+    filters = [('Scenario', 'in', list(scenarios))] if scenarios is not None else None
+    df = pq.read_table(partition_path, columns=columns, filters=filters).to_pandas()
+    df.insert(0, PARTITION_COLUMN, label)
+    return df
+
+
+def concat_results(frames):
+    """Łączy wyniki lig; kategorie z różnych partycji (różne słowniki) są ujednolicane."""
+    frames = [df.astype({col: 'category' for col in [PARTITION_COLUMN] + CATEGORICAL_COLUMNS
+                         if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype)})
+              for df in frames if df is not None]
+    combined = match_store.concat_frames(frames)
+    for col in [PARTITION_COLUMN] + CATEGORICAL_COLUMNS:
+        if col in combined.columns:
+            # Po filtrze w odczycie słownik partycji może zawierać wartości, których nie ma w wierszach
+            combined[col] = combined[col].cat.remove_unused_categories()
+    return combined
+
+
+def read_results(output_base_path, leagues=None, scenarios=None, columns=None):
+    """
+    Wczytuje wyniki z magazynu. leagues / scenarios ograniczają odczyt (partycje lig spoza listy
+    nie są otwierane), columns - tylko wybrane kolumny. Zwraca pustą ramkę, jeśli nic nie pasuje.
+    """
+    partitions = list_partitions(output_base_path)
+    if leagues is not None:
+        partitions = {label: path for label, path in partitions.items() if label in set(leagues)}
+    return concat_results(read_partition(path, label, scenarios, columns) for label, path in partitions.items())
+
+
+def ingest_csv_results(output_base_path):
+    """Jednorazowo przenosi istniejące pliki *_symulacja_progresji.csv do magazynu (np. po starszej wersji symulacji)."""
+    count = 0
+    for csv_path in sorted(Path(output_base_path).glob("*/*_symulacja_progresji.csv")):
+        country, league_code = csv_path.parent.name, csv_path.stem.split('_')[1]
+        write_results_partition(output_base_path, country, league_code, pd.read_csv(csv_path))
+        count += 1
+    return count
+
+
+if __name__ == "__main__":
+    import symulation_1 as sim
+
+    print(f"Zasilam magazyn wyników: {get_dataset_path(sim.SIMULATION_OUTPUT_BASE_PATH)}")
+    count = ingest_csv_results(sim.SIMULATION_OUTPUT_BASE_PATH)
+    print(f"✅ Przetworzono {count} plików.")
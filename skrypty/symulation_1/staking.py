@@ -0,0 +1,271 @@
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Moduły współdzielone z analizą leżą w folderze nadrzędnym (skrypty/)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import odds_index
+import progression
+import sweep
+import symulation_1 as sim
+
+# --- STRATEGIE STAWEK NA WSPÓLNYM KERNELU PROGRESJI ---
+#
+# Progresja kończy się pierwszym remisem, więc wynik ścieżki (liczba meczów, wygrana, kurs meczu z remisem)
+# nie zależy od stawek - first_draw_games liczy go raz dla wszystkich ścieżek ligi. Strategia to tylko
+# stawki kolejnych kroków po serii przegranych: harmonogram [n_steps] (Fibonacci, Martingale, D'Alembert,
+# Labouchère, stała stawka) albo macierz [n_paths x n_steps], gdy stawka zależy od kursu meczu (Kelly).
+# Porównanie strategii = jeden przebieg po danych + progression_profits dla każdej strategii.
+#
+# Interfejs strategii: funkcja (n_steps, match_odds, draw_probability, **parametry) -> stawki, gdzie
+# match_odds to macierz kursów meczów ścieżek (pack_match_odds), a draw_probability - oszacowanie
+# prawdopodobieństwa remisu dla ścieżki (tablica n_paths). Nowa strategia = nowy wiersz STAKING_STRATEGIES.
+# Wiersz wskazuje też kursy strategii: kursy symulacji ('DrawOdds' według ODDS_SOURCE_CHAIN - przy ["fixed"]
+# stały DRAW_ODDS) albo kursy rynkowe meczu (MARKET_ODDS_CHAIN); strategia stawia i jest rozliczana po swoich.
+
+# --- SEKCJA KONFIGURACJI ---
+
+# 1. Jednostka stawki (pierwsza stawka progresji)
+BASE_UNIT = 1.0
+
+# 2. Parametry strategii
+MARTINGALE_MULTIPLIER = 2.0   # mnożnik stawki po przegranej
+DALEMBERT_STEP = 1.0          # przyrost stawki po przegranej (w jednostkach)
+LABOUCHERE_LINE = [1, 2, 3]   # linia startowa Labouchère (stawka = pierwszy + ostatni element)
+KELLY_FRACTION = 0.25         # ułamek stawki Kelly'ego
+KELLY_BANKROLL = 1000.0       # kapitał, od którego liczona jest stawka Kelly'ego (jak INITIAL_BANKROLL w bankroll.py)
+
+# 3. Kursy rynkowe meczu (Kelly): pierwsze dostępne źródło odds_index, niezależnie od ODDS_SOURCE_CHAIN
+#    symulacji; mecz bez kursu w żadnym źródle dostaje kurs symulacji
+MARKET_ODDS_CHAIN = ["PSC", "PS", "B365", "average"]
+
+SIMULATION_ODDS = 'match_odds'   # klucze macierzy kursów w ścieżkach prepare_league_paths
+MARKET_ODDS = 'market_odds'
+
+STAKING_OUTPUT_FILENAME = "strategie_stawek.csv"
+
+
+def fibonacci_stakes(n_steps, match_odds, draw_probability, sequence=sim.FIBONACCI_SEQUENCE):
+    """Ciąg Fibonacciego z symulation_1 (po wyczerpaniu ciągu powtarzana jest ostatnia stawka)."""
+    return progression.stake_schedule(sequence, n_steps)
+
+
+def martingale_stakes(n_steps, match_odds, draw_probability, multiplier=MARTINGALE_MULTIPLIER, unit=BASE_UNIT):
+    """Martingale: stawka mnożona przez multiplier po każdej przegranej."""
+    return unit * multiplier ** np.arange(n_steps, dtype=np.float64)
+
+
+def dalembert_stakes(n_steps, match_odds, draw_probability, step=DALEMBERT_STEP, unit=BASE_UNIT):
+    """D'Alembert: stawka rośnie o step po każdej przegranej."""
+    return unit + step * np.arange(n_steps, dtype=np.float64)
+
+
+def labouchere_stakes(n_steps, match_odds, draw_probability, line=LABOUCHERE_LINE, unit=BASE_UNIT):
+    """
+    Labouchère: stawka = pierwszy + ostatni element linii (jeden element - on sam), przegrana dopisuje
+    stawkę na koniec linii. Wygrana kończy progresję, więc harmonogram wyznaczają same przegrane.
+    """
+    line = [float(value) for value in line]
+    stakes = np.empty(n_steps)
+    for i in range(n_steps):
+        stakes[i] = line[0] + line[-1] if len(line) > 1 else line[0]
+        line.append(stakes[i])
+    return unit * stakes
+
+
+def flat_stakes(n_steps, match_odds, draw_probability, unit=BASE_UNIT):
+    """Stała stawka w każdym meczu progresji."""
+    return np.full(n_steps, unit)
+
+
+def kelly_stakes(n_steps, match_odds, draw_probability, fraction=KELLY_FRACTION, bankroll=KELLY_BANKROLL):
+    """
+    Ułamkowy Kelly z kursem każdego meczu: f = (p * kurs - 1) / (kurs - 1), stawka = fraction * f * kapitał.
+    Kapitał maleje o przegrane stawki progresji (iloczyn skumulowany), brak przewagi (f <= 0) = brak zakładu.
+    Zwraca macierz stawek [n_paths x n_steps].
+    """
+    odds = np.asarray(match_odds, dtype=np.float64)[:, :n_steps]
+    probability = np.asarray(draw_probability, dtype=np.float64).reshape(-1, 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        edge = (probability * odds - 1) / (odds - 1)
+    bet_fraction = fraction * np.clip(np.nan_to_num(edge, nan=0.0), 0.0, 1.0)
+    remaining = np.cumprod(1 - bet_fraction, axis=1)
+    bankroll_before = bankroll * np.hstack([np.ones((len(odds), 1)), remaining[:, :-1]])
+    return bankroll_before * bet_fraction
+
+
+# 4. Strategie do porównania: (nazwa, funkcja stawek, parametry, kursy)
+STAKING_STRATEGIES = [
+    ('Fibonacci', fibonacci_stakes, {}, SIMULATION_ODDS),
+    ('Martingale', martingale_stakes, {}, SIMULATION_ODDS),
+    ("D'Alembert", dalembert_stakes, {}, SIMULATION_ODDS),
+    ('Labouchere', labouchere_stakes, {}, SIMULATION_ODDS),
+    ('Flat', flat_stakes, {}, SIMULATION_ODDS),
+    ('Kelly', kelly_stakes, {}, MARKET_ODDS),
+]
+
+
+def evaluate_strategies(games, won, paths, draw_probability, strategies=None):
+    """
+    Wyniki wszystkich strategii dla ścieżek o znanych długościach progresji (first_draw_games).
+    paths to ścieżki z prepare_league_paths - każda strategia bierze macierz kursów wskazaną w swoim wierszu.
+    Zwraca słownik: nazwa strategii -> (profit, max_capital, staked) - tablice długości n_paths.
+    """
+    strategies = STAKING_STRATEGIES if strategies is None else strategies
+    n_paths = len(games)
+    n_steps = max(int(games.max()) if n_paths else 0, 1)
+    last = np.maximum(games - 1, 0)
+
+    odds_by_key = {}
+    evaluated = {}
+    for name, stakes_fn, params, odds_key in strategies:
+        if odds_key not in odds_by_key:
+            match_odds = np.asarray(paths[odds_key], dtype=np.float64)
+            if match_odds.shape[1] < n_steps:
+                match_odds = np.hstack([match_odds, np.full((n_paths, n_steps - match_odds.shape[1]), np.nan)])
+            odds_by_key[odds_key] = match_odds, progression.draw_step_odds(match_odds, games)
+        match_odds, step_odds = odds_by_key[odds_key]
+        stakes = stakes_fn(n_steps, match_odds, draw_probability, **params)
+        profit, max_capital = progression.progression_profits(games, won, stakes, step_odds)
+        cum_stakes = np.cumsum(stakes, axis=-1)
+        staked = cum_stakes[(np.arange(n_paths), last) if np.ndim(stakes) == 2 else last]
+        evaluated[name] = (profit, max_capital, np.where(games > 0, staked, 0.0))
+    return evaluated
+
+
+def league_draw_rate(teams_mid_season_df):
+    """Odsetek remisów w meczach ligi do punktu startu progresji (bez meczów z przyszłości ścieżek)."""
+    matches = teams_mid_season_df['MatchesToMidSeason'].to_numpy(dtype=np.float64)
+    draws = teams_mid_season_df['DrawPercent'].to_numpy() / 100 * matches
+    return draws.sum() / matches.sum() if matches.sum() else np.nan
+
+
+def add_market_odds(team_match_data, chain=MARKET_ODDS_CHAIN):
+    """
+    Kolumna 'MarketDrawOdds' meczów sezonu: kurs na remis z pierwszego dostępnego źródła chain
+    (kolumny 'DrawOdds <źródło>' z load_team_match_data), a gdy brak - kurs symulacji 'DrawOdds'.
+    """
+    matches = team_match_data.matches
+    market = matches[[f'DrawOdds {source}' for source in chain]].set_axis(list(chain), axis=1)
+    matches['MarketDrawOdds'] = odds_index.resolve_odds(market, chain, matches['DrawOdds'].to_numpy())
+
+
+def prepare_league_paths(country, league_code, seasons_list):
+    """
+    Jeden przebieg po sezonach ligi: wybory scenariuszy z symulation_1, ich ścieżki i prawdopodobieństwo
+    remisu dla Kelly'ego (odsetek remisów ligi do połowy sezonu).
+    Zwraca (picks_df, paths) albo None, jeśli brak danych; paths to słownik macierzy ścieżek [n_picks x n_steps]:
+    'draw_flags', 'match_odds' (kursy symulacji), 'market_odds' (MARKET_ODDS_CHAIN), 'dates' (datetime64,
+    NaT za końcem ścieżki) oraz 'lengths' (tablica n_picks).
+    """
+    pick_frames, paths, odds_paths, market_paths, date_paths = [], [], [], [], []
+    for season in seasons_list:
+        team_match_data = sim.load_team_match_data(country, league_code, season, odds_sources=MARKET_ODDS_CHAIN)
+        if team_match_data is None:
+            continue
+        add_market_odds(team_match_data)
+        teams_mid_season_df = sim.compute_mid_season_stats(team_match_data)
+        if teams_mid_season_df.empty:
+            continue
+        picks = sim.select_scenario_picks(teams_mid_season_df)
+        draw_flags, lengths, match_odds = sim.pick_paths(team_match_data, picks)
+        paths.extend(row[:length] for row, length in zip(draw_flags, lengths))
+        odds_paths.extend(row[:length] for row, length in zip(match_odds, lengths))
+        market_paths.extend(sim.pick_values(team_match_data, picks, 'MarketDrawOdds'))
+        date_paths.extend(dates.astype('datetime64[ns]') for dates in sim.pick_values(team_match_data, picks, 'Date'))
+        pick_frames.append(picks[['Scenario', 'Team']].assign(
+            Season=season, DrawProbability=league_draw_rate(teams_mid_season_df)))
+
+    if not pick_frames:
+        return None
+    draw_flags, lengths = progression.pack_draw_flags(paths)
+    dates, _ = progression.pack_paths(date_paths, dtype='datetime64[ns]', fill_value=np.datetime64('NaT'))
+    return pd.concat(pick_frames, ignore_index=True), {
+        'draw_flags': draw_flags,
+        'lengths': lengths,
+        'match_odds': progression.pack_match_odds(odds_paths),
+        'market_odds': progression.pack_match_odds(market_paths),
+        'dates': dates,
+    }
+
+
+def compare_strategies_league(country, league_code, seasons_list, strategies=None):
+    """
+    Zadanie dla jednej ligi: ścieżki wczytane raz, długości progresji policzone raz, potem stawki
+    każdej strategii. Zwraca tabelę (scenariusz x strategia) z zyskiem, obrotem, ROI i kapitałem.
+    """
+    print(f"\n--- Strategie stawek: {country} - {league_code} dla {len(seasons_list)} sezonów ---")
+    prepared = prepare_league_paths(country, league_code, seasons_list)
+    if prepared is None:
+        return None
+    picks_df, paths = prepared
+    games, won = progression.first_draw_games(paths['draw_flags'], paths['lengths'])
+    evaluated = evaluate_strategies(games, won, paths, picks_df['DrawProbability'].to_numpy(), strategies)
+
+    frames = []
+    for name, (profit, max_capital, staked) in evaluated.items():
+        frames.append(picks_df[['Scenario']].assign(Strategy=name, Won=won, Profit=profit,
+                                                    Staked=staked, MaxCapital=max_capital))
+    summary = pd.concat(frames, ignore_index=True).groupby(['Scenario', 'Strategy'], sort=False).agg(
+        Progressions=('Won', 'size'), Wins=('Won', 'sum'), Profit=('Profit', 'sum'),
+        Staked=('Staked', 'sum'), MaxCapital=('MaxCapital', 'max')).reset_index()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        roi = np.where(summary['Staked'] > 0, summary['Profit'] / summary['Staked'] * 100, np.nan)
+    return pd.DataFrame({
+        'Country': country,
+        'League': league_code,
+        'Scenario': summary['Scenario'],
+        'Strategy': summary['Strategy'],
+        'Progressions': summary['Progressions'],
+        'Wins': summary['Wins'],
+        'Profit/Loss (Units)': summary['Profit'].round(2),
+        'Total Staked (Units)': summary['Staked'].round(2),
+        'ROI (%)': np.round(roi, 2),
+        'Max Capital Needed (Units)': summary['MaxCapital'].round(2),
+    })
+
+
+def select_strategies(names):
+    """Wiersze STAKING_STRATEGIES o podanych nazwach (bez rozróżniania wielkości liter); ValueError dla nieznanych."""
+    by_name = {row[0].lower(): row for row in STAKING_STRATEGIES}
+    unknown = [name for name in names if name.lower() not in by_name]
+    if unknown:
+        available = ', '.join(row[0] for row in STAKING_STRATEGIES)
+        raise ValueError(f"Nieznane strategie: {', '.join(unknown)} (dostępne: {available})")
+    return [by_name[name.lower()] for name in names]
+
+
+def parse_staking_args(argv=None):
+    """Argumenty wiersza poleceń porównania strategii."""
+    parser = sweep.add_sweep_arguments(argparse.ArgumentParser(
+        description="Porównanie strategii stawek (Fibonacci, Martingale, D'Alembert, Labouchère, stała, Kelly)."))
+    parser.add_argument('--strategies', nargs='+', default=None,
+                        help="Strategie do porównania, np. Fibonacci Flat Kelly (domyślnie wszystkie)")
+    args = parser.parse_args(argv)
+    strategies = select_strategies(args.strategies) if args.strategies else STAKING_STRATEGIES
+    return args, strategies
+
+
+# --- GŁÓWNA PĘTLA WYKONAWCZA ---
+
+if __name__ == "__main__":
+    args, strategies = parse_staking_args()
+    seasons = sim.get_seasons_to_analyze(sim.CURRENT_SEASON_END_YEAR, sim.X_SEASONS)
+    print(f"Porównanie strategii: {', '.join(row[0] for row in strategies)} dla sezonów: {seasons}")
+
+    tasks = sweep.build_tasks(sim.COUNTRIES_LEAGUES)
+    results = sweep.run_sweep(compare_strategies_league, tasks, seasons, strategies, workers=args.workers)
+    sweep.report_summary(results)
+
+    frames = [r['Data'] for r in results if r['Status'] == 'ok']
+    if frames:
+        summary_df = pd.concat(frames, ignore_index=True)
+        output_filepath = sim.SIMULATION_OUTPUT_BASE_PATH / STAKING_OUTPUT_FILENAME
+        sweep.write_csv_atomic(summary_df, output_filepath, index=False)
+        totals = summary_df.groupby('Strategy', sort=False)[['Profit/Loss (Units)', 'Total Staked (Units)']].sum()
+        print(totals.to_string())
+        print(f"✅ Porównanie strategii zakończone. Wyniki zapisano w: {output_filepath}")
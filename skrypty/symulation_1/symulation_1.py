@@ -1,65 +1,81 @@
 import pandas as pd
 import numpy as np
+import argparse
 import os
+import sys
 from pathlib import Path
 
+# Moduły współdzielone z analizą leżą w folderze nadrzędnym (skrypty/)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import instrumentation
+import match_store
+import odds_index
+import progression
+import project_config
+import results_store
+import sweep
+import team_schedule
+
 # --- SEKCJA KONFIGURACJI ---
 
-# 1. Ścieżka do głównego folderu z danymi
-BASE_PATH = Path("D:/football_data")
+# 1. Ścieżka do głównego folderu z danymi (project_config; zmienna FOOTBALL_DATA_PATH albo cli.py --data-root)
+BASE_PATH = project_config.BASE_PATH
 
 # 2. Folder bazowy dla wyników symulacji
-SIMULATION_OUTPUT_BASE_PATH = BASE_PATH / "symulacja_1"
+SIMULATION_OUTPUT_BASE_PATH = BASE_PATH / project_config.SIMULATION_DIRNAME
 
 # 3. Liczba ostatnich sezonów do analizy
 X_SEASONS = 24 
 
-# 4. Struktura państw i lig
-COUNTRIES_LEAGUES = {
-    "England": ["E0", "E1"], # Ograniczyłem dla szybszego testowania, możesz rozszerzyć
-    "Germany": ["D1"], 
-    "Italy": ["I1"],
-    "Spain": ["SP1"],
-    "France": ["F1"],
-    "Scotland": ["SC0"],
-    "Netherlands": ["N1"],
-    "Belgium": ["B1"],
-    "Portugal": ["P1"],
-    "Turkey": ["T1"],
-    "Greece": ["G1"]
-}
+# 4. Struktura państw i lig (zestaw ograniczony dla szybszego testowania - project_config.LEAGUE_SETS)
+COUNTRIES_LEAGUES = project_config.LEAGUE_SETS['simulation']
 
 # 5. Aktualny sezon (do wygenerowania listy sezonów do analizy)
-CURRENT_SEASON_END_YEAR = 2025
+CURRENT_SEASON_END_YEAR = project_config.CURRENT_SEASON_END_YEAR
 
 # 6. Konfiguracja symulacji
 FIBONACCI_START_UNIT = 1
 FIBONACCI_SEQUENCE = [1, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144, 233, 377, 610, 987, 1597, 2584, 4181, 6765, 10946] # Możesz rozszerzyć
-DRAW_ODDS = 3.0 # Stały kurs na remis
+DRAW_ODDS = 3.0 # Stały kurs na remis (również kurs zapasowy, gdy brak kursów bukmacherów)
+# Źródła kursów na remis w kolejności prób, np. ["PSC", "PS", "average"] - kurs zamknięcia Pinnacle,
+# potem Pinnacle, potem średnia rynkowa, a na końcu DRAW_ODDS. ["fixed"] = zawsze DRAW_ODDS.
+# Dostępne źródła: kody bukmacherów (B365, BW, PS, WH, VC, ...), "PSC", "best", "average", "fixed".
+ODDS_SOURCE_CHAIN = ["fixed"]
+MID_SEASON_FRACTION = 0.5 # Ułamek meczów drużyny, po którym startuje progresja
+TOP_K = 3 # Liczba drużyn wybieranych w każdym scenariuszu
+
+# 7. Scenariusze wyboru drużyn: (nazwa, cecha z profilu połowy sezonu, rosnąco?, liczba drużyn).
+# Nowy scenariusz = nowy wiersz tabeli; k = None oznacza TOP_K.
+SELECTION_SCENARIOS = [
+    ('Lowest Draw %', 'DrawPercent', True, None),
+    ('Longest Unbeaten Streak', 'UnbeatenStreak', False, None),
+    ('Highest Loss %', 'LossPercent', False, None),
+    ('Highest Win %', 'WinPercent', False, None),
+]
+
+# 8. Kolumny wczytywane z magazynu kolumnowego
+REQUIRED_COLUMNS = ['Date', 'HomeTeam', 'AwayTeam', 'FTR', 'Season']
 
 # --- FUNKCJE POMOCNICZE ---
 
-def get_seasons_to_analyze(last_season_end_year, num_seasons):
-    """Generuje listę nazw folderów sezonów do analizy."""
-    seasons = []
-    for i in range(num_seasons):
-        start_year = last_season_end_year - 1 - i
-        end_year = last_season_end_year - i
-        seasons.append(f"{start_year}-{end_year}")
-    return seasons
+get_seasons_to_analyze = project_config.get_seasons_to_analyze
+
 
 def simulate_fibonacci_progression(team_matches, fib_sequence, draw_odds):
     """
     Symuluje progresję Fibonacciego dla danej drużyny.
+    draw_odds to stały kurs albo kursy kolejnych meczów (np. kolumna 'DrawOdds' z indeksu kursów).
     Zwraca zysk/stratę, liczbę iteracji i maksymalny potrzebny kapitał.
     """
+    match_odds = np.broadcast_to(np.asarray(draw_odds, dtype=float), (len(team_matches),))
     current_bet_index = 0
     total_spent = 0
     total_profit_loss = 0
     max_capital_needed = 0
     games_in_progression = 0
 
-    for _, match in team_matches.iterrows():
+    for match_index, (_, match) in enumerate(team_matches.iterrows()):
         games_in_progression += 1
         
         # Sprawdzamy, czy w ciągu Fibonacciego są jeszcze kroki
@@ -77,7 +93,7 @@ def simulate_fibonacci_progression(team_matches, fib_sequence, draw_odds):
 
         if match['FTR'] == 'D':
             # Remis - zakład wygrany
-            profit = current_stake * (draw_odds - 1) # Zysk netto
+            profit = current_stake * (match_odds[match_index] - 1) # Zysk netto
             total_profit_loss += profit - (total_spent - current_stake) # Zysk minus poprzednie straty
             return games_in_progression, total_profit_loss, max_capital_needed, "Win"
         else:
@@ -89,200 +105,241 @@ def simulate_fibonacci_progression(team_matches, fib_sequence, draw_odds):
     return games_in_progression, total_profit_loss, max_capital_needed, "Loss"
 
 
+def load_team_match_data(country, league_code, season, odds_sources=()):
+    """
+    Wczytuje sezon ligi i buduje indeks terminarzy drużyn (TeamScheduleIndex, mecze posortowane po dacie).
+    Kursy na remis są liczone raz dla całego sezonu: kolumna 'DrawOdds' według ODDS_SOURCE_CHAIN
+    oraz - dla źródeł z odds_sources - surowe kolumny 'DrawOdds <źródło>' (NaN, gdy brak kursu).
+    Zwraca indeks terminarzy albo None, jeśli brak danych.
+    """
+    sources = list(dict.fromkeys(list(ODDS_SOURCE_CHAIN) + list(odds_sources)))
+    columns = REQUIRED_COLUMNS + odds_index.required_columns(sources)
+    df = match_store.read_partition(BASE_PATH, season, country, league_code, columns=columns)
+    if df is None:
+        print(f"Ostrzeżenie: Brak danych dla {season}/{country}/{league_code}.csv")
+        return None
+
+    if df['Date'].notna().any():
+        df = df.sort_values(by='Date').reset_index(drop=True)
+    else:
+        print(f"Ostrzeżenie: Brak kolumny 'Date' w danych dla {league_code}. Chronologia może być niepoprawna.")
+        return None
+
+    odds = odds_index.build_odds_index(df, sources)
+    df['DrawOdds'] = odds_index.resolve_odds(odds, ODDS_SOURCE_CHAIN, DRAW_ODDS)
+    for source in odds_sources:
+        df[f'DrawOdds {source}'] = odds[source]
+    df = df.drop(columns=odds_index.required_columns(sources))
+
+    # Terminarze drużyn z jednego przebiegu po ramce (zamiast filtrowania ramki osobno dla każdej drużyny)
+    team_match_data = team_schedule.TeamScheduleIndex(df)
+    
+    if len(team_match_data) == 0:
+        print(f"Brak danych meczowych dla ligi {league_code} w sezonie {season}.")
+        return None
+    return team_match_data
+
+
+def compute_mid_season_stats(team_match_data, mid_season_fraction=MID_SEASON_FRACTION):
+    """
+    Profil drużyn do punktu startu progresji (domyślnie połowa meczów drużyny w sezonie,
+    czyli total_team_matches // 2) - macierz drużyna x cecha liczona jednym przebiegiem
+    po indeksie terminarzy (TeamScheduleIndex) dla wszystkich drużyn naraz.
+    Drużyny bez ani jednego meczu przed punktem startu są pomijane.
+    """
+    n_teams = len(team_match_data)
+    half_season_matches_count = (team_match_data.counts() * mid_season_fraction).astype(np.int64)
+    team_id = team_match_data.row_team_ids()
+    step = team_match_data.team_steps()
+    results = team_match_data.results
+
+    # Mecze przed punktem startu i wyniki z punktu widzenia drużyny
+    in_window = step < half_season_matches_count[team_id]
+    _, num_draws, num_wins, num_losses = team_match_data.result_counts(half_season_matches_count)
+
+    # Aktualna seria bez porażki w punkcie startu = mecze po ostatniej porażce
+    loss_rows = in_window & (results == team_schedule.RESULT_LOSS)
+    last_loss = np.full(n_teams, -1, dtype=np.int64)
+    np.maximum.at(last_loss, team_id[loss_rows], step[loss_rows])
+    unbeaten_streak = np.where(last_loss >= 0, half_season_matches_count - 1 - last_loss, half_season_matches_count)
+
+    matches = np.maximum(half_season_matches_count, 1)
+    teams_mid_season_df = pd.DataFrame({
+        'Team': team_match_data.teams,
+        'MatchesToMidSeason': half_season_matches_count,
+        'DrawPercent': num_draws / matches * 100,
+        'UnbeatenStreak': unbeaten_streak,
+        'WinPercent': num_wins / matches * 100,
+        'LossPercent': num_losses / matches * 100,
+        'StartIndex': half_season_matches_count, # Indeks pierwszego meczu w progresji
+    })
+    return teams_mid_season_df[half_season_matches_count > 0].reset_index(drop=True)
+
+
+def top_k_positions(values, k, ascending=True):
+    """
+    Pozycje k najlepszych wartości (np.argpartition zamiast pełnego sortowania).
+    Remisy wartości rozstrzyga kolejność wierszy (stabilnie), jak sort_values(kind='stable').head(k).
+    """
+    keys = np.asarray(values, dtype=np.float64)
+    keys = keys if ascending else -keys
+    if k <= 0 or len(keys) == 0:
+        return np.array([], dtype=np.int64)
+    if k < len(keys):
+        threshold = keys[np.argpartition(keys, k - 1)[:k]].max()
+        candidates = np.flatnonzero(keys <= threshold)
+    else:
+        candidates = np.arange(len(keys))
+    return candidates[np.lexsort((candidates, keys[candidates]))][:k]
+
+
+def select_scenario_picks(teams_mid_season_df, top_k=None, scenarios=None):
+    """
+    Wybory drużyn dla wszystkich scenariuszy z tabeli SELECTION_SCENARIOS.
+    top_k nadpisuje liczbę drużyn wszystkich scenariuszy (np. w siatce parametrów).
+    Zwraca DataFrame: Scenario, Rank (0 = najlepsza drużyna) oraz kolumny profilu wybranych drużyn.
+    """
+    scenarios = SELECTION_SCENARIOS if scenarios is None else scenarios
+    picks = []
+    for scenario, feature, ascending, k in scenarios:
+        k = top_k if top_k is not None else (TOP_K if k is None else k)
+        positions = top_k_positions(teams_mid_season_df[feature].to_numpy(), k, ascending)
+        picks.append(teams_mid_season_df.iloc[positions].assign(Scenario=scenario, Rank=np.arange(len(positions))))
+    if not picks:
+        return pd.DataFrame()
+    return pd.concat(picks, ignore_index=True)
+
+
+def pick_paths(team_match_data, selected_picks):
+    """
+    Ścieżki progresji wybranych drużyn (mecze od StartIndex do końca sezonu) spakowane dla kernela:
+    (draw_flags, lengths, match_odds) - flagi remisów i kursy na remis (kolumna 'DrawOdds').
+    """
+    paths = [team_match_data.results_of(team)[start:] == team_schedule.RESULT_DRAW
+             for team, start in zip(selected_picks['Team'], selected_picks['StartIndex'])]
+    draw_flags, lengths = progression.pack_draw_flags(paths)
+    return draw_flags, lengths, progression.pack_match_odds(pick_values(team_match_data, selected_picks, 'DrawOdds'))
+
+
+def pick_values(team_match_data, selected_picks, column):
+    """Wartości kolumny meczów wybranych drużyn od StartIndex do końca sezonu (lista tablic, jedna na wybór)."""
+    return [team_match_data.team_values(team, column)[start:]
+            for team, start in zip(selected_picks['Team'], selected_picks['StartIndex'])]
+
+
+def simulate_league_season(country, league_code, season):
+    """
+    Wczytuje jeden sezon ligi, wybiera drużyny dla każdego scenariusza i symuluje ich progresje.
+    Zwraca listę wierszy wyników (pustą, jeśli brak danych).
+    """
+    season_results = []
+
+    # --- Przygotowanie danych dla drużyn ---
+    with instrumentation.stage('prepare', country, league_code, season) as st:
+        team_match_data = load_team_match_data(country, league_code, season)
+        st.rows = 0 if team_match_data is None else len(team_match_data.matches)
+    if team_match_data is None:
+        return []
+
+    # --- Znajdowanie punktu 50% meczów dla każdej drużyny ---
+    with instrumentation.stage('team_stats', country, league_code, season) as st:
+        teams_mid_season_df = compute_mid_season_stats(team_match_data)
+        st.rows = len(teams_mid_season_df)
+    if teams_mid_season_df.empty:
+        print(f"Brak wystarczających danych do obliczenia statystyk połowy sezonu dla ligi {league_code} w sezonie {season}.")
+        return []
+
+    # --- Wybór Top 3 drużyn dla każdego scenariusza ---
+    with instrumentation.stage('select', country, league_code, season) as st:
+        selected_picks = select_scenario_picks(teams_mid_season_df)
+        st.rows = len(selected_picks)
+
+    # --- Symulacja wszystkich wybranych ścieżek naraz (kernel tablicowy) ---
+    with instrumentation.stage('simulate', country, league_code, season, rows=len(selected_picks)):
+        draw_flags, lengths, match_odds = pick_paths(team_match_data, selected_picks)
+        games, profits, max_caps, won = progression.simulate_progressions(draw_flags, lengths, FIBONACCI_SEQUENCE, match_odds)
+        outcomes = progression.outcome_labels(won)
+
+    for i, row in enumerate(selected_picks.itertuples(index=False)):
+        season_results.append({
+            'Season': season,
+            'Scenario': row.Scenario,
+            'Team': row.Team,
+            'Matches To 50% Mark': row.MatchesToMidSeason,
+            'Games In Progression': int(games[i]),
+            'Outcome': outcomes[i],
+            'Profit/Loss (Units)': round(float(profits[i]), 2),
+            'Max Capital Needed (Units)': int(max_caps[i])
+        })
+
+    return season_results
+
+
+def write_league_results(country, league_code, results_df):
+    """
+    Zapisuje wyniki symulacji ligi do CSV (atomowo) i do partycji ligi w zbiorczym magazynie wyników.
+    Zwraca ścieżkę pliku CSV.
+    """
+    output_filename = f"{country}_{league_code}_symulacja_progresji.csv"
+    output_filepath = SIMULATION_OUTPUT_BASE_PATH / country / output_filename
+    with instrumentation.stage('write', country, league_code, rows=len(results_df)):
+        sweep.write_csv_atomic(results_df, output_filepath, index=False)
+        results_store.write_results_partition(SIMULATION_OUTPUT_BASE_PATH, country, league_code, results_df)
+    print(f"✅ Symulacja zakończona. Wyniki zapisano w: {output_filepath}")
+    return output_filepath
+
+
 def analyze_and_simulate_league(country, league_code, seasons_list):
     """
     Główna funkcja, która wczytuje dane dla ligi, przetwarza je i uruchamia symulacje.
+    Zwraca ścieżkę zapisanego pliku albo None, jeśli nie wygenerowano wyników.
     """
     print(f"\n--- Symuluję ligę: {country} - {league_code} dla {len(seasons_list)} sezonów ---")
     
     all_simulation_results = []
 
+    # Błąd sezonu pomija tylko ten sezon - trafia do pola 'Errors' wyniku zadania (jak w analysis_1)
     for season in seasons_list:
-        file_path = BASE_PATH / season / country / f"{league_code}.csv"
-        
-        if not file_path.exists():
-            print(f"Ostrzeżenie: Plik nie istnieje: {file_path}")
-            continue
-            
         try:
-            try:
-                df = pd.read_csv(file_path)
-            except UnicodeDecodeError:
-                df = pd.read_csv(file_path, encoding='latin1')
-            
-            df['Season'] = season
-            if 'Date' in df.columns:
-                df['Date'] = pd.to_datetime(df['Date'], dayfirst=True, errors='coerce')
-                df = df.sort_values(by='Date').reset_index(drop=True)
-            else:
-                print(f"Ostrzeżenie: Brak kolumny 'Date' w danych dla {league_code}. Chronologia może być niepoprawna.")
-                continue
-
-            # --- Przygotowanie danych dla drużyn ---
-            team_match_data = {}
-            for team in pd.unique(df[['HomeTeam', 'AwayTeam']].values.ravel()):
-                team_df = df[(df['HomeTeam'] == team) | (df['AwayTeam'] == team)].copy()
-                team_match_data[team] = team_df.sort_values(by='Date').reset_index(drop=True)
-            
-            if not team_match_data:
-                print(f"Brak danych meczowych dla ligi {league_code} w sezonie {season}.")
-                continue
-
-            # --- Znajdowanie punktu 50% meczów dla każdej drużyny ---
-            teams_mid_season_stats = []
-            for team_name, team_df in team_match_data.items():
-                total_team_matches = len(team_df)
-                if total_team_matches == 0:
-                    continue
-
-                half_season_matches_count = total_team_matches // 2
-                
-                # Upewniamy się, że mamy co najmniej jeden mecz do analizy
-                if half_season_matches_count == 0: 
-                    #print(f"Ostrzeżenie: Drużyna {team_name} w sezonie {season} ma za mało meczów ({total_team_matches}) do analizy połowy sezonu.")
-                    continue
-
-                mid_season_df = team_df.head(half_season_matches_count)
-                
-                # Obliczanie statystyk do połowy sezonu
-                num_draws = len(mid_season_df[mid_season_df['FTR'] == 'D'])
-                num_wins = len(mid_season_df[((mid_season_df['HomeTeam'] == team_name) & (mid_season_df['FTR'] == 'H')) | ((mid_season_df['AwayTeam'] == team_name) & (mid_season_df['FTR'] == 'A'))])
-                num_losses = len(mid_season_df[((mid_season_df['HomeTeam'] == team_name) & (mid_season_df['FTR'] == 'A')) | ((mid_season_df['AwayTeam'] == team_name) & (mid_season_df['FTR'] == 'H'))])
-                
-                draw_percent = (num_draws / half_season_matches_count) * 100 if half_season_matches_count > 0 else 0
-                win_percent = (num_wins / half_season_matches_count) * 100 if half_season_matches_count > 0 else 0
-                loss_percent = (num_losses / half_season_matches_count) * 100 if half_season_matches_count > 0 else 0
-
-                # Obliczanie aktualnej serii bez porażki do połowy sezonu
-                current_unbeaten_streak = 0
-                for i in range(half_season_matches_count - 1, -1, -1):
-                    match = mid_season_df.iloc[i]
-                    if (match['HomeTeam'] == team_name and match['FTR'] == 'A') or \
-                       (match['AwayTeam'] == team_name and match['FTR'] == 'H'):
-                        # To była porażka
-                        break
-                    current_unbeaten_streak += 1
-
-
-                teams_mid_season_stats.append({
-                    'Team': team_name,
-                    'MatchesToMidSeason': half_season_matches_count,
-                    'DrawPercent': draw_percent,
-                    'UnbeatenStreak': current_unbeaten_streak,
-                    'WinPercent': win_percent,
-                    'LossPercent': loss_percent,
-                    'StartIndex': half_season_matches_count # Indeks pierwszego meczu w progresji
-                })
-
-            teams_mid_season_df = pd.DataFrame(teams_mid_season_stats)
-            if teams_mid_season_df.empty:
-                print(f"Brak wystarczających danych do obliczenia statystyk połowy sezonu dla ligi {league_code} w sezonie {season}.")
-                continue
-
-
-            # --- Wybór Top 3 drużyn dla każdego scenariusza i symulacja ---
-            
-            # Scenariusz 1: Najniższy procent remisów
-            if not teams_mid_season_df.empty:
-                top3_lowest_draw = teams_mid_season_df.sort_values(by='DrawPercent', ascending=True).head(3)
-                for _, row in top3_lowest_draw.iterrows():
-                    team_name = row['Team']
-                    start_index = row['StartIndex']
-                    sim_team_df = team_match_data[team_name].iloc[start_index:]
-                    games_in_prog, profit, max_cap, outcome = simulate_fibonacci_progression(sim_team_df, FIBONACCI_SEQUENCE, DRAW_ODDS)
-                    all_simulation_results.append({
-                        'Season': season,
-                        'Scenario': 'Lowest Draw %',
-                        'Team': team_name,
-                        'Matches To 50% Mark': row['MatchesToMidSeason'],
-                        'Games In Progression': games_in_prog,
-                        'Outcome': outcome,
-                        'Profit/Loss (Units)': round(profit, 2),
-                        'Max Capital Needed (Units)': max_cap
-                    })
-
-            # Scenariusz 2: Najdłuższa seria bez porażki
-            if not teams_mid_season_df.empty:
-                top3_longest_unbeaten = teams_mid_season_df.sort_values(by='UnbeatenStreak', ascending=False).head(3)
-                for _, row in top3_longest_unbeaten.iterrows():
-                    team_name = row['Team']
-                    start_index = row['StartIndex']
-                    sim_team_df = team_match_data[team_name].iloc[start_index:]
-                    games_in_prog, profit, max_cap, outcome = simulate_fibonacci_progression(sim_team_df, FIBONACCI_SEQUENCE, DRAW_ODDS)
-                    all_simulation_results.append({
-                        'Season': season,
-                        'Scenario': 'Longest Unbeaten Streak',
-                        'Team': team_name,
-                        'Matches To 50% Mark': row['MatchesToMidSeason'],
-                        'Games In Progression': games_in_prog,
-                        'Outcome': outcome,
-                        'Profit/Loss (Units)': round(profit, 2),
-                        'Max Capital Needed (Units)': max_cap
-                    })
-
-            # Scenariusz 3: Najwyższy procent porażek
-            if not teams_mid_season_df.empty:
-                top3_highest_loss = teams_mid_season_df.sort_values(by='LossPercent', ascending=False).head(3)
-                for _, row in top3_highest_loss.iterrows():
-                    team_name = row['Team']
-                    start_index = row['StartIndex']
-                    sim_team_df = team_match_data[team_name].iloc[start_index:]
-                    games_in_prog, profit, max_cap, outcome = simulate_fibonacci_progression(sim_team_df, FIBONACCI_SEQUENCE, DRAW_ODDS)
-                    all_simulation_results.append({
-                        'Season': season,
-                        'Scenario': 'Highest Loss %',
-                        'Team': team_name,
-                        'Matches To 50% Mark': row['MatchesToMidSeason'],
-                        'Games In Progression': games_in_prog,
-                        'Outcome': outcome,
-                        'Profit/Loss (Units)': round(profit, 2),
-                        'Max Capital Needed (Units)': max_cap
-                    })
-            
-            # Scenariusz 4: Najwyższy procent zwycięstw
-            if not teams_mid_season_df.empty:
-                top3_highest_win = teams_mid_season_df.sort_values(by='WinPercent', ascending=False).head(3)
-                for _, row in top3_highest_win.iterrows():
-                    team_name = row['Team']
-                    start_index = row['StartIndex']
-                    sim_team_df = team_match_data[team_name].iloc[start_index:]
-                    games_in_prog, profit, max_cap, outcome = simulate_fibonacci_progression(sim_team_df, FIBONACCI_SEQUENCE, DRAW_ODDS)
-                    all_simulation_results.append({
-                        'Season': season,
-                        'Scenario': 'Highest Win %',
-                        'Team': team_name,
-                        'Matches To 50% Mark': row['MatchesToMidSeason'],
-                        'Games In Progression': games_in_prog,
-                        'Outcome': outcome,
-                        'Profit/Loss (Units)': round(profit, 2),
-                        'Max Capital Needed (Units)': max_cap
-                    })
-
-
+            all_simulation_results.extend(simulate_league_season(country, league_code, season))
         except Exception as e:
-            print(f"Błąd podczas przetwarzania lub symulacji dla pliku {file_path}: {e}")
+            sweep.record_season_error(season, e)
 
     if not all_simulation_results:
         print(f"Nie wygenerowano żadnych wyników symulacji dla ligi {league_code}.")
-        return
+        return None
 
-    # Zapisujemy wyniki do pliku CSV
-    results_df = pd.DataFrame(all_simulation_results)
-    
-    # Tworzymy ścieżkę do zapisu uwzględniającą kraj
-    output_country_path = SIMULATION_OUTPUT_BASE_PATH / country
-    output_country_path.mkdir(parents=True, exist_ok=True) # Tworzymy folder kraju
+    return write_league_results(country, league_code, pd.DataFrame(all_simulation_results))
+
+
+def simulate_league_season_task(country, league_code, season):
+    """Zadanie (kraj, liga, sezon) dla puli procesów - zwraca DataFrame wyników sezonu."""
+    return pd.DataFrame(simulate_league_season(country, league_code, season))
 
-    output_filename = f"{country}_{league_code}_symulacja_progresji.csv"
-    output_filepath = output_country_path / output_filename 
-    results_df.to_csv(output_filepath, index=False)
-    
-    print(f"✅ Symulacja zakończona. Wyniki zapisano w: {output_filepath}")
+
+def write_per_season_results(results, seasons_list):
+    """Łączy wyniki zadań sezonowych w pliki lig (sezony w kolejności seasons_list)."""
+    season_order = {season: i for i, season in enumerate(seasons_list)}
+    by_league = {}
+    for result in results:
+        if result['Status'] == 'ok':
+            by_league.setdefault((result['Country'], result['League']), []).append(result)
+
+    for (country, league_code), league_results in by_league.items():
+        league_results.sort(key=lambda r: season_order[r['Season']])
+        results_df = pd.concat([r['Data'] for r in league_results], ignore_index=True)
+        write_league_results(country, league_code, results_df)
 
 
 # --- GŁÓWNA PĘTLA WYKONAWCZA ---
 
-if __name__ == "__main__":
+def main(argv=None):
+    parser = sweep.add_sweep_arguments(argparse.ArgumentParser(description="Symulacja progresji remisów od połowy sezonu."))
+    parser.add_argument('--per-season', action='store_true',
+                        help="Jedno zadanie na (kraj, liga, sezon) zamiast na (kraj, liga)")
+    instrumentation.add_instrumentation_arguments(parser)
+    args = parser.parse_args(argv)
+    instrumentation.configure_from_args(args)
     
     seasons = get_seasons_to_analyze(CURRENT_SEASON_END_YEAR, X_SEASONS)
     print(f"Rozpoczynam symulację progresji dla sezonów: {seasons}")
@@ -290,8 +347,17 @@ if __name__ == "__main__":
     # Upewniamy się, że folder bazowy symulacji istnieje
     SIMULATION_OUTPUT_BASE_PATH.mkdir(parents=True, exist_ok=True)
 
-    for country, leagues in COUNTRIES_LEAGUES.items():
-        for league in leagues:
-            analyze_and_simulate_league(country, league, seasons)
+    if args.per_season:
+        tasks = sweep.build_tasks(COUNTRIES_LEAGUES, seasons)
+        results = sweep.run_sweep(simulate_league_season_task, tasks, workers=args.workers)
+        write_per_season_results(results, seasons)
+    else:
+        tasks = sweep.build_tasks(COUNTRIES_LEAGUES)
+        results = sweep.run_sweep(analyze_and_simulate_league, tasks, seasons, workers=args.workers)
+    sweep.report_summary(results, SIMULATION_OUTPUT_BASE_PATH / "podsumowanie_przebiegu.csv")
             
-    print("\n\n--- Wszystkie symulacje zostały zakończone! ---")
\ No newline at end of file
+    print("\n\n--- Wszystkie symulacje zostały zakończone! ---")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,38 @@
-import pandas as pd
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+import matplotlib
+matplotlib.use("Agg")  # renderowanie bez okien - wykresy trafiają prosto do plików
 import matplotlib.pyplot as plt
+import pandas as pd
 import seaborn as sns
-from pathlib import Path
-import os
 
-# --- Konfiguracja ścieżek (musi być zgodna z symulacją) ---
-BASE_PATH = Path("D:/football_data")
-SIMULATION_OUTPUT_BASE_PATH = BASE_PATH / "symulacja_1"
+# Moduły współdzielone z analizą leżą w folderze nadrzędnym (skrypty/)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import analysis_cache
+import project_config
+import results_store
+import sweep
+
+# --- Konfiguracja ścieżek (wspólna z symulacją - project_config) ---
+BASE_PATH = project_config.BASE_PATH
+SIMULATION_OUTPUT_BASE_PATH = BASE_PATH / project_config.SIMULATION_DIRNAME
 
-# --- WYBIERZ LIGĘ DO ANALIZY ---
-# Podaj pełną nazwę kraju i kod ligi. Np. "England_E0"
-# Upewnij się, że taka kombinacja występuje w Twoich danych symulacji.
-# Jeśli chcesz analizować wszystkie dane (bez filtrowania na ligę), pozostaw None.
-SELECTED_LEAGUE_FILTER = "England_E0" # Przykładowo, zmień na interesującą Cię ligę
+# --- GALERIA WYKRESÓW ---
+# Wykresy każdej ligi trafiają do <symulacja_1>/wykresy/<Kraj>_<Liga>/, wykresy zbiorcze do .../all_leagues/.
+# Manifest galerii (odcisk pliku wyników i formaty) pozwala pominąć wykresy, których dane się nie zmieniły.
+GALLERY_DIRNAME = "wykresy"
+RENDER_MANIFEST_FILENAME = "render_manifest.json"
+ALL_LEAGUES_LABEL = "all_leagues"
+DEFAULT_FORMATS = ["png"]
+DPI = 100
+
+# Zmiana wyglądu wykresów unieważnia wszystkie wyrenderowane galerie
+RENDER_VERSION = 1
 
 # Ustawienia stylu wykresów
 sns.set_theme(style="whitegrid")
@@ -23,181 +43,346 @@ plt.rcParams['axes.titlesize'] = 16
 plt.rcParams['xtick.labelsize'] = 12
 plt.rcParams['ytick.labelsize'] = 12
 
+OUTCOME_PALETTE = {'Win': 'mediumseagreen', 'Loss': 'lightcoral'}
+
+
+def load_simulation_file(simulation_file: Path) -> pd.DataFrame:
+    """Wczytuje jeden plik CSV wyników symulacji i dodaje kolumnę League w postaci Kraj_Liga."""
+    df = pd.read_csv(simulation_file)
+    # Dodaj kolumnę z nazwą ligi do filtrowania
+    df['League'] = f"{simulation_file.parent.name}_{simulation_file.stem.split('_')[1]}"
+    return df
 
-def load_all_simulation_results(base_path: Path) -> pd.DataFrame:
+
+def find_simulation_files(base_path: Path) -> dict:
+    """
+    Źródła wyników lig: {'Kraj_Liga': ścieżka}. Partycja zbiorczego magazynu (results_store) ma
+    pierwszeństwo; plik CSV jest używany dla lig bez partycji (wyniki starszej wersji symulacji).
     """
-    Ładuje wszystkie pliki CSV z wynikami symulacji z podfolderów do jednego DataFrame.
+    files = {}
+    for country_folder in sorted(base_path.iterdir()):
+        if country_folder.is_dir() and country_folder.name != GALLERY_DIRNAME:
+            for simulation_file in sorted(country_folder.glob("*_symulacja_progresji.csv")):
+                files[f"{country_folder.name}_{simulation_file.stem.split('_')[1]}"] = simulation_file
+    files.update(results_store.list_partitions(base_path))
+    return files
+
+
+def load_simulation_sources(sources: dict, scenarios=None) -> pd.DataFrame:
+    """Wczytuje wyniki wskazanych lig; w partycjach magazynu filtr scenariuszy działa już przy odczycie."""
+    frames = []
+    for label, path in sources.items():
+        if path.suffix == ".parquet":
+            frames.append(results_store.read_partition(path, label, scenarios))
+        else:
+            df = load_simulation_file(path)
+            frames.append(df if scenarios is None else df[df['Scenario'].isin(scenarios)])
+    return results_store.concat_results(frames)
+
+
+def load_all_simulation_results(base_path: Path, leagues=None, scenarios=None) -> pd.DataFrame:
     """
-    all_dfs = []
-    print(f"Ładowanie plików z: {base_path}")
-    for country_folder in base_path.iterdir():
-        if country_folder.is_dir():
-            for simulation_file in country_folder.glob("*_symulacja_progresji.csv"):
-                try:
-                    df = pd.read_csv(simulation_file)
-                    # Dodaj kolumnę z nazwą ligi do filtrowania
-                    df['League'] = f"{country_folder.name}_{simulation_file.stem.split('_')[1]}"
-                    all_dfs.append(df)
-                    print(f"Załadowano: {simulation_file.name}")
-                except Exception as e:
-                    print(f"Błąd podczas ładowania {simulation_file}: {e}")
-    
-    if not all_dfs:
+    Ładuje wyniki symulacji wszystkich lig (albo tylko `leagues` / `scenarios`) do jednego DataFrame.
+    """
+    print(f"Ładowanie wyników z: {base_path}")
+    sources = find_simulation_files(base_path)
+    if leagues is not None:
+        sources = {label: path for label, path in sources.items() if label in leagues}
+    if not sources:
         print("Brak plików symulacji do załadowania. Upewnij się, że symulacja została uruchomiona.")
         return pd.DataFrame() # Zwróć pusty DataFrame
-        
-    combined_df = pd.concat(all_dfs, ignore_index=True)
+
+    combined_df = load_simulation_sources(sources, scenarios)
     print(f"Załadowano łącznie {len(combined_df)} wierszy danych symulacji.")
     return combined_df
 
-# Wczytaj wszystkie wyniki symulacji
-simulation_results_df = load_all_simulation_results(SIMULATION_OUTPUT_BASE_PATH)
-
-if simulation_results_df.empty:
-    print("Brak danych do wizualizacji. Skrypt zakończy działanie.")
-    exit() # Zakończ skrypt, jeśli nie ma danych
-
-# Filtrowanie danych, jeśli wybrano konkretną ligę
-if SELECTED_LEAGUE_FILTER:
-    initial_rows = len(simulation_results_df)
-    simulation_results_df = simulation_results_df[simulation_results_df['League'] == SELECTED_LEAGUE_FILTER].copy()
-    if simulation_results_df.empty:
-        print(f"Brak danych dla wybranej ligi: {SELECTED_LEAGUE_FILTER}. Sprawdź nazwę.")
-        exit()
-    print(f"Filtrowanie: Wybrano ligę '{SELECTED_LEAGUE_FILTER}'. Zredukowano z {initial_rows} do {len(simulation_results_df)} wierszy.")
-
-print("\n--- Generowanie wykresów szczegółowych ---")
-
-
-# --- 1. Ile razy dana drużyna pojawiła się w danej kategorii doboru (Bar Chart) ---
-
-# Użyj FacetGrid, aby stworzyć oddzielny wykres dla każdego scenariusza
-g = sns.FacetGrid(simulation_results_df, col="Scenario", col_wrap=2, height=6, aspect=1.2, sharey=False)
-
-def plot_team_counts(data, **kwargs):
-    ax = plt.gca()
-    # Zlicz wystąpienia drużyn i wybierz top 10
-    team_counts = data['Team'].value_counts().nlargest(10).reset_index()
-    team_counts.columns = ['Team', 'Count']
-    sns.barplot(x='Count', y='Team', data=team_counts, palette='viridis', ax=ax)
-    ax.set_title(f"Top 10 drużyn w scenariuszu: {kwargs['scenario_title']}", fontsize=12) # Mniejszy tytuł
-    ax.set_xlabel('Liczba wystąpień')
-    ax.set_ylabel('Drużyna')
-
-g.map_dataframe(plot_team_counts, scenario_title=g.col_names)
-g.set_axis_labels("Liczba wystąpień", "Drużyna")
-g.set_titles(col_template="Scenariusz: {col_name}")
-g.fig.suptitle(f'Częstotliwość Wyboru Drużyn w Kategoriach Doboru ({SELECTED_LEAGUE_FILTER if SELECTED_LEAGUE_FILTER else "Wszystkie Ligi"})', fontsize=18, y=1.02)
-plt.tight_layout(rect=[0, 0, 1, 0.98])
-# plt.savefig(SIMULATION_OUTPUT_BASE_PATH / (f"1_team_selection_frequency_{SELECTED_LEAGUE_FILTER}.png" if SELECTED_LEAGUE_FILTER else "1_team_selection_frequency_all_leagues.png"))
-plt.show() # <-- Wyświetl wykres
-print("Wykres 1: Częstotliwość wyboru drużyn wyświetlony.")
-
-
-# --- 2. Średnie zyski/straty na drużynę dla każdej strategii (Grouped Bar Chart) ---
-
-# Oblicz średni zysk/stratę dla każdej drużyny w każdym scenariuszu
-avg_profit_by_team_scenario = simulation_results_df.groupby(['Scenario', 'Team'])['Profit/Loss (Units)'].mean().reset_index()
-
-plt.figure(figsize=(16, 9))
-sns.barplot(
-    x='Profit/Loss (Units)',
-    y='Team',
-    hue='Scenario',
-    data=avg_profit_by_team_scenario.sort_values(by=['Scenario', 'Profit/Loss (Units)'], ascending=[True, False]),
-    palette='coolwarm' # Paleta, która dobrze rozróżnia zyski i straty
-)
-plt.axvline(0, color='grey', linestyle='--', linewidth=1.5, label='Zero Profit/Loss Line')
-plt.title(f'Średni Zysk/Strata na Drużynę wg Scenariusza ({SELECTED_LEAGUE_FILTER if SELECTED_LEAGUE_FILTER else "Wszystkie Ligi"})', fontsize=18)
-plt.xlabel('Średni Zysk/Strata (Jednostki)', fontsize=14)
-plt.ylabel('Drużyna', fontsize=14)
-plt.legend(title='Scenariusz', bbox_to_anchor=(1.05, 1), loc='upper left')
-plt.tight_layout()
-# plt.savefig(SIMULATION_OUTPUT_BASE_PATH / (f"2_avg_profit_loss_per_team_scenario_{SELECTED_LEAGUE_FILTER}.png" if SELECTED_LEAGUE_FILTER else "2_avg_profit_loss_per_team_scenario_all_leagues.png"))
-plt.show() # <-- Wyświetl wykres
-print("Wykres 2: Średni zysk/strata na drużynę wyświetlony.")
-
-
-# --- 3. Zyskowność strategii (Total Profit/Loss) i liczba wygranych/przegranych progresji (Bar Chart) ---
-
-# Całkowity zysk/strata na scenariusz
-total_profit_by_scenario = simulation_results_df.groupby('Scenario')['Profit/Loss (Units)'].sum().reset_index()
-
-plt.figure(figsize=(14, 8))
-sns.barplot(x='Scenario', y='Profit/Loss (Units)', data=total_profit_by_scenario, palette='viridis')
-plt.axhline(0, color='grey', linestyle='--', linewidth=1.5, label='Zero Profit/Loss Line')
-plt.title(f'Całkowity Zysk/Strata na Scenariusz ({SELECTED_LEAGUE_FILTER if SELECTED_LEAGUE_FILTER else "Wszystkie Ligi"})', fontsize=18)
-plt.xlabel('Scenariusz', fontsize=14)
-plt.ylabel('Całkowity Zysk/Strata (Jednostki)', fontsize=14)
-plt.xticks(rotation=15)
-plt.tight_layout()
-# plt.savefig(SIMULATION_OUTPUT_BASE_PATH / (f"3a_total_profit_loss_by_scenario_{SELECTED_LEAGUE_FILTER}.png" if SELECTED_LEAGUE_FILTER else "3a_total_profit_loss_by_scenario_all_leagues.png"))
-plt.show() # <-- Wyświetl wykres
-print("Wykres 3a: Całkowity zysk/strata na scenariusz wyświetlony.")
-
-
-# Liczba wygranych/przegranych progresji na scenariusz
-outcome_counts = simulation_results_df.groupby(['Scenario', 'Outcome']).size().unstack(fill_value=0).reset_index()
-# Upewnij się, że są kolumny 'Win' i 'Loss'
-for col in ['Win', 'Loss']:
-    if col not in outcome_counts.columns:
-        outcome_counts[col] = 0
-
-outcome_counts_long = outcome_counts.melt(id_vars='Scenario', var_name='Outcome', value_name='Count')
-
-plt.figure(figsize=(14, 8))
-sns.barplot(x='Scenario', y='Count', hue='Outcome', data=outcome_counts_long, palette={'Win': 'mediumseagreen', 'Loss': 'lightcoral'})
-plt.title(f'Liczba Wygranych/Przegranych Progresji na Scenariusz ({SELECTED_LEAGUE_FILTER if SELECTED_LEAGUE_FILTER else "Wszystkie Ligi"})', fontsize=18)
-plt.xlabel('Scenariusz', fontsize=14)
-plt.ylabel('Liczba Progresji', fontsize=14)
-plt.xticks(rotation=15)
-plt.legend(title='Wynik Progresji')
-plt.tight_layout()
-# plt.savefig(SIMULATION_OUTPUT_BASE_PATH / (f"3b_outcome_counts_by_scenario_{SELECTED_LEAGUE_FILTER}.png" if SELECTED_LEAGUE_FILTER else "3b_outcome_counts_by_scenario_all_leagues.png"))
-plt.show() # <-- Wyświetl wykres
-print("Wykres 3b: Liczba wygranych/przegranych progresji wyświetlona.")
-
-
-# --- 4. Maksymalny potrzebny kapitał vs. Zysk/Strata (Faceted Scatter Plot) ---
-
-# Tworzenie KOPii DataFrame, aby wprowadzić zmiany tylko dla TEGO wykresu
-plot_df_4 = simulation_results_df.copy()
-# Zmiana wartości ujemnych na -10 dla osi Y
-plot_df_4['Profit/Loss (Units)'] = plot_df_4['Profit/Loss (Units)'].apply(lambda x: -10 if x < 0 else x)
-
-
-g = sns.FacetGrid(plot_df_4, col="Scenario", col_wrap=2, height=5, aspect=1.3, sharey=False, sharex=False)
-g.map_dataframe(sns.scatterplot, x='Max Capital Needed (Units)', y='Profit/Loss (Units)', hue='Outcome', s=100, alpha=0.7, palette={'Win': 'mediumseagreen', 'Loss': 'lightcoral'})
-
-# Dodaj linię zero i dostosuj skale
-for ax in g.axes.flat:
-    ax.axhline(0, color='grey', linestyle='--', linewidth=1)
-    # Próbujemy ustawić skalę logarytmiczną dla osi X
-    # Jeśli wartości kapitału są zerowe lub ujemne, skala logarytmiczna nie zadziała.
-    if (plot_df_4['Max Capital Needed (Units)'] > 0).all():
-        ax.set_xscale('log')
-    ax.set_xlabel('Maks. Potrzebny Kapitał (Jednostki)')
-    ax.set_ylabel('Zysk/Strata (Jednostki) (Straty Ustandaryzowane do -10)')
-    ax.grid(True, which="both", ls="--", c='0.7')
-    
-g.add_legend(title='Wynik')
-g.set_titles("Scenariusz: {col_name}")
-g.fig.suptitle(f'Maks. Potrzebny Kapitał vs. Zysk/Strata wg Scenariusza ({SELECTED_LEAGUE_FILTER if SELECTED_LEAGUE_FILTER else "Wszystkie Ligi"})', fontsize=18, y=1.02)
-plt.tight_layout(rect=[0, 0, 1, 0.98])
-# plt.savefig(SIMULATION_OUTPUT_BASE_PATH / (f"4_faceted_capital_vs_profit_loss_{SELECTED_LEAGUE_FILTER}.png" if SELECTED_LEAGUE_FILTER else "4_faceted_capital_vs_profit_loss_all_leagues.png"))
-plt.show() # <-- Wyświetl wykres
-print("Wykres 4: Faceted scatter plot kapitał vs. zysk/strata (zmodyfikowany) wyświetlony.")
-
-
-# --- 5. Rozkład Długości Progresji (Games In Progression) dla każdej Strategii (Violin Plot) ---
-plt.figure(figsize=(14, 8))
-sns.violinplot(x='Scenario', y='Games In Progression', data=simulation_results_df, inner='quartile', palette='pastel')
-plt.title(f'Rozkład Długości Progresji (Gier) dla Różnych Scenariuszy ({SELECTED_LEAGUE_FILTER if SELECTED_LEAGUE_FILTER else "Wszystkie Ligi"})', fontsize=18)
-plt.xlabel('Scenariusz Wyboru Drużyny', fontsize=14)
-plt.ylabel('Liczba Gier w Progresji', fontsize=14)
-plt.xticks(rotation=15)
-plt.tight_layout()
-# plt.savefig(SIMULATION_OUTPUT_BASE_PATH / (f"5_games_in_progression_violin_{SELECTED_LEAGUE_FILTER}.png" if SELECTED_LEAGUE_FILTER else "5_games_in_progression_violin_all_leagues.png"))
-plt.show() # <-- Wyświetl wykres
-print("Wykres 5: Rozkład długości progresji (violin plot) wyświetlony.")
 
+# --- RODZINY WYKRESÓW ---
+# Każda funkcja dostaje dane (jednej ligi albo wszystkich) i etykietę do tytułu,
+# a zwraca słownik {nazwa pliku bez rozszerzenia: figura}.
+
+def plot_team_selection_frequency(df, title_label):
+    """1. Ile razy dana drużyna pojawiła się w danej kategorii doboru (Bar Chart)."""
+    # Użyj FacetGrid, aby stworzyć oddzielny wykres dla każdego scenariusza
+    g = sns.FacetGrid(df, col="Scenario", col_wrap=2, height=6, aspect=1.2, sharey=False)
+
+    def plot_team_counts(data, **kwargs):
+        ax = plt.gca()
+        # Zlicz wystąpienia drużyn i wybierz top 10
+        team_counts = data['Team'].astype(str).value_counts().nlargest(10).reset_index()
+        team_counts.columns = ['Team', 'Count']
+        sns.barplot(x='Count', y='Team', hue='Team', data=team_counts, palette='viridis', legend=False, ax=ax)
+        ax.set_xlabel('Liczba wystąpień')
+        ax.set_ylabel('Drużyna')
+
+    g.map_dataframe(plot_team_counts)
+    g.set_axis_labels("Liczba wystąpień", "Drużyna")
+    g.set_titles(col_template="Scenariusz: {col_name}")
+    g.fig.suptitle(f'Częstotliwość Wyboru Drużyn w Kategoriach Doboru ({title_label})', fontsize=18, y=1.02)
+    g.fig.tight_layout(rect=[0, 0, 1, 0.98])
+    return {"1_team_selection_frequency": g.fig}
+
+
+def plot_avg_profit_per_team(df, title_label):
+    """2. Średnie zyski/straty na drużynę dla każdej strategii (Grouped Bar Chart)."""
+    # Oblicz średni zysk/stratę dla każdej drużyny w każdym scenariuszu
+    avg_profit_by_team_scenario = df.groupby(['Scenario', 'Team'], observed=True)['Profit/Loss (Units)'].mean().reset_index()
+    # Kolejność drużyn na osi wg posortowanych zysków, a nie wg kategorii
+    avg_profit_by_team_scenario = avg_profit_by_team_scenario.astype({'Scenario': str, 'Team': str})
+
+    fig, ax = plt.subplots(figsize=(16, 9))
+    sns.barplot(
+        x='Profit/Loss (Units)',
+        y='Team',
+        hue='Scenario',
+        data=avg_profit_by_team_scenario.sort_values(by=['Scenario', 'Profit/Loss (Units)'], ascending=[True, False]),
+        palette='coolwarm', # Paleta, która dobrze rozróżnia zyski i straty
+        ax=ax
+    )
+    ax.axvline(0, color='grey', linestyle='--', linewidth=1.5, label='Zero Profit/Loss Line')
+    ax.set_title(f'Średni Zysk/Strata na Drużynę wg Scenariusza ({title_label})', fontsize=18)
+    ax.set_xlabel('Średni Zysk/Strata (Jednostki)', fontsize=14)
+    ax.set_ylabel('Drużyna', fontsize=14)
+    ax.legend(title='Scenariusz', bbox_to_anchor=(1.05, 1), loc='upper left')
+    fig.tight_layout()
+    return {"2_avg_profit_loss_per_team_scenario": fig}
+
+
+def plot_scenario_totals(df, title_label):
+    """3. Zyskowność strategii (Total Profit/Loss) i liczba wygranych/przegranych progresji (Bar Chart)."""
+    # Całkowity zysk/strata na scenariusz
+    total_profit_by_scenario = df.groupby('Scenario', observed=True)['Profit/Loss (Units)'].sum().reset_index()
+
+    fig_total, ax = plt.subplots(figsize=(14, 8))
+    sns.barplot(x='Scenario', y='Profit/Loss (Units)', hue='Scenario', data=total_profit_by_scenario,
+                palette='viridis', legend=False, ax=ax)
+    ax.axhline(0, color='grey', linestyle='--', linewidth=1.5, label='Zero Profit/Loss Line')
+    ax.set_title(f'Całkowity Zysk/Strata na Scenariusz ({title_label})', fontsize=18)
+    ax.set_xlabel('Scenariusz', fontsize=14)
+    ax.set_ylabel('Całkowity Zysk/Strata (Jednostki)', fontsize=14)
+    ax.tick_params(axis='x', labelrotation=15)
+    fig_total.tight_layout()
+
+    # Liczba wygranych/przegranych progresji na scenariusz
+    outcome_counts = df.groupby(['Scenario', 'Outcome'], observed=True).size().unstack(fill_value=0).reset_index()
+    # Upewnij się, że są kolumny 'Win' i 'Loss'
+    for col in ['Win', 'Loss']:
+        if col not in outcome_counts.columns:
+            outcome_counts[col] = 0
+
+    outcome_counts_long = outcome_counts.melt(id_vars='Scenario', var_name='Outcome', value_name='Count')
+
+    fig_outcomes, ax = plt.subplots(figsize=(14, 8))
+    sns.barplot(x='Scenario', y='Count', hue='Outcome', data=outcome_counts_long, palette=OUTCOME_PALETTE, ax=ax)
+    ax.set_title(f'Liczba Wygranych/Przegranych Progresji na Scenariusz ({title_label})', fontsize=18)
+    ax.set_xlabel('Scenariusz', fontsize=14)
+    ax.set_ylabel('Liczba Progresji', fontsize=14)
+    ax.tick_params(axis='x', labelrotation=15)
+    ax.legend(title='Wynik Progresji')
+    fig_outcomes.tight_layout()
+    return {"3a_total_profit_loss_by_scenario": fig_total, "3b_outcome_counts_by_scenario": fig_outcomes}
+
+
+def plot_capital_vs_profit(df, title_label):
+    """4. Maksymalny potrzebny kapitał vs. Zysk/Strata (Faceted Scatter Plot)."""
+    # Tworzenie KOPii DataFrame, aby wprowadzić zmiany tylko dla TEGO wykresu
+    plot_df_4 = df.copy()
+    # Zmiana wartości ujemnych na -10 dla osi Y
+    plot_df_4['Profit/Loss (Units)'] = plot_df_4['Profit/Loss (Units)'].where(plot_df_4['Profit/Loss (Units)'] >= 0, -10)
+
+    g = sns.FacetGrid(plot_df_4, col="Scenario", col_wrap=2, height=5, aspect=1.3, sharey=False, sharex=False)
+    g.map_dataframe(sns.scatterplot, x='Max Capital Needed (Units)', y='Profit/Loss (Units)', hue='Outcome',
+                    s=100, alpha=0.7, palette=OUTCOME_PALETTE)
+
+    # Dodaj linię zero i dostosuj skale
+    for ax in g.axes.flat:
+        ax.axhline(0, color='grey', linestyle='--', linewidth=1)
+        # Próbujemy ustawić skalę logarytmiczną dla osi X
+        # Jeśli wartości kapitału są zerowe lub ujemne, skala logarytmiczna nie zadziała.
+        if (plot_df_4['Max Capital Needed (Units)'] > 0).all():
+            ax.set_xscale('log')
+        ax.set_xlabel('Maks. Potrzebny Kapitał (Jednostki)')
+        ax.set_ylabel('Zysk/Strata (Jednostki) (Straty Ustandaryzowane do -10)')
+        ax.grid(True, which="both", ls="--", c='0.7')
+
+    g.add_legend(title='Wynik')
+    g.set_titles("Scenariusz: {col_name}")
+    g.fig.suptitle(f'Maks. Potrzebny Kapitał vs. Zysk/Strata wg Scenariusza ({title_label})', fontsize=18, y=1.02)
+    g.fig.tight_layout(rect=[0, 0, 1, 0.98])
+    return {"4_faceted_capital_vs_profit_loss": g.fig}
+
+
+def plot_games_in_progression(df, title_label):
+    """5. Rozkład Długości Progresji (Games In Progression) dla każdej Strategii (Violin Plot)."""
+    fig, ax = plt.subplots(figsize=(14, 8))
+    sns.violinplot(x='Scenario', y='Games In Progression', hue='Scenario', data=df, inner='quartile',
+                   palette='pastel', legend=False, ax=ax)
+    ax.set_title(f'Rozkład Długości Progresji (Gier) dla Różnych Scenariuszy ({title_label})', fontsize=18)
+    ax.set_xlabel('Scenariusz Wyboru Drużyny', fontsize=14)
+    ax.set_ylabel('Liczba Gier w Progresji', fontsize=14)
+    ax.tick_params(axis='x', labelrotation=15)
+    fig.tight_layout()
+    return {"5_games_in_progression_violin": fig}
+
+
+# Rodziny wykresów: (numer, funkcja) - numer wybiera rodzinę w --figures
+FIGURE_FAMILIES = [
+    ('1', plot_team_selection_frequency),
+    ('2', plot_avg_profit_per_team),
+    ('3', plot_scenario_totals),
+    ('4', plot_capital_vs_profit),
+    ('5', plot_games_in_progression),
+]
+
+
+# --- RENDEROWANIE GALERII ---
+
+def read_render_manifest(gallery_dir):
+    """Manifest galerii; pusty słownik, jeśli nie istnieje, jest uszkodzony albo z innej wersji."""
+    try:
+        with open(gallery_dir / RENDER_MANIFEST_FILENAME, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest if manifest.get("version") == RENDER_VERSION else {}
+
+
+def write_render_manifest(gallery_dir, manifest):
+    """Zapisuje manifest galerii atomowo."""
+    manifest_path = gallery_dir / RENDER_MANIFEST_FILENAME
+    tmp_path = manifest_path.with_name(f".{manifest_path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({**manifest, "version": RENDER_VERSION}, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, manifest_path)
+
+
+def inputs_unchanged(inputs, previous_inputs):
+    """Czy pliki wyników symulacji są te same co przy poprzednim renderowaniu (porównanie po skrócie)."""
+    if not previous_inputs or set(previous_inputs) != set(inputs):
+        return False
+    return all(analysis_cache.same_content(inputs[name], previous_inputs[name]) for name in inputs)
+
+
+def render_gallery(gallery_label, sources, gallery_dir, families=None, formats=None, scenarios=None, force=False):
+    """
+    Renderuje rodziny wykresów dla wyników lig z `sources` ({Kraj_Liga: ścieżka}) do gallery_dir.
+    Rodzina jest pomijana, jeśli dane wejściowe i filtr scenariuszy się nie zmieniły, a jej pliki
+    we wszystkich formatach istnieją. Zwraca folder galerii albo None, jeśli brak danych.
+    """
+    families = [key for key, _ in FIGURE_FAMILIES] if families is None else families
+    formats = DEFAULT_FORMATS if formats is None else formats
+    scenarios = sorted(scenarios) if scenarios is not None else None
+    gallery_dir = Path(gallery_dir)
+    manifest = {} if force else read_render_manifest(gallery_dir)
+    previous_figures = manifest.get("figures", {})
+    inputs = {label: analysis_cache.file_fingerprint(path, manifest.get("inputs", {}).get(label))
+              for label, path in sources.items()}
+    unchanged = inputs_unchanged(inputs, manifest.get("inputs")) and manifest.get("scenarios") == scenarios
+
+    pending = []
+    figures = {}
+    for key, plot_fn in FIGURE_FAMILIES:
+        if key not in families:
+            continue
+        previous = previous_figures.get(key)
+        if (unchanged and previous and set(formats) <= set(previous["formats"])
+                and all((gallery_dir / name).exists() for name in previous["files"])):
+            figures[key] = previous
+        else:
+            pending.append((key, plot_fn))
+
+    if not pending:
+        print(f"⏩ {gallery_label}: dane bez zmian - pomijam wykresy.")
+        return gallery_dir
+
+    df = load_simulation_sources(sources, scenarios)
+    if df.empty:
+        print(f"Brak danych do wizualizacji dla {gallery_label}.")
+        return None
+
+    title_label = "Wszystkie Ligi" if gallery_label == ALL_LEAGUES_LABEL else gallery_label
+    gallery_dir.mkdir(parents=True, exist_ok=True)
+    for key, plot_fn in pending:
+        files = []
+        for stem, fig in plot_fn(df, title_label).items():
+            for fmt in formats:
+                file_name = f"{stem}_{gallery_label}.{fmt}"
+                fig.savefig(gallery_dir / file_name, format=fmt, dpi=DPI, bbox_inches='tight')
+                files.append(file_name)
+            plt.close(fig)
+        figures[key] = {"formats": list(formats), "files": files}
+        print(f"Wykres {key} ({gallery_label}) zapisany.")
+
+    if not unchanged:
+        previous_figures = {}
+    write_render_manifest(gallery_dir, {"inputs": inputs, "scenarios": scenarios,
+                                        "figures": {**previous_figures, **figures}})
+    return gallery_dir
+
+
+def league_source(input_path, country, league_code):
+    """Źródło wyników jednej ligi: partycja magazynu, a bez niej plik CSV; None, jeśli brak obu."""
+    label = results_store.league_label(country, league_code)
+    partition_path = results_store.get_partition_path(input_path, label)
+    if partition_path.exists():
+        return partition_path
+    simulation_file = Path(input_path) / country / f"{label}_symulacja_progresji.csv"
+    return simulation_file if simulation_file.exists() else None
+
+
+def render_league(country, league_code, input_path, families=None, formats=None, scenarios=None, force=False):
+    """Zadanie dla jednej ligi: galeria wykresów czytająca tylko wyniki tej ligi."""
+    source = league_source(input_path, country, league_code)
+    if source is None:
+        return None
+    gallery_label = results_store.league_label(country, league_code)
+    gallery_dir = Path(input_path) / GALLERY_DIRNAME / gallery_label
+    return render_gallery(gallery_label, {gallery_label: source}, gallery_dir, families, formats, scenarios, force)
+
+
+def parse_visualization_args(argv=None):
+    """Argumenty wiersza poleceń renderowania galerii."""
+    parser = sweep.add_sweep_arguments(argparse.ArgumentParser(
+        description="Renderowanie wykresów wyników symulacji do plików (wszystkie ligi albo wybrane)."))
+    parser.add_argument('--input-dir', type=Path, default=SIMULATION_OUTPUT_BASE_PATH,
+                        help="Folder z wynikami symulacji (wyniki_symulacji/ albo <Kraj>/*_symulacja_progresji.csv)")
+    parser.add_argument('--leagues', nargs='+', default=None,
+                        help="Wybrane ligi, np. England_E0 albo E0 (domyślnie wszystkie)")
+    parser.add_argument('--figures', nargs='+', default=None, choices=[key for key, _ in FIGURE_FAMILIES],
+                        help="Wybrane rodziny wykresów (domyślnie wszystkie)")
+    parser.add_argument('--scenarios', nargs='+', default=None,
+                        help="Tylko wybrane scenariusze, np. 'Lowest Draw %%' (domyślnie wszystkie)")
+    parser.add_argument('--formats', nargs='+', default=DEFAULT_FORMATS, choices=['png', 'svg', 'pdf'])
+    parser.add_argument('--no-combined', action='store_true', help="Bez wykresów zbiorczych dla wszystkich lig")
+    parser.add_argument('--force', action='store_true', help="Renderuj wszystko od nowa, bez pomijania")
+    return parser.parse_args(argv)
+
+
+# --- GŁÓWNA PĘTLA WYKONAWCZA ---
+
+def main(argv=None):
+    args = parse_visualization_args(argv)
+    simulation_files = find_simulation_files(args.input_dir)
+    if args.leagues:
+        simulation_files = {label: path for label, path in simulation_files.items()
+                            if label in args.leagues or label.split('_', 1)[1] in args.leagues}
+    if not simulation_files:
+        print("Brak plików symulacji do wizualizacji. Upewnij się, że symulacja została uruchomiona.")
+        return
+
+    print(f"Renderowanie wykresów dla {len(simulation_files)} lig do: {args.input_dir / GALLERY_DIRNAME}")
+    tasks = [tuple(label.split('_', 1)) for label in simulation_files]
+    results = sweep.run_sweep(render_league, tasks, args.input_dir, args.figures, args.formats, args.scenarios,
+                              args.force, workers=args.workers)
+    sweep.report_summary(results)
+
+    # Wykresy zbiorcze tylko dla pełnego zestawu lig
+    if not args.no_combined and not args.leagues:
+        render_gallery(ALL_LEAGUES_LABEL, simulation_files, args.input_dir / GALLERY_DIRNAME / ALL_LEAGUES_LABEL,
+                       args.figures, args.formats, args.scenarios, args.force)
+
+    print("\n--- Wszystkie wykresy zostały wygenerowane! ---")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+import argparse
+import sys
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Moduły współdzielone z analizą leżą w folderze nadrzędnym (skrypty/)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import progression
+import sweep
+import symulation_1 as sim
+import team_index
+import team_schedule
+
+# --- WALK-FORWARD: WYBÓR DRUŻYN NA PODSTAWIE N SEZONÓW, GRA W SEZONIE N+1 ---
+#
+# (todo.txt) Wybierz top 5 drużyn według warunku, każda drużyna musi być w każdym analizowanym
+# sezonie (+1, czyli również w sezonie testowym), puść symulację obstawiania na następny sezon.
+# Okno treningowe przesuwa się po sezonach; agregaty okna są aktualizowane przyrostowo
+# (dodanie nowego sezonu, odjęcie najstarszego), więc każdy sezon jest wczytywany raz.
+# Drużyny są identyfikowane numerami z indeksu drużyn (team_index) - agregaty to wiersze macierzy
+# indeksowanej numerem drużyny, a obecność w sezonach można sprawdzać także w innych ligach kraju.
+
+# --- SEKCJA KONFIGURACJI ---
+
+# 1. Zakres sezonów i długość okna treningowego
+FIRST_SEASON_START_YEAR = 2000
+WINDOW_SEASONS = 5
+
+# 2. Warunki dopuszczenia drużyny do wyboru
+ELIGIBILITY = {
+    'require_every_season': True,  # drużyna w każdym sezonie okna
+    'require_next_season': True,   # ... i w sezonie testowym (+1)
+    'min_matches': 0,              # minimalna liczba meczów w oknie
+    'any_division': False,         # obecność w sezonie okna liczona w dowolnej lidze kraju (np. po spadku do E1)
+}
+
+# 3. Scenariusze wyboru: (nazwa, cecha okna, rosnąco?, liczba drużyn)
+WALK_FORWARD_SCENARIOS = [
+    ('Lowest Draw %', 'DrawPercent', True, 5),
+    ('Highest Draw %', 'DrawPercent', False, 5),
+    ('Highest Win %', 'WinPercent', False, 5),
+    ('Highest Loss %', 'LossPercent', False, 5),
+]
+
+# 4. Start progresji w sezonie testowym (ułamek meczów drużyny; 0 = od pierwszej kolejki)
+TEST_START_FRACTION = 0.0
+
+WALK_FORWARD_OUTPUT_FILENAME = "walk_forward_wyniki.csv"
+
+# Agregaty okna (kolumny macierzy drużyna x agregat)
+WINDOW_AGGREGATES = ['Matches', 'Draws', 'Wins', 'Losses', 'Seasons']
+
+
+def get_all_seasons(first_start_year=FIRST_SEASON_START_YEAR, last_end_year=sim.CURRENT_SEASON_END_YEAR):
+    """Wszystkie sezony od najstarszego do najnowszego (chronologicznie)."""
+    return [f"{year}-{year + 1}" for year in range(first_start_year, last_end_year)]
+
+
+def window_features(totals):
+    """Cechy drużyn okna (drużyna x cecha) z sum agregatów."""
+    matches = np.maximum(totals[:, 0], 1)
+    return pd.DataFrame({
+        'Matches': totals[:, 0],
+        'DrawPercent': totals[:, 1] / matches * 100,
+        'WinPercent': totals[:, 2] / matches * 100,
+        'LossPercent': totals[:, 3] / matches * 100,
+        'Seasons': totals[:, 4],
+    })
+
+
+def eligible_teams(totals, next_ids, window, eligibility, presence=None):
+    """
+    Maska drużyn (wiersze macierzy agregatów) dopuszczonych do wyboru w danym oknie.
+    next_ids - numery drużyn sezonu testowego; presence - obecność drużyn w sezonach okna
+    w dowolnej lidze kraju (używana przy eligibility['any_division']).
+    """
+    mask = totals[:, 0] > 0
+    if eligibility['require_every_season']:
+        if eligibility.get('any_division') and presence is not None:
+            mask &= presence.all(axis=1)
+        else:
+            mask &= totals[:, 4] == window
+    if eligibility['require_next_season']:
+        in_next = np.zeros(len(totals), dtype=bool)
+        in_next[next_ids] = True
+        mask &= in_next
+    mask &= totals[:, 0] >= eligibility['min_matches']
+    return mask
+
+
+def walk_forward_league(country, league_code, seasons_list, window=WINDOW_SEASONS,
+                        scenarios=None, eligibility=None, start_fraction=TEST_START_FRACTION):
+    """
+    Przesuwa okno `window` sezonów po seasons_list (chronologicznie), w każdym oknie wybiera drużyny
+    według scenariuszy i symuluje progresję w następnym sezonie.
+    Zwraca DataFrame z jednym wierszem na wybraną drużynę i okno albo None, jeśli brak wyników.
+    """
+    scenarios = WALK_FORWARD_SCENARIOS if scenarios is None else scenarios
+    eligibility = ELIGIBILITY if eligibility is None else eligibility
+    print(f"\n--- Walk-forward: {country} - {league_code}, okno {window} sezonów ---")
+
+    teams = team_index.load_team_index(sim.BASE_PATH)
+    team_names = teams.names
+    totals = np.zeros((len(teams), len(WINDOW_AGGREGATES)), dtype=np.int64)
+    league_teams = []  # numery drużyn ligi w kolejności pierwszego pojawienia się (rozstrzyganie remisów)
+    seen = np.zeros(len(teams), dtype=bool)
+    window_seasons = deque()  # (sezon, numery drużyn, agregaty sezonu)
+
+    pick_rows = []
+    paths = []
+    odds_paths = []
+    for season in seasons_list:
+        # Każdy sezon jest wczytywany raz - najpierw jako sezon testowy dla okna, potem dołączany do okna
+        schedule = sim.load_team_match_data(country, league_code, season)
+        ids = (schedule.global_team_ids(teams, country) if schedule is not None
+               else np.zeros(0, dtype=np.int64))
+
+        if len(window_seasons) == window and schedule is not None:
+            features = window_features(totals)
+            presence = None
+            if eligibility.get('any_division'):
+                presence = teams.presence(country, [window_season for window_season, _, _ in window_seasons])
+            mask = eligible_teams(totals, ids, window, eligibility, presence)
+            order = np.array(league_teams, dtype=np.int64)
+            candidates = order[mask[order]]
+            training = f"{window_seasons[0][0]}..{window_seasons[-1][0]}"
+            for scenario, feature, ascending, k in scenarios:
+                chosen = candidates[sim.top_k_positions(features[feature].to_numpy()[candidates], k, ascending)]
+                for rank, team_id in enumerate(chosen):
+                    team = team_names[team_id]
+                    pick_rows.append({
+                        'Training Seasons': training,
+                        'Test Season': season,
+                        'Scenario': scenario,
+                        'Rank': rank,
+                        'Team': team,
+                        'Window Matches': int(features['Matches'].iat[team_id]),
+                        'Window Feature Value': round(float(features[feature].iat[team_id]), 2),
+                    })
+                    if team in schedule:
+                        results = schedule.results_of(team)
+                        start = int(len(results) * start_fraction)
+                        paths.append(results[start:] == team_schedule.RESULT_DRAW)
+                        odds_paths.append(schedule.team_values(team, 'DrawOdds')[start:])
+                    else:
+                        paths.append(np.zeros(0, dtype=bool))
+                        odds_paths.append(np.zeros(0))
+
+        # Dołączenie sezonu do okna (brak danych = pusty sezon - drużyny nie są w nim obecne)
+        if schedule is not None:
+            league_teams.extend(ids[~seen[ids]])
+            seen[ids] = True
+            matches, draws, wins, losses = schedule.result_counts()
+            season_totals = np.column_stack([matches, draws, wins, losses, np.ones(len(ids), dtype=np.int64)])
+        else:
+            season_totals = np.zeros((0, len(WINDOW_AGGREGATES)), dtype=np.int64)
+        np.add.at(totals, ids, season_totals)
+        window_seasons.append((season, ids, season_totals))
+
+        # Odjęcie najstarszego sezonu, gdy okno jest za długie
+        if len(window_seasons) > window:
+            _, old_ids, old_totals = window_seasons.popleft()
+            np.subtract.at(totals, old_ids, old_totals)
+
+    if not pick_rows:
+        print(f"Brak okien z wynikami dla ligi {league_code}.")
+        return None
+
+    # Wszystkie progresje ze wszystkich okien liczone jednym wywołaniem kernela
+    draw_flags, lengths = progression.pack_draw_flags(paths)
+    match_odds = progression.pack_match_odds(odds_paths)
+    games, profits, max_caps, won = progression.simulate_progressions(draw_flags, lengths, sim.FIBONACCI_SEQUENCE, match_odds)
+
+    results_df = pd.DataFrame(pick_rows)
+    results_df.insert(0, 'Country', country)
+    results_df.insert(1, 'League', league_code)
+    results_df['Games In Progression'] = games
+    results_df['Outcome'] = np.where(games > 0, progression.outcome_labels(won), 'No Bets')
+    results_df['Profit/Loss (Units)'] = np.round(profits, 2)
+    results_df['Max Capital Needed (Units)'] = max_caps.astype(int)
+    return results_df
+
+
+def parse_walk_forward_args(argv=None):
+    """Argumenty wiersza poleceń: długość okna, reguły dopuszczenia i start progresji."""
+    parser = sweep.add_sweep_arguments(argparse.ArgumentParser(
+        description="Walk-forward: wybór drużyn z N sezonów i progresja remisów w sezonie N+1."))
+    parser.add_argument('--window', type=int, default=WINDOW_SEASONS, help="Liczba sezonów okna treningowego")
+    parser.add_argument('--top-k', type=int, default=None, help="Liczba drużyn w każdym scenariuszu")
+    parser.add_argument('--min-matches', type=int, default=ELIGIBILITY['min_matches'],
+                        help="Minimalna liczba meczów drużyny w oknie")
+    parser.add_argument('--allow-missing-seasons', action='store_true',
+                        help="Nie wymagaj obecności drużyny w każdym sezonie okna")
+    parser.add_argument('--allow-missing-next', action='store_true',
+                        help="Nie wymagaj obecności drużyny w sezonie testowym")
+    parser.add_argument('--any-division', action='store_true',
+                        help="Obecność drużyny w sezonach okna liczona w dowolnej lidze kraju")
+    parser.add_argument('--start-fraction', type=float, default=TEST_START_FRACTION,
+                        help="Start progresji w sezonie testowym jako ułamek meczów drużyny")
+    args = parser.parse_args(argv)
+
+    eligibility = {
+        'require_every_season': not args.allow_missing_seasons,
+        'require_next_season': not args.allow_missing_next,
+        'min_matches': args.min_matches,
+        'any_division': args.any_division,
+    }
+    scenarios = [(name, feature, ascending, args.top_k or k) for name, feature, ascending, k in WALK_FORWARD_SCENARIOS]
+    return args, eligibility, scenarios
+
+
+# --- GŁÓWNA PĘTLA WYKONAWCZA ---
+
+if __name__ == "__main__":
+    args, eligibility, scenarios = parse_walk_forward_args()
+    seasons = get_all_seasons()
+    print(f"Walk-forward dla sezonów {seasons[0]}..{seasons[-1]}, okno {args.window} sezonów")
+
+    tasks = sweep.build_tasks(sim.COUNTRIES_LEAGUES)
+    results = sweep.run_sweep(walk_forward_league, tasks, seasons, args.window, scenarios, eligibility,
+                              args.start_fraction, workers=args.workers)
+    sweep.report_summary(results)
+
+    frames = [r['Data'] for r in results if r['Status'] == 'ok']
+    if frames:
+        results_df = pd.concat(frames, ignore_index=True)
+        output_filepath = sim.SIMULATION_OUTPUT_BASE_PATH / WALK_FORWARD_OUTPUT_FILENAME
+        sweep.write_csv_atomic(results_df, output_filepath, index=False)
+        summary = results_df.groupby('Scenario', sort=False)['Profit/Loss (Units)'].agg(['count', 'sum', 'mean'])
+        print(summary.round(2).to_string())
+        print(f"✅ Walk-forward zakończony. Wyniki zapisano w: {output_filepath}")
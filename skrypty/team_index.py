@@ -0,0 +1,211 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import match_store
+
+# --- INDEKS DRUŻYN: STAŁE NUMERY DRUŻYN WE WSZYSTKICH LIGACH I SEZONACH ---
+#
+# Drużyna to (kraj, nazwa kanoniczna) - po awansie lub spadku (E0 / E1 / E2 ...) zachowuje swój numer.
+# Indeks jest budowany raz z magazynu kolumnowego i zapisywany obok niego:
+#   match_store/team_index.parquet    - TeamId, Country, Team
+#   match_store/team_seasons.parquet  - TeamId, Season, Country, League, Matches (historia drużyny)
+# Numery są tylko dopisywane - nowe drużyny dostają kolejne numery, istniejące się nie zmieniają.
+# Zamiast porównywać nazwy w całej ramce moduły zamieniają nazwy na numery (encode) i indeksują tablice.
+
+TEAM_INDEX_FILENAME = "team_index.parquet"
+TEAM_SEASONS_FILENAME = "team_seasons.parquet"
+TEAM_INDEX_MANIFEST_FILENAME = "team_index.json"
+
+# Zmiana sposobu budowania indeksu wymusza przebudowę
+TEAM_INDEX_VERSION = 1
+
+UNKNOWN_TEAM = -1
+
+
+class TeamIndex:
+    """
+    Numery drużyn i ich historia (sezon, liga, liczba meczów) we wszystkich ligach kraju.
+
+    names     - nazwa drużyny dla każdego numeru
+    countries - kraj drużyny dla każdego numeru
+    seasons   - ramka historii posortowana po (TeamId, Season); wiersze drużyny i to
+                seasons.iloc[offsets[i]:offsets[i + 1]]
+    """
+
+    def __init__(self, teams_df, seasons_df):
+        teams_df = teams_df.sort_values('TeamId').reset_index(drop=True)
+        if not np.array_equal(teams_df['TeamId'].to_numpy(), np.arange(len(teams_df))):
+            raise ValueError("Numery drużyn w indeksie muszą być kolejnymi liczbami od 0.")
+        self.teams = teams_df
+        self.names = teams_df['Team'].to_numpy(dtype=object)
+        self.countries = teams_df['Country'].to_numpy(dtype=object)
+
+        self._by_country = {}
+        for country, group in teams_df.groupby('Country', sort=False):
+            self._by_country[country] = (pd.Index(group['Team'].to_numpy(dtype=object)),
+                                         group['TeamId'].to_numpy(dtype=np.int64))
+
+        season_key = seasons_df['Season'].map(match_store.season_sort_key)
+        order = np.lexsort((season_key.to_numpy(), seasons_df['TeamId'].to_numpy()))
+        self.seasons = seasons_df.iloc[order].reset_index(drop=True)
+        counts = np.bincount(self.seasons['TeamId'].to_numpy(), minlength=len(self.names))
+        self.offsets = np.r_[0, np.cumsum(counts)].astype(np.int64)
+
+    def __len__(self):
+        return len(self.names)
+
+    def encode(self, country, names):
+        """Numery drużyn dla nazw (lub aliasów) z danego kraju (tablica int64; UNKNOWN_TEAM dla nieznanych nazw)."""
+        lookup = self._by_country.get(country)
+        aliases = match_store.TEAM_ALIASES.get(country)
+        names = np.asarray([aliases.get(name, name) for name in names] if aliases else names, dtype=object)
+        if lookup is None:
+            return np.full(len(names), UNKNOWN_TEAM, dtype=np.int64)
+        index, ids = lookup
+        positions = index.get_indexer(names)
+        return np.where(positions >= 0, ids[positions], UNKNOWN_TEAM)
+
+    def team_id(self, country, team):
+        """Numer jednej drużyny; KeyError, jeśli drużyny nie ma w indeksie."""
+        team_id = self.encode(country, [team])[0]
+        if team_id == UNKNOWN_TEAM:
+            raise KeyError(f"{country}: {team}")
+        return int(team_id)
+
+    def history(self, team_id):
+        """Sezony drużyny we wszystkich ligach kraju (chronologicznie)."""
+        return self.seasons.iloc[self.offsets[team_id]:self.offsets[team_id + 1]]
+
+    def presence(self, country, seasons_list, leagues=None):
+        """
+        Macierz obecności (drużyna x sezon) dla drużyn kraju: True, jeśli drużyna grała w danym sezonie
+        w którejkolwiek lidze z `leagues` (None = w dowolnej lidze kraju). Wiersze to numery drużyn.
+        """
+        rows = self.seasons[self.seasons['Country'] == country]
+        if leagues is not None:
+            rows = rows[rows['League'].isin(list(leagues))]
+        season_pos = pd.Index(list(seasons_list)).get_indexer(rows['Season'])
+        known = season_pos >= 0
+        present = np.zeros((len(self.names), len(seasons_list)), dtype=bool)
+        present[rows['TeamId'].to_numpy()[known], season_pos[known]] = True
+        return present
+
+
+def team_season_counts(base_path, season, country, league_code):
+    """Liczba meczów każdej drużyny (nazwy kanoniczne) w jednym sezonie ligi; None, jeśli brak danych."""
+    df = match_store.read_partition(base_path, season, country, league_code, columns=['HomeTeam', 'AwayTeam'])
+    if df is None:
+        return None
+    sides = pd.concat([df['HomeTeam'].astype(object), df['AwayTeam'].astype(object)], ignore_index=True).dropna()
+    # Kolejność pierwszego pojawienia się (jak w TeamScheduleIndex) - nowe drużyny dostają numery w tej kolejności
+    counts = sides.value_counts(sort=False)
+    return counts.reindex(pd.unique(sides))
+
+
+def sources_fingerprint(base_path):
+    """Skrót listy plików źródłowych (sezon, kraj, liga, rozmiar, czas modyfikacji) i tabeli aliasów."""
+    digest = hashlib.sha256()
+    for season, country, league_code in match_store.iter_source_files(base_path):
+        stat = match_store.get_source_path(base_path, season, country, league_code).stat()
+        digest.update(f"{season}/{country}/{league_code}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+    digest.update(json.dumps(match_store.TEAM_ALIASES, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def build_team_index(base_path, previous=None):
+    """
+    Buduje indeks drużyn ze wszystkich plików magazynu (sezony chronologicznie).
+    previous - poprzedni indeks: jego numery drużyn są zachowywane, nowe drużyny są dopisywane.
+    """
+    team_ids = {}
+    team_rows = []
+    if previous is not None:
+        for team_id, (country, team) in enumerate(zip(previous.countries, previous.names)):
+            team_ids[(country, team)] = team_id
+            team_rows.append({'TeamId': team_id, 'Country': country, 'Team': team})
+
+    sources = sorted(match_store.iter_source_files(base_path),
+                     key=lambda source: (match_store.season_sort_key(source[0]), source[1], source[2]))
+    season_rows = []
+    for season, country, league_code in sources:
+        counts = team_season_counts(base_path, season, country, league_code)
+        if counts is None:
+            continue
+        for team, matches in counts.items():
+            team_id = team_ids.get((country, team))
+            if team_id is None:
+                team_id = team_ids[(country, team)] = len(team_rows)
+                team_rows.append({'TeamId': team_id, 'Country': country, 'Team': team})
+            season_rows.append({'TeamId': team_id, 'Season': season, 'Country': country,
+                                'League': league_code, 'Matches': int(matches)})
+
+    teams_df = pd.DataFrame(team_rows, columns=['TeamId', 'Country', 'Team'])
+    seasons_df = pd.DataFrame(season_rows, columns=['TeamId', 'Season', 'Country', 'League', 'Matches'])
+    return TeamIndex(teams_df, seasons_df)
+
+
+def _write_parquet_atomic(df, path):
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def save_team_index(base_path, index, fingerprint):
+    """Zapisuje indeks obok magazynu kolumnowego (pliki Parquet i manifest z odciskiem źródeł)."""
+    store_path = match_store.get_store_path(base_path)
+    store_path.mkdir(parents=True, exist_ok=True)
+    _write_parquet_atomic(index.teams, store_path / TEAM_INDEX_FILENAME)
+    _write_parquet_atomic(index.seasons, store_path / TEAM_SEASONS_FILENAME)
+    manifest_path = store_path / TEAM_INDEX_MANIFEST_FILENAME
+    tmp_path = manifest_path.with_name(f".{manifest_path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({'version': TEAM_INDEX_VERSION, 'sources': fingerprint}, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+
+def read_team_index(base_path):
+    """Wczytuje zapisany indeks i jego manifest; (None, {}), jeśli indeksu nie ma albo jest uszkodzony."""
+    store_path = match_store.get_store_path(base_path)
+    try:
+        with open(store_path / TEAM_INDEX_MANIFEST_FILENAME, encoding="utf-8") as f:
+            manifest = json.load(f)
+        index = TeamIndex(pd.read_parquet(store_path / TEAM_INDEX_FILENAME),
+                          pd.read_parquet(store_path / TEAM_SEASONS_FILENAME))
+    except (OSError, ValueError):
+        return None, {}
+    return index, manifest
+
+
+_LOADED = {}
+
+
+def load_team_index(base_path, rebuild=False):
+    """
+    Indeks drużyn dla folderu z danymi: z pliku, jeśli pliki źródłowe się nie zmieniły,
+    w przeciwnym razie przebudowany (z zachowaniem dotychczasowych numerów) i zapisany.
+    W obrębie procesu indeks jest wczytywany raz.
+    """
+    key = str(Path(base_path).resolve())
+    if not rebuild and key in _LOADED:
+        return _LOADED[key]
+
+    fingerprint = sources_fingerprint(base_path)
+    index, manifest = read_team_index(base_path)
+    if (rebuild or index is None or manifest.get('version') != TEAM_INDEX_VERSION
+            or manifest.get('sources') != fingerprint):
+        previous = index if manifest.get('version') == TEAM_INDEX_VERSION else None
+        index = build_team_index(base_path, previous)
+        save_team_index(base_path, index, fingerprint)
+    _LOADED[key] = index
+    return index
+
+
+if __name__ == "__main__":
+    index = load_team_index(match_store.BASE_PATH, rebuild=True)
+    print(f"✅ Indeks drużyn: {len(index)} drużyn, {len(index.seasons)} sezonów drużyn "
+          f"({match_store.get_store_path(match_store.BASE_PATH)})")
@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+
+# --- INDEKS TERMINARZY DRUŻYN ---
+#
+# Zamiast filtrować całą ramkę ligi osobno dla każdej drużyny
+# (df[(df['HomeTeam'] == team) | (df['AwayTeam'] == team)]) budujemy raz na sezon ligi
+# (albo na kilka sezonów) indeks w układzie CSR: mecze drużyny i to pozycje
+# positions[offsets[i]:offsets[i + 1]] w ramce meczów, w kolejności chronologicznej.
+
+# Wynik meczu z punktu widzenia drużyny
+RESULT_UNKNOWN = -1
+RESULT_LOSS = 0
+RESULT_DRAW = 1
+RESULT_WIN = 2
+
+_HOME_RESULT_CODES = {'H': RESULT_WIN, 'D': RESULT_DRAW, 'A': RESULT_LOSS}
+_AWAY_RESULT_CODES = {'H': RESULT_LOSS, 'D': RESULT_DRAW, 'A': RESULT_WIN}
+
+
+def _result_codes(ftr, mapping):
+    """Kody wyników (int8) z kolumny FTR według mapowania; nieznane wyniki -> RESULT_UNKNOWN."""
+    codes = np.full(len(ftr), RESULT_UNKNOWN, dtype=np.int8)
+    for value, code in mapping.items():
+        codes[ftr == value] = code
+    return codes
+
+
+class TeamScheduleIndex:
+    """
+    Terminarze wszystkich drużyn ramki meczów posortowanej chronologicznie.
+
+    teams     - nazwy drużyn w kolejności pierwszego pojawienia się (gospodarz przed gościem w meczu)
+    offsets   - granice terminarzy drużyn w tablicach poniżej (długość len(teams) + 1)
+    positions - pozycje meczów w ramce (rosnąco w obrębie drużyny)
+    is_home   - czy drużyna grała u siebie
+    results   - wynik z punktu widzenia drużyny (RESULT_WIN / RESULT_DRAW / RESULT_LOSS)
+    """
+
+    def __init__(self, matches_df):
+        self.matches = matches_df
+        n = len(matches_df)
+
+        # Przeplot gospodarz/gość wiersz po wierszu daje tę samą kolejność drużyn co
+        # pd.unique(df[['HomeTeam', 'AwayTeam']].values.ravel())
+        sides = np.column_stack([matches_df['HomeTeam'].to_numpy(dtype=object),
+                                 matches_df['AwayTeam'].to_numpy(dtype=object)]).ravel()
+        codes, teams = pd.factorize(sides)
+        ftr = matches_df['FTR'].to_numpy(dtype=object)
+        results = np.column_stack([_result_codes(ftr, _HOME_RESULT_CODES),
+                                   _result_codes(ftr, _AWAY_RESULT_CODES)]).ravel()
+
+        known = codes >= 0
+        order = np.flatnonzero(known)[np.argsort(codes[known], kind='stable')]
+        self.teams = np.asarray(teams, dtype=object)
+        self.offsets = np.r_[0, np.cumsum(np.bincount(codes[known], minlength=len(self.teams)))].astype(np.int64)
+        self.positions = (order // 2).astype(np.int64)
+        self.is_home = (order % 2) == 0
+        self.results = results[order]
+        self._team_ids = {team: i for i, team in enumerate(self.teams)}
+        self.n_matches = n
+
+    def __len__(self):
+        return len(self.teams)
+
+    def __contains__(self, team):
+        return team in self._team_ids
+
+    def __iter__(self):
+        return iter(self.teams)
+
+    def counts(self):
+        """Liczba meczów każdej drużyny."""
+        return np.diff(self.offsets)
+
+    def row_team_ids(self):
+        """Numer drużyny dla każdego wpisu indeksu (do grupowania np.bincount)."""
+        return np.repeat(np.arange(len(self.teams)), self.counts())
+
+    def team_steps(self):
+        """Numer kolejnego meczu drużyny (0, 1, 2, ...) dla każdego wpisu indeksu."""
+        return np.arange(len(self.positions)) - np.repeat(self.offsets[:-1], self.counts())
+
+    def result_counts(self, limits=None):
+        """
+        Liczba meczów, remisów, zwycięstw i porażek każdej drużyny (tablice długości len(teams)).
+        limits - opcjonalnie liczba pierwszych meczów drużyny branych pod uwagę (tablica na drużynę).
+        """
+        team_id = self.row_team_ids()
+        if limits is not None:
+            keep = self.team_steps() < np.asarray(limits)[team_id]
+            team_id, results = team_id[keep], self.results[keep]
+        else:
+            results = self.results
+        n_teams = len(self.teams)
+        matches = np.bincount(team_id, minlength=n_teams)
+        draws = np.bincount(team_id[results == RESULT_DRAW], minlength=n_teams)
+        wins = np.bincount(team_id[results == RESULT_WIN], minlength=n_teams)
+        losses = np.bincount(team_id[results == RESULT_LOSS], minlength=n_teams)
+        return matches, draws, wins, losses
+
+    def global_team_ids(self, team_index, country):
+        """Numery drużyn z indeksu drużyn (team_index.TeamIndex) dla kolejnych drużyn terminarza."""
+        return team_index.encode(country, self.teams)
+
+    def team_slice(self, team):
+        """Zakres wpisów indeksu z meczami drużyny."""
+        i = self._team_ids[team]
+        return slice(self.offsets[i], self.offsets[i + 1])
+
+    def positions_of(self, team):
+        """Pozycje meczów drużyny w ramce (chronologicznie)."""
+        return self.positions[self.team_slice(team)]
+
+    def home_flags(self, team):
+        """Flagi meczów u siebie dla drużyny."""
+        return self.is_home[self.team_slice(team)]
+
+    def results_of(self, team):
+        """Wyniki drużyny jako kody RESULT_*."""
+        return self.results[self.team_slice(team)]
+
+    def team_values(self, team, column):
+        """Wartości kolumny ramki meczów dla kolejnych meczów drużyny (bez kopiowania całej ramki)."""
+        return self.matches[column].to_numpy()[self.positions_of(team)]
+
+    def team_matches(self, team):
+        """Ramka meczów drużyny (kopia tylko jej wierszy)."""
+        return self.matches.take(self.positions_of(team)).reset_index(drop=True)
@@ -0,0 +1,38 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import match_store
+import streak_monitor
+
+SEASON = "2024-2025"
+TEAMS = ["Arsenal", "Chelsea", "Everton", "Fulham"]
+
+
+def write_season(base_path, results):
+    """Plik sezonu E0 z meczami kolejnych dni (wyniki w kolejności results)."""
+    lines = ["Div,Date,HomeTeam,AwayTeam,FTR"]
+    for i, ftr in enumerate(results):
+        home, away = TEAMS[i % 4], TEAMS[(i + 1 + i // 4) % 4]
+        lines.append(f"E0,{i % 28 + 1:02d}/{i // 28 + 8:02d}/2024,{home},{away},{ftr}")
+    csv_path = match_store.get_source_path(base_path, SEASON, "England", "E0")
+    csv_path.parent.mkdir(parents=True, exist_ok=True)
+    csv_path.write_bytes(("\n".join(lines) + "\n").encode())
+    return csv_path
+
+
+def test_same_length_correction_in_middle_forces_rebuild(tmp_path):
+    results = list("HADHHAHDAHHADHAHHDAA" * 2)
+    write_season(tmp_path, results)
+    state_dir = tmp_path / "stan"
+    streak_monitor.update_league("England", "E0", [SEASON], state_dir, tmp_path)
+
+    results[len(results) // 2] = "D" if results[len(results) // 2] != "D" else "H"
+    write_season(tmp_path, results)
+    state, _, new_matches = streak_monitor.update_league("England", "E0", [SEASON], state_dir, tmp_path)
+
+    rebuilt, _, _ = streak_monitor.update_league("England", "E0", [SEASON], tmp_path / "od_nowa", tmp_path,
+                                                  rebuild=True)
+    assert new_matches == 0
+    assert state['teams'] == rebuilt['teams']